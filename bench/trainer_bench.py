@@ -0,0 +1,333 @@
+"""Offline benchmark for the trainer's client hot paths.
+
+Starts the Streamlit app on a free local port with a scratch database (removed
+afterwards), drives the board through a locally installed headless Chromium
+(Playwright), and writes one JSON report:
+
+* time-to-interactive (navigation -> first render finished),
+* per-path timings recorded by ``perf.js`` (render, ensurePartNode,
+  cachePart, drop, dragover, quizPick, relayout, saveState) as percentiles,
+* frame times while dragging,
+* storage writes and bytes (IndexedDB puts, or localStorage without it).
+
+Nothing is fetched from the network; point ``--chromium`` at a local binary
+(or set ``CHROMIUM_PATH``)::
+
+    pip install -r bench/requirements.txt
+    python bench/trainer_bench.py --chromium /usr/bin/chromium --out bench/results/dev.json
+    python bench/trainer_bench.py --chromium /usr/bin/chromium --baseline bench/results/dev.json
+
+With ``--baseline`` the run is compared path by path and exits non-zero when
+any p50/p90 (or time-to-interactive) regresses by more than ``--tolerance``.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from trainer.catalog import AIRFRAMES, DEFAULT_AIRFRAME  # noqa: E402
+
+# Runs in every frame before any page script: turns perf.js on, counts
+# storage traffic and samples frame deltas while `record` is on. IndexedDB
+# values are sized as JSON, which is close to what structured clone stores.
+INIT_SCRIPT = r"""
+window.TRAINER_BENCH = true;
+(() => {
+  const storage = {bytes:0, writes:0};
+  const setItem = Storage.prototype.setItem;
+  Storage.prototype.setItem = function(k, v) {
+    storage.bytes += String(k).length + String(v).length;
+    storage.writes += 1;
+    return setItem.call(this, k, v);
+  };
+  const put = IDBObjectStore.prototype.put;
+  IDBObjectStore.prototype.put = function(v, k) {
+    storage.bytes += JSON.stringify(k === undefined ? null : k).length + JSON.stringify(v).length;
+    storage.writes += 1;
+    return put.call(this, v, k);
+  };
+  const frames = [];
+  let last = 0, on = false;
+  function tick(t) { if (on && last) frames.push(t - last); last = t; requestAnimationFrame(tick); }
+  requestAnimationFrame(tick);
+  window.__bench = { storage, frames, record(v) { on = v; last = 0; } };
+})();
+"""
+
+PATHS = ("render", "ensurePartNode", "cachePart", "drop", "dragover", "quizPick", "relayout", "saveState")
+RESIZE_WIDTHS = (1280, 1100, 960, 1440, 1280)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"streamlit did not come up at {url}")
+
+
+def start_app(port, mode, db):
+    """The app on ``port``, writing sessions to the scratch database ``db``."""
+    env = dict(os.environ, TRAINER_ASSETS=mode, TRAINER_DB=str(db))
+    cmd = [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+           "--server.port", str(port), "--browser.gatherUsageStats", "false"]
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    v = sorted(values)
+
+    def pct(p):
+        return v[min(len(v) - 1, max(0, math.ceil(p / 100 * len(v)) - 1))]
+
+    return {"n": len(v), "mean": sum(v) / len(v), "p50": pct(50), "p90": pct(90),
+            "p99": pct(99), "max": v[-1]}
+
+
+def _board_frame(page, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for frame in page.frames:
+            try:
+                if frame.evaluate("!!(window.__trainerPerf && window.__trainerPerf.marks.interactive)"):
+                    return frame
+            except Exception:
+                pass
+        time.sleep(0.05)
+    raise RuntimeError("trainer never reported interactive")
+
+
+def _count(frame, path):
+    return frame.evaluate(f"(window.__trainerPerf.samples[{path!r}] || []).length")
+
+
+def _wait_count(frame, path, n, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while _count(frame, path) < n and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _drag(page, box, src, dst, icon):
+    # src/dst are stage positions of an icon's top-left; grab the icon centre
+    page.mouse.move(box["x"] + src["x"] + icon / 2, box["y"] + src["y"] + icon / 2)
+    page.mouse.down()
+    page.mouse.move(box["x"] + dst["x"] + icon / 2, box["y"] + dst["y"] + icon / 2, steps=12)
+    page.mouse.up()
+
+
+def _board(frame, call):
+    """Stage coordinates from the board's scripted-drag hook (may pan the view
+    or page the tray)."""
+    return frame.evaluate(f"window.__trainerBoard.{call}")
+
+
+def _close_quiz(frame):
+    if frame.evaluate("getComputedStyle(document.getElementById('quizOverlay')).display !== 'none'"):
+        frame.click("#btnClose")
+
+
+def build_plan(catalog):
+    """``(part, zone)`` pairs for a full build that respects the assembly
+    order: zones in topological order of ``catalog["order"]`` (ESC before
+    motor before prop on each arm, PDB before FC, antenna before VTX), each
+    with the next unused part of a kind it takes."""
+    order, zones = catalog["order"], catalog["zones"]
+    missing = list(order["need"])
+    ready = [i for i, n in enumerate(missing) if not n]
+    ranked = []
+    while ready:
+        zi = ready.pop(0)
+        ranked.append(zi)
+        for k in range(order["dep_start"][zi], order["dep_start"][zi + 1]):
+            dep = order["dep_zones"][k]
+            missing[dep] -= 1
+            if not missing[dep]:
+                ready.append(dep)
+    if len(ranked) != len(zones):
+        raise ValueError("assembly order has a cycle")
+    free = {}
+    for p in catalog["parts"]:
+        free.setdefault(p["kind"], []).append(p)
+    plan = []
+    for zi in ranked:
+        kind = next(k for k in zones[zi]["allow"] if free.get(k))
+        plan.append((free[kind].pop(0), zones[zi]))
+    return plan
+
+
+def drive(frame, page, catalog, icon=74):
+    """Wrong drop onto every zone, then a full correct build in assembly order."""
+    box = frame.locator("#stage").bounding_box()
+    parts, zones = catalog["parts"], catalog["zones"]
+    drops = 0
+
+    frame.evaluate("window.__bench.record(true)")
+    for z in zones:
+        # wrong part onto the zone, then back to the tray so nothing is buried
+        wrong = next(p for p in parts if p["kind"] not in z["allow"])
+        src = _board(frame, f"partAt({wrong['id']!r})")
+        dst = _board(frame, f"zoneAt({z['key']!r})")
+        _drag(page, box, src, dst, icon)
+        _wait_count(frame, "drop", drops + 1)
+        dst = _board(frame, "tray()")
+        src = _board(frame, f"partAt({wrong['id']!r})")
+        _drag(page, box, src, dst, icon)
+        drops += 2
+        _wait_count(frame, "drop", drops)
+
+    for p, z in build_plan(catalog):
+        src = _board(frame, f"partAt({p['id']!r})")
+        dst = _board(frame, f"zoneAt({z['key']!r})")
+        _drag(page, box, src, dst, icon)
+        drops += 1
+        _wait_count(frame, "drop", drops)
+        _close_quiz(frame)
+    frame.evaluate("window.__bench.record(false)")
+
+    progress = _board(frame, "progress()")
+    if progress != {"locked": len(parts), "wrong": len(zones)}:
+        raise RuntimeError(f"build did not complete cleanly: {progress} after {drops} drops "
+                           f"({len(parts)} parts, {len(zones)} wrong drops expected)")
+
+
+def run(args):
+    from playwright.sync_api import sync_playwright
+
+    catalog = AIRFRAMES[args.airframe]()
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    scratch = Path(tempfile.mkdtemp(prefix="trainer-bench-"))
+    app = start_app(port, args.mode, scratch / "trainer.db")
+    try:
+        _wait_healthy(url, args.timeout)
+        with sync_playwright() as pw:
+            browser = pw.chromium.launch(executable_path=args.chromium, headless=True)
+            context = browser.new_context(viewport={"width": RESIZE_WIDTHS[0], "height": 1000})
+            context.add_init_script(INIT_SCRIPT)
+            page = context.new_page()
+
+            page.goto(f"{url}/?airframe={args.airframe}", wait_until="domcontentloaded")
+            t_nav = page.evaluate("performance.timeOrigin")
+            frame = _board_frame(page, args.timeout)
+            tti = frame.evaluate("performance.timeOrigin + window.__trainerPerf.marks.interactive") - t_nav
+
+            drive(frame, page, catalog)
+
+            for i in range(args.resets):
+                frame.click("#btnReset")
+                _wait_count(frame, "render", i + 2)
+
+            for w in RESIZE_WIDTHS[1:]:
+                page.set_viewport_size({"width": w, "height": 1000})
+                page.wait_for_timeout(150)
+
+            # let the idle-time flush land before reading storage counters
+            page.wait_for_timeout(1500)
+            samples = frame.evaluate("window.__trainerPerf.samples")
+            bench = frame.evaluate("({frames: window.__bench.frames, storage: window.__bench.storage})")
+            chromium = browser.version
+            browser.close()
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    frames = bench["frames"]
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_rev(),
+            "mode": args.mode,
+            "airframe": args.airframe,
+            "chromium": chromium,
+            "python": platform.python_version(),
+            "catalog": catalog["version"],
+        },
+        "tti_ms": tti,
+        "paths": {p: percentiles(samples.get(p, [])) for p in PATHS},
+        "frames": dict(percentiles(frames) or {}, over_16ms=sum(f > 16.7 for f in frames)),
+        "storage": bench["storage"],
+    }
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result, baseline, tolerance):
+    """List of human-readable regressions beyond ``tolerance`` (a fraction)."""
+    out = []
+
+    def check(label, new, old):
+        if new is not None and old and new > old * (1 + tolerance):
+            out.append(f"{label}: {old:.2f} -> {new:.2f} ms (+{(new / old - 1) * 100:.0f}%)")
+
+    check("tti", result["tti_ms"], baseline.get("tti_ms"))
+    for path, stats in result["paths"].items():
+        old = (baseline.get("paths") or {}).get(path)
+        if stats and old:
+            check(f"{path} p50", stats["p50"], old["p50"])
+            check(f"{path} p90", stats["p90"], old["p90"])
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--chromium", default=os.environ.get("CHROMIUM_PATH"),
+                    help="local Chromium/Chrome binary (default: $CHROMIUM_PATH)")
+    ap.add_argument("--mode", choices=("bundle", "inline"), default="bundle")
+    ap.add_argument("--airframe", choices=sorted(AIRFRAMES), default=DEFAULT_AIRFRAME)
+    ap.add_argument("--resets", type=int, default=3)
+    ap.add_argument("--timeout", type=float, default=60)
+    ap.add_argument("--out", type=Path)
+    ap.add_argument("--baseline", type=Path)
+    ap.add_argument("--tolerance", type=float, default=0.15)
+    args = ap.parse_args(argv)
+    if not args.chromium:
+        ap.error("no Chromium binary: pass --chromium or set CHROMIUM_PATH")
+
+    result = run(args)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text + "\n")
+    print(text)
+
+    if args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for r in regressions:
+            print("REGRESSION", r, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import streamlit as st
+
+from trainer import dashboard
+from trainer.catalog import AIRFRAMES, DEFAULT_AIRFRAME
+
+st.set_page_config(page_title="Instructor dashboard", layout="wide")
+
+st.title("📊 Instructor dashboard")
+st.caption(f"Cohort aggregates, refreshed every {dashboard.TTL_S} s.")
+
+cohorts = dashboard.cohorts()
+if not cohorts:
+    st.info("No sessions recorded yet.")
+    st.stop()
+
+default = st.query_params.get("cohort", cohorts[0])
+cohort = st.selectbox("Cohort", cohorts, index=cohorts.index(default) if default in cohorts else 0)
+
+grades = dashboard.grade_distribution(cohort)
+quiz = dashboard.quiz_accuracy(cohort)
+attempts = sum(r["attempts"] for r in quiz)
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Sessions", sum(grades.values()))
+c2.metric("Quiz attempts", attempts)
+c3.metric("Quiz accuracy", f"{sum(r['correct'] for r in quiz) / attempts:.0%}" if attempts else "—")
+
+left, right = st.columns(2)
+with left:
+    st.subheader("Grade distribution")
+    st.bar_chart({"sessions": grades})
+    st.subheader("Quiz accuracy by kind")
+    st.dataframe(quiz, hide_index=True,
+                 column_config={"accuracy": st.column_config.ProgressColumn(format="%.2f", min_value=0, max_value=1)})
+with right:
+    st.subheader("Most common wrong-zone drops")
+    st.dataframe(dashboard.wrong_drops(cohort), hide_index=True)
+
+st.subheader("Report cards")
+names = list(AIRFRAMES)
+airframe = st.selectbox("Airframe", names, index=names.index(DEFAULT_AIRFRAME),
+                        format_func=lambda a: a.replace("_", " ").title())
+if st.button("Render report cards"):
+    with st.spinner("Rendering…"):
+        cards, n_cards, skipped = dashboard.report_cards(cohort, airframe)
+    st.caption(f"{n_cards} cards." + (f" {skipped} sessions skipped: no journal for the current "
+                                      f"{airframe.replace('_', ' ')} catalog (listed in skipped.txt)."
+                                      if skipped else ""))
+    st.download_button("Download (zip)", cards, file_name=f"report_cards_{cohort}_{airframe}.zip",
+                       mime="application/zip")
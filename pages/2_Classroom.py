@@ -0,0 +1,35 @@
+import streamlit as st
+
+from trainer import classroom, dashboard
+from trainer.assets import classroom_board
+from trainer.catalog import AIRFRAMES, DEFAULT_AIRFRAME
+
+st.set_page_config(page_title="Classroom", layout="wide")
+
+st.title("🖥️ Classroom")
+st.caption(f"Trainees' live boards, refreshed every {classroom.TTL_S} s. Idle boards update less often.")
+
+cohorts = dashboard.cohorts()
+if not cohorts:
+    st.info("No sessions recorded yet.")
+    st.stop()
+
+default = st.query_params.get("cohort", cohorts[0])
+names = list(AIRFRAMES)
+c1, c2, c3 = st.columns(3)
+cohort = c1.selectbox("Cohort", cohorts, index=cohorts.index(default) if default in cohorts else 0)
+airframe = c2.selectbox("Airframe", names, index=names.index(DEFAULT_AIRFRAME),
+                        format_func=lambda a: a.replace("_", " ").title())
+limit = c3.slider("Boards", 4, classroom.MAX_BOARDS, 8)
+cols = 4 if limit > 6 else 3
+
+
+def render():
+    classroom_board(classroom.boards(cohort, airframe, limit), cols=cols, airframe=airframe)
+
+
+# Only the boards rerun on the timer, not the whole page.
+if hasattr(st, "fragment"):
+    st.fragment(run_every=classroom.TTL_S)(render)()
+else:
+    render()
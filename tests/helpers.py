@@ -0,0 +1,45 @@
+"""Scripted boards shared by the tests."""
+import random
+
+from trainer.engine import ANSWER, CLOSE, DROP, SET_LOCK, Session
+
+
+def build_plan(rules):
+    """``(part, zone)`` pairs that fill every zone in a legal order."""
+    s = Session(rules)
+    plan = []
+    while not s.complete:
+        for part in range(rules.n_parts):
+            if s.part_zone[part] >= 0:
+                continue
+            z = next((z for z in range(len(rules.zone_x)) if s.occupant[z] < 0 and not s.missing[z]
+                      and rules.zone_mask[z] & rules.part_bit[part]), -1)
+            if z >= 0:
+                s.fill(z, part)
+                plan.append((part, z))
+                break
+        else:
+            raise AssertionError("no legal drop left")
+    return plan
+
+
+def random_ops(rules, n, seed=0, t0=1_000):
+    """``n`` plausible board ops: drops near zones or loose, quiz answers,
+    the odd lock toggle."""
+    rng = random.Random(seed)
+    ops, t = [], t0
+    for _ in range(n):
+        t += rng.randrange(50, 2_000)
+        r = rng.random()
+        if r < 0.7:
+            z = rng.randrange(len(rules.zone_x))
+            x = rules.zone_x[z] + rng.uniform(-0.04, 0.04) if r < 0.6 else rng.random()
+            y = rules.zone_y[z] + rng.uniform(-0.04, 0.04) if r < 0.6 else rng.random()
+            ops.append((DROP, t, rng.randrange(rules.n_parts), x, y))
+        elif r < 0.9:
+            ops.append((ANSWER, t, rng.random() < 0.7, 0, 0))
+        elif r < 0.97:
+            ops.append((CLOSE, t, 0, 0, 0))
+        else:
+            ops.append((SET_LOCK, t, rng.random() < 0.8, 0, 0))
+    return ops
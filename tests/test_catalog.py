@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from trainer.catalog import (AIRFRAMES, ORDER, QUAD_KINDS, QUIZ, ZONES, build_order, default_parts, validate,
+                             zone_grid)
+
+
+def test_validate_accepts_the_quad():
+    validate(ZONES, default_parts(), QUIZ)
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda z, p, q: z.append(dict(z[0])), "duplicate zone key"),
+    (lambda z, p, q: p.append(dict(p[0])), "duplicate part id"),
+    (lambda z, p, q: z.__setitem__(0, dict(z[0], x=1.5)), "normalized"),
+    (lambda z, p, q: z.__setitem__(0, dict(z[0], allow=["nope"])), "unknown kinds"),
+    (lambda z, p, q: p.__setitem__(0, dict(p[0], kind="nope")), "unknown kind"),
+])
+def test_validate_rejects(change, message):
+    zones, parts, quiz = list(ZONES), default_parts(), dict(QUIZ)
+    change(zones, parts, quiz)
+    with pytest.raises(ValueError, match=message):
+        validate(zones, parts, quiz)
+
+
+def test_quad_quiz_is_its_own_kinds():
+    cat = AIRFRAMES["quad"]()
+    assert cat["kinds"] == list(QUAD_KINDS) == list(cat["quiz"])
+    assert {p["kind"] for p in default_parts()} == set(QUAD_KINDS)
+
+
+def test_lookup_indexes():
+    cat = AIRFRAMES["quad"]()
+    assert all(cat["zones"][i]["key"] == k for k, i in cat["zone_index"].items())
+    assert all(cat["parts"][i]["id"] == p for p, i in cat["part_index"].items())
+    for z in cat["zones"]:
+        assert {k for k in cat["kinds"] if z["mask"] & cat["kind_bit"][k]} == set(z["allow"])
+
+
+@pytest.mark.parametrize("airframe", sorted(AIRFRAMES))
+def test_zone_grid_lists_every_zone_it_can_reach(airframe):
+    cat = AIRFRAMES[airframe]()
+    zones, radius, grid = cat["zones"], cat["radius"], cat["grid"]
+    n = grid["n"]
+    assert n == max(1, math.ceil(1 / radius))
+    for i, z in enumerate(zones):
+        # the cell under each zone centre, and those under its snap disk's extremes
+        for dx, dy in ((0, 0), (radius, 0), (-radius, 0), (0, radius), (0, -radius)):
+            x, y = min(max(z["x"] + dx * 0.999, 0), 1), min(max(z["y"] + dy * 0.999, 0), 1)
+            cell = min(n - 1, int(y * n)) * n + min(n - 1, int(x * n))
+            assert i in grid["cell_zones"][grid["cell_start"][cell]:grid["cell_start"][cell + 1]]
+
+
+def test_zone_grid_buckets_are_in_catalog_order():
+    grid = zone_grid(ZONES, 0.2)
+    for c in range(grid["n"] ** 2):
+        bucket = grid["cell_zones"][grid["cell_start"][c]:grid["cell_start"][c + 1]]
+        assert bucket == sorted(bucket)
+
+
+def test_validate_rejects_an_order_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        validate(ZONES, default_parts(), QUIZ, order=ORDER + [("prop", "esc")])
+
+
+def test_build_order_within_groups():
+    o = build_order(ZONES)
+    key = {z["key"]: i for i, z in enumerate(ZONES)}
+    deps = lambda z: o["dep_zones"][o["dep_start"][key[z]]:o["dep_start"][key[z] + 1]]
+
+    assert deps("z_esc_tl") == [key["z_motor_tl"]]
+    assert deps("z_motor_tl") == [key["z_prop_tl"]]
+    assert key["z_vtx"] in deps("z_ant")
+    assert o["need"][key["z_prop_tl"]] == 1
+    assert o["need"][key["z_esc_tl"]] == 0
+    assert sum(o["need"]) == len(o["dep_zones"])
+    # prerequisite bits agree with the counts
+    for i in range(len(ZONES)):
+        row = o["req"][i * o["words"]:(i + 1) * o["words"]]
+        assert sum(bin(w & 0xFFFFFFFF).count("1") for w in row) == o["need"][i]
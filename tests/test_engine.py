@@ -0,0 +1,73 @@
+import pytest
+
+from trainer.engine import (ANSWER, DROP, IGNORED, LOCKED, MOVED, OUT_OF_ORDER, PTS_LOCK, PTS_QUIZ_CORRECT,
+                            PTS_SNAP, PTS_WRONG_DROP, STREAK_BONUS, STREAK_EVERY, WRONG_ZONE, Rules, Session)
+
+from helpers import build_plan, random_ops
+
+
+@pytest.fixture(scope="module")
+def rules():
+    return Rules()
+
+
+def test_scripted_build_completes(rules):
+    s = Session(rules)
+    plan = build_plan(rules)
+    for t, (part, z) in enumerate(plan):
+        assert s.drop(part, rules.zone_x[z], rules.zone_y[z], t) == LOCKED
+        s.answer(True)
+    assert s.complete
+    streaks = len(plan) // STREAK_EVERY
+    assert s.score == len(plan) * (PTS_SNAP + PTS_LOCK + PTS_QUIZ_CORRECT) + streaks * STREAK_BONUS
+    assert s.wrong == 0 and s.best_streak == len(plan)
+
+
+def test_drop_outcomes(rules):
+    s = Session(rules)
+    part, z = next((p, z) for p, z in build_plan(rules) if rules.need[z])
+    assert s.drop(part, rules.zone_x[z], rules.zone_y[z]) == OUT_OF_ORDER
+    assert s.score == PTS_WRONG_DROP
+    assert s.drop(part, -5, -5) == MOVED
+    wrong = next(w for w in range(len(rules.zone_x)) if not rules.zone_mask[w] & rules.part_bit[part])
+    assert s.drop(part, rules.zone_x[wrong], rules.zone_y[wrong]) == WRONG_ZONE
+    assert s.wrong == 2
+
+    first, fz = build_plan(rules)[0]
+    s.drop(first, rules.zone_x[fz], rules.zone_y[fz])
+    assert s.drop(first, 0.5, 0.5) == IGNORED
+
+
+def test_nearest_zone_matches_linear_scan(rules):
+    import random
+    rng = random.Random(3)
+    for _ in range(5_000):
+        x, y = rng.uniform(-0.1, 1.1), rng.uniform(-0.1, 1.1)
+        best, best_d = -1, rules.radius2
+        for i in range(len(rules.zone_x)):
+            d = (x - rules.zone_x[i]) ** 2 + (y - rules.zone_y[i]) ** 2
+            if d < best_d:
+                best, best_d = i, d
+        assert rules.nearest_zone(x, y) == best
+
+
+def test_snapshot_round_trip(rules):
+    s = Session(rules, start_ms=1_000)
+    s.replay(random_ops(rules, 400, seed=1))
+    snap = s.to_snapshot("abc")
+    back = Session.from_snapshot(rules, snap)
+    assert back.to_snapshot("abc") == snap
+    assert (back.score, back.wrong, back.attempts, back.correct) == (s.score, s.wrong, s.attempts, s.correct)
+
+
+def test_snapshot_rejects_other_catalog(rules):
+    snap = Session(rules).to_snapshot()
+    with pytest.raises(ValueError):
+        Session.from_snapshot(rules, dict(snap, c="nope"))
+
+
+def test_answer_scores_each_lock_once(rules):
+    s = Session(rules)
+    part, z = build_plan(rules)[0]
+    s.replay([(DROP, 1, part, rules.zone_x[z], rules.zone_y[z]), (ANSWER, 2, 1, 0, 0), (ANSWER, 3, 1, 0, 0)])
+    assert s.correct == 1 and s.quiz_streak == 1
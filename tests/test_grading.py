@@ -0,0 +1,34 @@
+import numpy as np
+
+from trainer.engine import Rules, Session, grade_letter, grade_score
+from trainer.grading import curve_letters, grade_scores, letters, percentile_ranks
+
+from helpers import random_ops
+
+
+def test_grade_scores_match_the_engine():
+    rules = Rules()
+    sessions = []
+    for seed in range(40):
+        s = Session(rules, start_ms=0)
+        s.replay(random_ops(rules, 20 + 10 * seed, seed=seed, t0=0))
+        sessions.append((s, 30_000 + 15_000 * seed))
+    elapsed = [(now - s.start_ms) // 1000 for s, now in sessions]
+    scores = grade_scores(elapsed, [s.wrong for s, _ in sessions], [s.attempts for s, _ in sessions],
+                          [s.correct for s, _ in sessions], [s.best_streak for s, _ in sessions])
+    for (s, now), score, letter in zip(sessions, scores, letters(scores)):
+        assert score == s.grade_score(now)
+        assert letter == s.grade(now)
+
+
+def test_edges():
+    assert grade_score(0, 0, 0, 0, 0) == grade_scores([0], [0], [0], [0], [0])[0]
+    assert grade_scores([10_000], [100], [5], [0], [0])[0] == 0
+    assert grade_letter(95) == "A+" and grade_letter(59.99) == "F"
+    assert list(letters(np.array([95, 90, 80, 70, 60, 59.99]))) == ["A+", "A", "B", "C", "D", "F"]
+
+
+def test_percentile_ranks_and_curve():
+    ranks = percentile_ranks([10, 20, 20, 30])
+    assert list(ranks) == [12.5, 50.0, 50.0, 87.5]
+    assert list(curve_letters(ranks)) == ["D", "B", "B", "A"]
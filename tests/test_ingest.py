@@ -0,0 +1,210 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from trainer import ingest
+from trainer.ingest import Ingest
+from trainer.store import connect
+
+
+def line(session, seq, cohort="c"):
+    return json.dumps(ingest._fake_batch(session, seq, 1_000 * seq, cohort))
+
+
+def body(*lines):
+    return "\n".join(lines).encode()
+
+
+def serve(path, fn, **kw):
+    """Run ``fn(ingest)`` against a started service, then close it."""
+    async def run():
+        i = Ingest(path, **kw)
+        await i.start("127.0.0.1", 0)
+        try:
+            return i, await fn(i)
+        finally:
+            await i.close()
+    return asyncio.run(run())
+
+
+def count(path, table):
+    conn = connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_acks_after_commit(tmp_path):
+    path = tmp_path / "t.db"
+
+    async def go(i):
+        status, ack, _ = await i.route("POST", "/ingest", body(line("a", 1), line("a", 2)))
+        assert count(path, "events") == 8        # committed before the ack went out
+        return status, ack
+
+    _, (status, ack) = serve(path, go)
+    assert status == 200 and (ack["taken"], ack["accepted"]) == (2, 2)
+
+
+def summary_of(path, session):
+    conn = connect(path)
+    try:
+        return conn.execute("SELECT updated_ms, score FROM sessions WHERE session_id = ?", (session,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_resends_and_stale_batches_are_no_ops(tmp_path):
+    """The store, not the service, decides: a stale batch is harmless even
+    to a service that has never seen the session (restarted, say)."""
+    path = tmp_path / "t.db"
+
+    async def first(i):
+        return await i.route("POST", "/ingest", body(line("a", 1), line("a", 3)))
+
+    async def again(i):
+        return await i.route("POST", "/ingest", body(line("a", 2), line("a", 1), line("a", 3)))
+
+    serve(path, first)
+    assert summary_of(path, "a") == (3_000, 3)
+    _, (status, ack, _) = serve(path, again)
+    assert status == 200 and ack["taken"] == 3
+    assert summary_of(path, "a") == (3_000, 3)
+    assert count(path, "events") == 12 and count(path, "sessions") == 1
+
+
+def test_resent_batch_waits_on_the_queued_write(tmp_path):
+    async def go(i):
+        return await asyncio.gather(*(i.route("POST", "/ingest", body(line("a", 1))) for _ in range(3)))
+
+    i, acks = serve(tmp_path / "t.db", go)
+    assert [a[1]["taken"] for a in acks] == [1, 1, 1]
+    assert i.written == 1
+
+
+def test_malformed_lines_are_dropped(tmp_path):
+    async def go(i):
+        return await i.route("POST", "/ingest", body("{", json.dumps({"session": "a"}), "", line("a", 1)))
+
+    _, (status, ack, _) = serve(tmp_path / "t.db", go)
+    assert status == 200
+    assert (ack["taken"], ack["accepted"], ack["dropped"]) == (4, 1, 2)
+
+
+def test_full_queue_stops_taking(tmp_path):
+    async def run():
+        i = Ingest(tmp_path / "t.db", queue_max=4)
+        return i, i.offer([line("a", n) for n in range(1, 7)])
+
+    i, handled = asyncio.run(run())
+    assert len(handled) == 4 and i.queue.full()
+
+
+def test_refusal_ack(tmp_path):
+    async def go(i):
+        lines = [line("a", n) for n in range(1, 31)]
+        return await i.route("POST", "/ingest", body(*lines))
+
+    _, (status, ack, headers) = serve(tmp_path / "t.db", go, queue_max=10)
+    assert status == 429
+    assert ack["taken"] == ack["accepted"] == 10
+    assert ack["retry_ms"] == ack["flush_ms"]
+    assert int(headers["Retry-After"]) >= 1
+
+
+def test_failed_write_is_retryable(tmp_path, monkeypatch):
+    path = tmp_path / "t.db"
+
+    def broken(conn, items):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    async def go(i):
+        monkeypatch.setattr(ingest, "write", broken)
+        failed = await i.route("POST", "/ingest", body(line("a", 1), line("a", 2)))
+        monkeypatch.undo()
+        retried = await i.route("POST", "/ingest", body(line("a", 1), line("a", 2)))
+        return failed, retried
+
+    i, (failed, retried) = serve(path, go)
+    assert failed[0] == 503 and failed[1]["taken"] == 0 and "Retry-After" in failed[2]
+    assert retried[0] == 200 and retried[1]["accepted"] == 2
+    assert count(path, "events") == 8
+
+
+def test_bad_batch_is_dropped_alone(tmp_path):
+    bad = json.loads(line("b", 1))
+    bad["events"] = [{"type": "op", "t": 1}]     # no n/op/a/b/c
+    path = tmp_path / "t.db"
+
+    async def go(i):
+        return await i.route("POST", "/ingest", body(line("a", 1), json.dumps(bad), line("a", 2)))
+
+    _, (status, ack, _) = serve(path, go)
+    assert status == 200
+    assert (ack["taken"], ack["accepted"], ack["dropped"]) == (3, 2, 1)
+    assert count(path, "sessions") == 1
+
+
+def test_flush_window_stretches_past_high_water(tmp_path):
+    async def run():
+        i = Ingest(tmp_path / "t.db", queue_max=10)
+        i.offer([line(f"s{n}", 1) for n in range(5)])
+        half = i.flush_ms()
+        i.offer([line(f"s{n}", 1) for n in range(5, 10)])
+        return half, i.flush_ms()
+
+    assert asyncio.run(run()) == (ingest.FLUSH_MS, ingest.FLUSH_MS * ingest.SLOWDOWN)
+
+
+def test_routes(tmp_path):
+    async def go(i):
+        return [await i.route(m, p, b"") for m, p in (("GET", "/nope"), ("GET", "/ingest"), ("OPTIONS", "/ingest"),
+                                                       ("GET", "/health"))]
+
+    _, (nope, get, options, health) = serve(tmp_path / "t.db", go)
+    assert (nope[0], get[0], options[0]) == (404, 405, 204)
+    assert health[1]["capacity"] == ingest.QUEUE_MAX
+
+
+def test_token_and_origin_guard_posts(tmp_path):
+    app = "http://trainer.lab:8501"
+
+    async def go(i):
+        return [(await i.route("POST", target, body(line("a", 1)), {"origin": origin}))[0]
+                for target, origin in (("/ingest", app), ("/ingest?token=nope", app),
+                                       ("/ingest?token=s3cret", "http://evil.example"), ("/ingest?token=s3cret", app))]
+
+    i, statuses = serve(tmp_path / "t.db", go, token="s3cret", origins=frozenset({app}))
+    assert statuses == [403, 403, 403, 200]
+    assert count(tmp_path / "t.db", "events") == len(json.loads(line("a", 1))["events"])
+    assert i.cors(app)["Access-Control-Allow-Origin"] == app
+
+
+def test_non_loopback_bind_needs_a_token(monkeypatch):
+    assert ingest.loopback("127.0.0.1") and ingest.loopback("::1") and ingest.loopback("localhost")
+    assert not ingest.loopback("0.0.0.0") and not ingest.loopback("trainer.lab")
+    monkeypatch.setattr(ingest, "TOKEN", "")
+    with pytest.raises(SystemExit, match="TRAINER_INGEST_TOKEN"):
+        asyncio.run(ingest.main("0.0.0.0", 0, ":memory:"))
+
+
+def test_service_end_to_end(tmp_path):
+    """Boards posting through a small queue: some posts are refused, every
+    event still lands exactly once."""
+    path = tmp_path / "t.db"
+
+    async def go(i):
+        speedup, ingest.SPEEDUP = ingest.SPEEDUP, 200
+        try:
+            port = i._server.sockets[0].getsockname()[1]
+            return await asyncio.gather(*(ingest.board("127.0.0.1", port, f"b{n}", 5) for n in range(40)))
+        finally:
+            ingest.SPEEDUP = speedup
+
+    i, _ = serve(path, go, queue_max=20)
+    assert count(path, "events") == 40 * 5 * 4
+    assert count(path, "sessions") == 40
+    assert i.written == 40 * 5
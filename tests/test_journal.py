@@ -0,0 +1,62 @@
+import pytest
+
+from trainer.engine import Rules, Session
+from trainer.journal import Journal, latest, load
+from trainer.store import connect, init, write
+
+from helpers import random_ops
+
+
+@pytest.fixture(scope="module")
+def rules():
+    return Rules()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_replay_matches_snapshots(rules, seed):
+    """Rebuilding from any stored snapshot plus the ops after it lands on
+    the same board as replaying everything from the start."""
+    ops = random_ops(rules, 300, seed=seed)
+    base = Session(rules, start_ms=1_000).to_snapshot("s")
+    j = Journal(rules, base, "s", every=25)
+    for op in ops:
+        j.append(op)
+    for n in (0, 1, 24, 25, 26, 137, 250, 300):
+        whole = Session(rules, start_ms=1_000)
+        whole.replay(ops[:n])
+        assert j.at(n=n).to_snapshot("s") == whole.to_snapshot("s")
+    assert j.head().to_snapshot("s") == j.at().to_snapshot("s")
+
+
+class Store:
+    """The read side of ``SessionStore`` over one connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def query(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+
+def test_load_and_latest_from_the_store(rules, tmp_path):
+    ops = random_ops(rules, 120, seed=9)
+    j = Journal(rules, Session(rules, start_ms=1_000).to_snapshot("s"), "s", every=25)
+    for op in ops:
+        j.append(op)
+    events = [{"type": "op", "t": op[1], "n": n, "op": op[0], "a": op[2], "b": op[3], "c": op[4]}
+              for n, op in enumerate(ops)]
+    events += [{"type": "snapshot", "t": t, "n": n, "snap": snap} for n, t, snap in zip(j.snap_n, j.snap_t, j.snaps)]
+    summary = {"score": 0, "wrong": 0, "quiz_streak": 0, "best_streak": 0, "locked": 0, "parts": 18,
+               "elapsed_s": 0, "grade": "F"}
+    conn = connect(tmp_path / "t.db")
+    init(conn)
+    write(conn, [("c", {"session": "s", "seq": 1, "events": events, "summary": summary})])
+    store = Store(conn)
+
+    loaded = load(store, rules, "s")
+    assert loaded.snap_n == j.snap_n
+    assert loaded.at(n=60).to_snapshot("s") == j.at(n=60).to_snapshot("s")
+    n, s = latest(store, rules, "s")
+    assert n == len(ops) and s.to_snapshot("s") == j.head().to_snapshot("s")
+    assert load(store, rules, "nope") is None and latest(store, rules, "nope") is None
+    conn.close()
@@ -0,0 +1,83 @@
+"""The board's JS against the Python engine, through node (skipped without it)."""
+import json
+import random
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trainer.catalog import AIRFRAMES
+from trainer.engine import Rules, Session
+
+from helpers import build_plan, random_ops
+
+FRONTEND = Path(__file__).resolve().parents[1] / "trainer" / "frontend"
+NODE = shutil.which("node")
+
+pytestmark = pytest.mark.skipif(NODE is None, reason="node not installed")
+
+
+def run_js(scripts, body, data):
+    """Run ``body`` after ``scripts`` with ``DATA`` bound; returns its JSON output."""
+    src = "\n".join((FRONTEND / s).read_text() for s in scripts)
+    prog = f"{src}\nconst DATA = {json.dumps(data)};\nprocess.stdout.write(JSON.stringify((() => {{ {body} }})()));"
+    out = subprocess.run([NODE], input=prog, capture_output=True, text=True, timeout=60, check=True)
+    return json.loads(out.stdout)
+
+
+@pytest.mark.parametrize("airframe", sorted(AIRFRAMES))
+def test_nearest_zone(airframe):
+    rules = Rules(AIRFRAMES[airframe]())
+    rng = random.Random(7)
+    points = [(rng.uniform(-0.05, 1.05), rng.uniform(-0.05, 1.05)) for _ in range(3_000)]
+    for z in range(len(rules.zone_x)):      # and a few right around every zone
+        points += [(rules.zone_x[z] + rng.uniform(-0.06, 0.06), rules.zone_y[z] + rng.uniform(-0.06, 0.06))
+                   for _ in range(5)]
+    body = "const g = ZoneGrid.create(DATA.cat); return DATA.pts.map(([x, y]) => g.nearestIndex(x, y));"
+    got = run_js(["spatial.js"], body, {"cat": rules.catalog, "pts": points})
+    assert got == [rules.nearest_zone(x, y) for x, y in points]
+
+
+@pytest.mark.parametrize("airframe", sorted(AIRFRAMES))
+def test_build_order(airframe):
+    rules = Rules(AIRFRAMES[airframe]())
+    plan = [z for _, z in build_plan(rules)]
+    body = """
+      const o = BuildOrder.create(DATA.cat), n = DATA.cat.zones.length, out = [];
+      for (const z of DATA.plan) {
+        const row = [];
+        for (let i = 0; i < n; i++) row.push(o.ready(i) ? 1 : 0);
+        out.push(row);
+        o.fill(z);
+      }
+      return out;"""
+    got = run_js(["order.js"], body, {"cat": rules.catalog, "plan": plan})
+    s = Session(rules)
+    for row, (part, z) in zip(got, build_plan(rules)):
+        assert row == [int(not m) for m in s.missing]
+        s.fill(z, part)
+
+
+def test_compute_grade():
+    src = (FRONTEND / "trainer.js").read_text()
+    fn = re.search(r"\n  function computeGrade\(\) \{.*?\n  \}\n", src, re.S).group(0)
+    rules = Rules()
+    cases = []
+    for seed in range(60):
+        s = Session(rules, start_ms=0)
+        s.replay(random_ops(rules, 5 + 4 * seed, seed=seed, t0=0))
+        now = 20_000 * seed + 999
+        cases.append(({"wrong": s.wrong, "best_streak": s.best_streak, "start_ms": 0, "attempts": s.attempts,
+                       "correct": s.correct, "now": now}, s.grade(now)))
+    body = f"""
+      return DATA.map(c => {{
+        const state = {{wrong: c.wrong, best_streak: c.best_streak, start_ms: c.start_ms}};
+        const tally = {{attempts: c.attempts, correct: c.correct}};
+        const elapsedS = () => Math.floor((c.now - state.start_ms) / 1000);
+        {fn}
+        return computeGrade();
+      }});"""
+    got = run_js([], body, [c for c, _ in cases])
+    assert got == [g for _, g in cases]
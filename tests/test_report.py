@@ -0,0 +1,56 @@
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from trainer import report
+from trainer.catalog import AIRFRAMES
+from trainer.engine import Rules, Session
+from trainer.store import SessionStore
+
+from helpers import build_plan
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    rules = Rules(AIRFRAMES["quad"]())
+    store = SessionStore(tmp_path_factory.mktemp("report") / "t.db")
+    summary = {"score": 0, "wrong": 0, "quiz_streak": 0, "best_streak": 0, "locked": 0, "parts": rules.n_parts,
+               "elapsed_s": 60, "grade": "B"}
+    for n in range(3):
+        s = Session(rules, start_ms=1_000)
+        for t, (part, z) in enumerate(build_plan(rules)[:4 + 5 * n]):
+            s.drop(part, rules.zone_x[z], rules.zone_y[z], t)
+            s.answer(t % 3 != 0)
+        snap = s.to_snapshot(f"s{n}")
+        if n == 2:
+            snap["c"] = "older"
+        store.submit({"session": f"s{n}", "seq": 1, "summary": summary,
+                      "events": [{"type": "snapshot", "t": 1_000, "n": 0, "snap": snap}]}, "c")
+    store.flush()
+    return store
+
+
+def test_skips_sessions_from_another_catalog(store):
+    specs, skipped = report.card_specs(store, "c", "quad")
+    assert [s["id"] for s in specs] == ["s0", "s1"]
+    assert skipped == ["s2"]
+
+    data, cards, n_skipped = report.export_zip(store, "c", "quad", workers=1)
+    names = zipfile.ZipFile(io.BytesIO(data)).namelist()
+    assert (cards, n_skipped) == (2, 1)
+    assert sorted(names) == ["s0.png", "s1.png", "skipped.txt"]
+
+
+def test_concurrent_renders_match(store):
+    specs, _ = report.card_specs(store, "c", "quad")
+    quad, hex_ = AIRFRAMES["quad"](), AIRFRAMES["hex"]()
+    expected = [png for _, png in report.render_cards(specs, quad, workers=1)]
+
+    def render(catalog):
+        return [png for _, png in report.render_cards(specs if catalog is quad else [], catalog, workers=1)]
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(render, [quad, hex_] * 8))
+    assert all(r == expected for r in results[::2])
@@ -0,0 +1,139 @@
+import pytest
+
+from trainer.store import SCHEMA, connect, init, write
+
+
+@pytest.fixture
+def conn(tmp_path):
+    c = connect(tmp_path / "t.db")
+    init(c)
+    yield c
+    c.close()
+
+
+def summary(grade="B", **kw):
+    return dict({"score": 0, "wrong": 0, "quiz_streak": 0, "best_streak": 0, "locked": 0, "parts": 18,
+                 "elapsed_s": 0, "grade": grade}, **kw)
+
+
+def quiz(n, kind, correct):
+    return {"type": "quiz", "t": n, "event_id": f"{n}_p_z", "kind": kind, "correct": correct, "streak": 0}
+
+
+def wrong(t, kind="motor", zone="z_prop_tl", outcome="wrong_zone"):
+    return {"type": "drop", "t": t, "part": "motor_1", "kind": kind, "zone": zone, "outcome": outcome}
+
+
+def batch(session, seq, t, **kw):
+    """A batch whose newest event is at ``t``."""
+    return {"session": session, "seq": seq, "events": [quiz(t, "motor", 1)], "summary": summary(**kw)}
+
+
+def rows(conn, sql):
+    return sorted(conn.execute(sql).fetchall())
+
+
+def test_events_are_stored_once(conn):
+    b = {"session": "s1", "seq": 1, "events": [quiz(1, "motor", 1), quiz(2, "motor", 0)], "summary": summary()}
+    write(conn, [("c", b)])
+    write(conn, [("c", b)])
+    assert rows(conn, "SELECT event_id, correct FROM quiz") == [("1_p_z", 1), ("2_p_z", 0)]
+
+
+def test_older_summary_never_replaces_a_newer_one(conn):
+    write(conn, [("c", batch("s1", 1, 100, score=10)), ("c", batch("s1", 3, 300, score=30))])
+    assert rows(conn, "SELECT updated_ms, score FROM sessions") == [(300, 30)]
+    # resent, or overtaken by a later post: the session keeps its newest metrics
+    write(conn, [("c", batch("s1", 2, 200, score=20))])
+    write(conn, [("c", batch("s1", 3, 300, score=30)), ("c", batch("s1", 1, 100, score=10))])
+    assert rows(conn, "SELECT updated_ms, score FROM sessions") == [(300, 30)]
+    write(conn, [("c", batch("s1", 4, 400, score=40))])
+    assert rows(conn, "SELECT updated_ms, score FROM sessions") == [(400, 40)]
+
+
+def test_quiz_aggregates_ignore_resent_events(conn):
+    b = {"session": "s1", "seq": 1, "events": [quiz(1, "motor", 1), quiz(2, "motor", 0), quiz(3, "esc", 1)],
+         "summary": summary()}
+    write(conn, [("c", b)])
+    write(conn, [("c", b)])
+    assert rows(conn, "SELECT * FROM agg_quiz") == [("c", "esc", 1, 1), ("c", "motor", 2, 1)]
+
+
+def test_grade_aggregates_follow_the_session(conn):
+    write(conn, [("c", batch("s1", 1, 100, grade="C")), ("c", batch("s2", 1, 100, grade="C"))])
+    assert rows(conn, "SELECT grade, n FROM agg_grade") == [("C", 2)]
+    write(conn, [("c", batch("s1", 2, 200, grade="A"))])
+    assert rows(conn, "SELECT grade, n FROM agg_grade") == [("A", 1), ("C", 1)]
+    write(conn, [("c", batch("s1", 1, 100, grade="C"))])       # resent: no double count
+    assert rows(conn, "SELECT grade, n FROM agg_grade") == [("A", 1), ("C", 1)]
+
+
+def test_wrong_zone_aggregates(conn):
+    b = {"session": "s1", "seq": 1, "summary": summary(),
+         "events": [wrong(1), wrong(2), wrong(3, outcome="occupied"), wrong(4, "esc", "z_pdb")]}
+    write(conn, [("c", b)])
+    # resent, as a lost ack or the Streamlit fallback would (merged, under a later seq)
+    write(conn, [("c", dict(b, seq=7, events=b["events"] + [wrong(5)]))])
+    assert rows(conn, "SELECT * FROM agg_wrong") == [("c", "esc", "z_pdb", 1), ("c", "motor", "z_prop_tl", 3)]
+    assert conn.execute("SELECT COUNT(*) FROM wrong_drops").fetchone() == (5,)
+
+
+def test_older_database_gets_keyed(tmp_path):
+    conn = connect(tmp_path / "old.db")
+    conn.executescript(SCHEMA)
+    conn.execute("CREATE INDEX wrong_drops_session ON wrong_drops (session_id)")
+    b = {"session": "s1", "seq": 1, "summary": summary(), "events": [wrong(1), wrong(2)]}
+    write(conn, [("c", b)])
+    write(conn, [("c", b)])
+    assert rows(conn, "SELECT n FROM agg_wrong") == [(4,)]
+
+    init(conn)
+    assert rows(conn, "SELECT n FROM agg_wrong") == [(2,)]
+    write(conn, [("c", b)])
+    assert rows(conn, "SELECT n FROM agg_wrong") == [(2,)]
+    assert conn.execute("SELECT COUNT(*) FROM wrong_drops").fetchone() == (2,)
+    init(conn)
+    conn.close()
+
+
+# sessions and wrong_drops as the first store wrote them, before cohorts
+PRE_COHORT = """
+CREATE TABLE sessions (session_id TEXT PRIMARY KEY, started_ms INTEGER NOT NULL, updated_ms INTEGER NOT NULL,
+    score INTEGER NOT NULL, wrong INTEGER NOT NULL, quiz_streak INTEGER NOT NULL, best_streak INTEGER NOT NULL,
+    locked INTEGER NOT NULL, parts INTEGER NOT NULL, elapsed_s INTEGER NOT NULL, grade TEXT NOT NULL);
+CREATE TABLE quiz (session_id TEXT NOT NULL, event_id TEXT NOT NULL, t_ms INTEGER NOT NULL, kind TEXT NOT NULL,
+    correct INTEGER NOT NULL, streak INTEGER NOT NULL, PRIMARY KEY (session_id, event_id)) WITHOUT ROWID;
+CREATE TABLE wrong_drops (session_id TEXT NOT NULL, t_ms INTEGER NOT NULL, part TEXT NOT NULL, zone TEXT NOT NULL,
+    outcome TEXT NOT NULL);
+CREATE INDEX wrong_drops_session ON wrong_drops (session_id);
+INSERT INTO sessions VALUES ('s1', 1, 5, 10, 2, 0, 1, 1, 18, 4, 'B'), ('s2', 1, 5, 50, 0, 0, 3, 9, 18, 4, 'A');
+INSERT INTO quiz VALUES ('s1', 'q1', 2, 'motor', 1, 1), ('s1', 'q2', 3, 'motor', 0, 0), ('s2', 'q1', 2, 'esc', 1, 1);
+INSERT INTO wrong_drops VALUES ('s1', 3, 'ant_1', 'z_vtx', 'wrong_zone'), ('s1', 4, 'motor_2', 'z_pdb', 'occupied');
+"""
+
+
+def test_database_from_before_cohorts_opens(tmp_path):
+    conn = connect(tmp_path / "old.db")
+    conn.executescript(PRE_COHORT)
+    init(conn)
+    assert rows(conn, "SELECT session_id, cohort FROM sessions") == [("s1", "default"), ("s2", "default")]
+    assert rows(conn, "SELECT part, kind FROM wrong_drops") == [("ant_1", "antenna"), ("motor_2", "motor")]
+    assert rows(conn, "SELECT * FROM agg_quiz") == [("default", "esc", 1, 1), ("default", "motor", 2, 1)]
+    assert rows(conn, "SELECT * FROM agg_grade") == [("default", "A", 1), ("default", "B", 1)]
+    assert rows(conn, "SELECT * FROM agg_wrong") == [("default", "antenna", "z_vtx", 1)]
+
+    write(conn, [("default", batch("s1", 9, 9, grade="A"))])
+    assert rows(conn, "SELECT * FROM agg_grade") == [("default", "A", 2), ("default", "B", 0)]
+    assert rows(conn, "SELECT * FROM agg_quiz") == [("default", "esc", 1, 1), ("default", "motor", 3, 2)]
+    init(conn)
+    assert rows(conn, "SELECT * FROM agg_grade") == [("default", "A", 2), ("default", "B", 0)]
+    conn.close()
+
+
+def test_failed_write_rolls_back(conn):
+    bad = {"session": "s1", "seq": 1, "events": [quiz(1, "motor", 1)], "summary": summary(score=None)}
+    with pytest.raises(Exception):
+        write(conn, [("c", bad)])
+    assert rows(conn, "SELECT * FROM quiz") == []
+    assert rows(conn, "SELECT * FROM agg_quiz") == []
+    assert rows(conn, "SELECT * FROM sessions") == []
@@ -0,0 +1,138 @@
+"""Procedural airframes: hexacopter, octocopter and fixed-wing builds.
+
+The quad in ``catalog.py`` is written out by hand. These larger builds,
+fasteners and wiring harnesses included, are laid out from templates in
+"view units" (one unit is the width or height of the quad board) around
+the airframe centre. They are then normalized onto a square world ``world``
+units across, which the board pans over.
+
+Items are ``(x, y, kind, name)``, optionally followed by a zone group; each
+multirotor arm is a group, so the catalog's assembly order (ESC, motor, then
+prop) holds per arm.
+"""
+import math
+
+SPACING = 0.13          # centre-to-centre distance between neighbouring zones, view units
+MARGIN = 0.25
+
+LABELS = {
+    "prop": "Prop", "motor": "Motor", "esc": "ESC", "pdb": "PDB", "fc": "FC", "rx": "RX",
+    "vtx": "VTX", "antenna": "ANT", "camera": "CAM", "fastener": "Screw", "harness": "Lead",
+    "servo": "Servo",
+}
+
+# One arm, as (distance from centre, lane, kind, name); lanes are SPACING
+# apart across the arm. Outer lanes (|lane| = 2) start far enough out to
+# clear the neighbouring arm.
+ARM = [
+    (4, 0, "harness", "Power lead"),
+    (4, -1, "fastener", "Arm bolt"), (4, 1, "fastener", "Arm bolt"),
+    (5, 0, "harness", "LED strip"),
+    (5, -1, "fastener", "Arm bolt"), (5, 1, "fastener", "Arm bolt"),
+    (6, 0, "harness", "Signal lead"),
+    (6, -1, "fastener", "Zip tie"), (6, 1, "fastener", "Zip tie"),
+    (7, 0, "esc", "ESC"),
+    (7, -1, "fastener", "ESC screw"), (7, 1, "fastener", "ESC screw"),
+    (7, -2, "fastener", "ESC standoff"), (7, 2, "fastener", "ESC standoff"),
+    (8, 0, "harness", "Phase wires"),
+    (8, -1, "fastener", "Zip tie"), (8, 1, "fastener", "Zip tie"),
+    (9, 0, "motor", "Motor"),
+    (9, -1, "fastener", "Motor screw"), (9, 1, "fastener", "Motor screw"),
+    (9, -2, "fastener", "Motor mount bolt"), (9, 2, "fastener", "Motor mount bolt"),
+    (10, 0, "harness", "Motor lead"),
+    (10, -1, "fastener", "Motor screw"), (10, 1, "fastener", "Motor screw"),
+    (11, 0, "prop", "Prop"),
+    (11, -1, "fastener", "Prop washer"), (11, 1, "fastener", "Prop washer"),
+    (11, -2, "fastener", "Guard screw"), (11, 2, "fastener", "Guard screw"),
+    (12, 0, "fastener", "Prop nut"),
+    (12, -1, "fastener", "Guard screw"), (12, 1, "fastener", "Guard screw"),
+    (12, -2, "fastener", "Guard screw"), (12, 2, "fastener", "Guard screw"),
+    (13, -1, "fastener", "Guard clip"), (13, 1, "fastener", "Guard clip"),
+]
+
+# Centre stack on a SPACING grid, as (col, row, kind, name).
+CORE = [
+    (0, 0, "fc", "Flight Ctrl"), (0, -1, "pdb", "PDB"), (-1, 0, "rx", "Receiver"), (1, 0, "vtx", "VTX"),
+    (0, -2, "antenna", "Antenna"), (0, 2, "camera", "Camera"),
+    (-1, -1, "fastener", "Stack screw"), (1, -1, "fastener", "Stack screw"),
+    (-1, 1, "fastener", "Stack screw"), (1, 1, "fastener", "Stack screw"),
+    (-2, -1, "fastener", "Standoff"), (2, -1, "fastener", "Standoff"),
+    (-2, 1, "fastener", "Standoff"), (2, 1, "fastener", "Standoff"),
+    (-1, 2, "fastener", "Camera screw"), (1, 2, "fastener", "Camera screw"),
+    (-1, -2, "fastener", "Antenna mount"), (1, -2, "harness", "VTX lead"),
+    (-2, 0, "harness", "RX lead"), (2, 0, "harness", "ESC ribbon"),
+    (0, 1, "harness", "Battery lead"), (-2, 2, "harness", "Camera lead"),
+    (2, 2, "harness", "XT60 pigtail"), (-2, -2, "fastener", "Plate bolt"), (2, -2, "fastener", "Plate bolt"),
+]
+
+
+def multirotor(arms):
+    """Hub-and-spoke frame with ``arms`` arms (the first points up)."""
+    items = [(c * SPACING, r * SPACING, kind, name) for c, r, kind, name in CORE]
+    for a in range(arms):
+        theta = 2 * math.pi * a / arms - math.pi / 2
+        dx, dy = math.cos(theta), math.sin(theta)
+        for step, lane, kind, name in ARM:
+            r, off = step * SPACING, lane * SPACING
+            items.append((dx * r - dy * off, dy * r + dx * off, kind, f"{name} (arm {a + 1})", f"arm{a + 1}"))
+    return items
+
+
+def fixed_wing(length=32, stations=18):
+    """Fuselage ``length`` zones long along x, wings and tailplane along y."""
+    s = SPACING
+    fuselage = ["prop", "fastener", "motor", "esc", "harness", "pdb", "harness", "fc", "rx", "vtx",
+                "harness", "camera", "antenna"]
+    names = {"fastener": "Spinner nut", "harness": "Fuselage lead"}
+    items = []
+    x0 = -(length // 2) * s
+    for i, kind in enumerate(fuselage):
+        items.append((x0 + i * s, 0.0, kind, names.get(kind, LABELS[kind])))
+    # fuselage sides: screws and wiring, the full length of the body
+    for i in range(length):
+        for lane in (-2, -1, 1, 2):
+            kind = "fastener" if (i + lane) % 3 else "harness"
+            items.append((x0 + i * s, lane * s, kind, "Fuselage screw" if kind == "fastener" else "Servo extension"))
+    # wings: leading edge, spar, trailing edge and aileron hinge line per station
+    wing_x = x0 + 10 * s
+    for side, tag in ((-1, "L"), (1, "R")):
+        for j in range(stations):
+            y = side * (3 + j) * s
+            servo_bay = j in (4, 5)
+            items += [
+                (wing_x - s, y, "fastener", f"Rib screw ({tag}{j + 1})"),
+                (wing_x, y, "harness" if j < 4 else "fastener", f"Spar {'lead' if j < 4 else 'bolt'} ({tag}{j + 1})"),
+                (wing_x + s, y, "servo" if servo_bay else "fastener",
+                 f"{'Aileron servo' if servo_bay else 'Hinge'} ({tag}{j + 1})"),
+                (wing_x + 2 * s, y, "fastener", f"{'Control horn' if servo_bay else 'Hinge pin'} ({tag}{j + 1})"),
+            ]
+    # tailplane
+    tail_x = x0 + (length - 2) * s
+    for side, tag in ((-1, "L"), (1, "R")):
+        for j in range(5):
+            y = side * (3 + j) * s
+            items += [
+                (tail_x, y, "servo" if j == 1 else "fastener", f"{'Elevator servo' if j == 1 else 'Stab screw'} ({tag}{j + 1})"),
+                (tail_x + s, y, "fastener", f"Elevator hinge ({tag}{j + 1})"),
+            ]
+    items.append((tail_x, 0.0, "servo", "Rudder servo"))
+    items.append((tail_x + s, 0.0, "fastener", "Rudder horn"))
+    return items
+
+
+def layout(items):
+    """Normalize template items onto a square world; returns (zones, parts, world)."""
+    extent = max(max(abs(x), abs(y)) for x, y, *_ in items) + MARGIN
+    world = max(1, math.ceil(2 * extent))
+    zones, parts, counts = [], [], {}
+    for i, (x, y, kind, name, *group) in enumerate(items):
+        n = counts[kind] = counts.get(kind, 0) + 1
+        zone = {"key": f"z{i:03d}_{kind}", "name": name,
+                "x": round(0.5 + x / world, 5), "y": round(0.5 + y / world, 5), "allow": [kind]}
+        if group:
+            zone["group"] = group[0]
+        zones.append(zone)
+        parts.append({"id": f"{kind}_{n}", "label": f"{LABELS[kind]} {n}", "kind": kind})
+    order = list(LABELS)
+    parts.sort(key=lambda p: order.index(p["kind"]))
+    return zones, parts, world
@@ -0,0 +1,298 @@
+"""Trainer frontend packaging.
+
+The board lives in ``frontend/`` as plain HTML/CSS/JS. Two delivery modes:
+
+* ``bundle`` (default) - the vendored Konva (``frontend/vendor``, pinned to
+  ``KONVA_VERSION``; building without it is an error, there is no CDN
+  fallback), the stylesheet and the concatenated trainer script are written
+  out under content-hashed names and served as a Streamlit component, so a
+  rerun only resends the component args. Streamlit serves component files
+  with a plain ``Cache-Control: public`` (no max-age), so browsers still
+  revalidate them; set ``TRAINER_ASSET_PORT`` to serve the bundle from a
+  side server that sends ``immutable`` for the hashed files instead.
+* ``inline`` - the legacy one-file page pushed through ``components.html``,
+  with the same vendored Konva embedded in it.
+
+Each airframe gets its own bundle directory (catalog and atlas differ) and
+its own component. The classroom view (many read-only boards on one page,
+see ``classroom_board``) is a second, smaller bundle per airframe under
+``BUILD_DIR/classroom``; it is always served as a component.
+
+``BUILD_DIR`` is private to this user and this install (``TRAINER_BUILD_DIR``
+overrides it): builds prune files they didn't write, so two checkouts must
+never share one, and nothing served as script may sit in a shared /tmp.
+"""
+import base64
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from trainer.atlas import atlas_manifest, load_atlas
+from trainer.catalog import AIRFRAMES, DEFAULT_AIRFRAME, catalog_js, load_catalog
+from trainer.sfx import load_sfx
+
+FRONTEND_DIR = Path(__file__).parent / "frontend"
+VENDOR_DIR = FRONTEND_DIR / "vendor"
+
+
+def _build_root():
+    if os.environ.get("TRAINER_BUILD_DIR"):
+        return Path(os.environ["TRAINER_BUILD_DIR"])
+    cache = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or Path.home() / ".cache"
+    install = hashlib.sha256(str(FRONTEND_DIR.resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(cache) / "drone_trainer" / f"build-{install}"
+
+
+BUILD_DIR = _build_root()
+
+KONVA_VERSION = "9.3.22"
+KONVA_FILE = VENDOR_DIR / "konva.min.js"
+
+# Concatenated in this order into a single trainer.<hash>.js.
+SCRIPTS = ("bridge.js", "perf.js", "sheet.js", "spatial.js", "order.js", "pool.js", "idb.js", "persist.js",
+           "journal.js", "recall.js", "outbox.js", "sound.js", "trainer.js")
+STYLES = ("trainer.css",)
+CLASSROOM_SCRIPTS = ("bridge.js", "perf.js", "sheet.js", "persist.js", "classroom.js")
+CLASSROOM_STYLES = ("trainer.css", "classroom.css")
+
+ASSET_MODE = os.environ.get("TRAINER_ASSETS", "bundle")
+ASSET_PORT = int(os.environ.get("TRAINER_ASSET_PORT", "0") or 0)
+ASSET_URL = os.environ.get("TRAINER_ASSET_URL", "")
+INGEST_URL = os.environ.get("TRAINER_INGEST_URL", "")      # see trainer/ingest.py
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _read(name):
+    return (FRONTEND_DIR / name).read_text(encoding="utf-8")
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _emit(out_dir, stem, ext, data):
+    name = f"{stem}.{_digest(data)}.{ext}"
+    path = out_dir / name
+    if not path.exists():
+        _write_atomic(path, data)
+    return name
+
+
+def _check_konva(data, version=KONVA_VERSION):
+    # konva.min.js opens with a "Konva JavaScript Framework v<version>" banner
+    if f"Konva JavaScript Framework v{version}".encode("ascii") not in data[:512]:
+        raise RuntimeError(f"{KONVA_FILE} is not Konva {version}; run `python -m trainer.assets vendor`")
+    return data
+
+
+def konva_bytes():
+    """The vendored Konva build; a bundle without it is a build error."""
+    try:
+        data = KONVA_FILE.read_bytes()
+    except FileNotFoundError:
+        raise RuntimeError(f"{KONVA_FILE} is missing; run `python -m trainer.assets vendor` "
+                           f"(the trainer never falls back to the CDN)") from None
+    return _check_konva(data)
+
+
+def _page(head, scripts, template="index.html"):
+    return Template(_read(template)).substitute(head=head, scripts=scripts)
+
+
+def _atlas(catalog):
+    return load_atlas(tuple(catalog["kinds"]))
+
+
+def atlas_js(manifest):
+    return f"window.TRAINER_ATLAS = {json.dumps(manifest, separators=(',', ':'))};\n"
+
+
+def sfx_js(manifest):
+    return f"window.TRAINER_SFX = {json.dumps(manifest, separators=(',', ':'))};\n"
+
+
+def build_bundle(airframe=DEFAULT_AIRFRAME, out_dir=None):
+    """Write an airframe's hashed bundle (by default into ``BUILD_DIR/<airframe>``)
+    and return its manifest.
+
+    Files are only written when their hash is new, and stale hashed files from
+    earlier builds are pruned, so the directory always mirrors the sources.
+    """
+    return _build(out_dir or BUILD_DIR / airframe, airframe, SCRIPTS, STYLES, "index.html", sfx=True)
+
+
+def build_classroom(airframe=DEFAULT_AIRFRAME, out_dir=None):
+    """Write an airframe's classroom bundle (by default into
+    ``BUILD_DIR/classroom/<airframe>``) and return its manifest."""
+    return _build(out_dir or BUILD_DIR / "classroom" / airframe, airframe,
+                  CLASSROOM_SCRIPTS, CLASSROOM_STYLES, "classroom.html", sfx=False)
+
+
+def _build(out_dir, airframe, script_names, style_names, template, sfx):
+    out_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    catalog = load_catalog(airframe)
+    js = "\n".join(_read(n) for n in script_names).encode("utf-8")
+    css = "\n".join(_read(n) for n in style_names).encode("utf-8")
+    cat = catalog_js(catalog).encode("utf-8")
+    atlas = _atlas(catalog)
+    sheets = {dpr: _emit(out_dir, f"atlas@{dpr}x", "png", png) for dpr, (png, _, _) in atlas.items()}
+    sprite = atlas_js(atlas_manifest(atlas, sheets)).encode("utf-8")
+
+    manifest = {
+        "catalog.js": _emit(out_dir, "catalog", "js", cat),
+        "atlas.js": _emit(out_dir, "atlas", "js", sprite),
+    }
+    if sfx:
+        manifest["sfx.js"] = _emit(out_dir, "sfx", "js", sfx_js(load_sfx()).encode("utf-8"))
+    manifest["trainer.js"] = _emit(out_dir, "trainer", "js", js)
+    manifest["trainer.css"] = _emit(out_dir, "trainer", "css", css)
+    manifest["konva.js"] = _emit(out_dir, "konva", "js", konva_bytes())
+
+    head = "\n  ".join([
+        f'<link rel="stylesheet" href="{manifest["trainer.css"]}"/>',
+        f'<script src="{manifest["konva.js"]}"></script>',
+    ])
+    scripts = "\n".join(f'<script src="{manifest[n]}"></script>'
+                        for n in ("catalog.js", "atlas.js", "sfx.js", "trainer.js") if n in manifest)
+    _write_atomic(out_dir / "index.html", _page(head, scripts, template).encode("utf-8"))
+
+    keep = set(manifest.values()) | set(sheets.values()) | {"index.html"}
+    for stale in out_dir.iterdir():
+        if stale.name not in keep and not stale.name.startswith(".") and stale.is_file():
+            stale.unlink(missing_ok=True)
+    return manifest
+
+
+def inline_page(airframe=DEFAULT_AIRFRAME):
+    """The whole trainer as one self-contained HTML string (vendored Konva)."""
+    catalog = load_catalog(airframe)
+    head = "\n  ".join([
+        "<script>\n" + konva_bytes().decode("utf-8") + "</script>",
+        "<style>\n" + "\n".join(_read(n) for n in STYLES) + "</style>",
+    ])
+    atlas = _atlas(catalog)
+    uris = {dpr: "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+            for dpr, (png, _, _) in atlas.items()}
+    scripts = "\n".join([
+        "<script>\n" + catalog_js(catalog) + atlas_js(atlas_manifest(atlas, uris)) + sfx_js(load_sfx()) + "</script>",
+        "<script>\n" + "\n".join(_read(n) for n in SCRIPTS) + "</script>",
+    ])
+    return _page(head, scripts)
+
+
+class _AssetHandler(SimpleHTTPRequestHandler):
+    """Static handler: hashed files are immutable, ``index.html`` revalidates."""
+
+    def end_headers(self):
+        name = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        hashed = name.count(".") >= 2
+        self.send_header("Cache-Control", IMMUTABLE if hashed else "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        super().end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_bundle(port, out_dir=BUILD_DIR):
+    handler = functools.partial(_AssetHandler, directory=str(out_dir))
+    server = ThreadingHTTPServer(("0.0.0.0", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="trainer-assets").start()
+    return server
+
+
+@st.cache_resource(show_spinner=False)
+def _asset_server():
+    return serve_bundle(ASSET_PORT)
+
+
+@st.cache_resource(show_spinner=False)
+def _bundled_component(airframe):
+    build_bundle(airframe)
+    name = "drone_trainer" if airframe == DEFAULT_AIRFRAME else f"drone_trainer_{airframe}"
+    if ASSET_PORT:
+        _asset_server()
+        url = ASSET_URL or f"http://localhost:{ASSET_PORT}"
+        return components.declare_component(name, url=f"{url.rstrip('/')}/{airframe}/")
+    return components.declare_component(name, path=str(BUILD_DIR / airframe))
+
+
+@st.cache_resource(show_spinner=False)
+def _classroom_component(airframe):
+    build_classroom(airframe)
+    name = f"drone_classroom_{airframe}"
+    if ASSET_PORT:
+        _asset_server()
+        url = ASSET_URL or f"http://localhost:{ASSET_PORT}"
+        return components.declare_component(name, url=f"{url.rstrip('/')}/classroom/{airframe}/")
+    return components.declare_component(name, path=str(BUILD_DIR / "classroom" / airframe))
+
+
+@st.cache_resource(show_spinner=False)
+def _inline_html(airframe):
+    return inline_page(airframe)
+
+
+def trainer_board(height=820, flush_ms=1000, key="board", airframe=DEFAULT_AIRFRAME, cohort="default"):
+    """Render the trainer board in the configured asset mode.
+
+    In bundle mode the board reports back: the return value is the latest
+    event batch (``{"session", "seq", "events", "summary"}``), sent at most
+    once per ``flush_ms``. With ``TRAINER_INGEST_URL`` set, batches go to the
+    ingest service tagged with ``cohort`` instead, and only come back here
+    when it can't be reached. Inline mode is one-way and returns ``None``.
+    """
+    if ASSET_MODE == "inline":
+        components.html(_inline_html(airframe), height=height, scrolling=False)
+        return None
+    return _bundled_component(airframe)(height=height, flush_ms=flush_ms, ingest_url=INGEST_URL, cohort=cohort,
+                                        key=key, default=None)
+
+
+def classroom_board(boards, cols=4, key="classroom", airframe=DEFAULT_AIRFRAME):
+    """Render several read-only boards in one component (one Konva, one icon
+    sheet, one timer loop for all of them).
+
+    ``boards`` is a list of ``{"id", "label", "v", "snap", "summary"}`` as
+    built by ``trainer.classroom.boards``; a board is only redrawn when its
+    ``v`` changes. The component sizes itself to fit its tiles.
+    """
+    _classroom_component(airframe)(boards=boards, cols=cols, key=key, default=None)
+
+
+def vendor_konva(version=KONVA_VERSION):
+    """Download the pinned Konva build into ``frontend/vendor``."""
+    url = f"https://unpkg.com/konva@{version}/konva.min.js"
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        data = _check_konva(resp.read(), version)
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    _write_atomic(KONVA_FILE, data)
+    return len(data)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["vendor"]:
+        print(f"konva {KONVA_VERSION}: {vendor_konva()} bytes -> {KONVA_FILE}")
+    else:
+        for airframe in sys.argv[1:] or AIRFRAMES:
+            for src, name in build_bundle(airframe).items():
+                print(f"{airframe:10} {src:12} {name}")
+            for src, name in build_classroom(airframe).items():
+                print(f"{airframe:10} {src:12} classroom/{name}")
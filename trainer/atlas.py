@@ -0,0 +1,247 @@
+"""Part icon sprite atlas.
+
+The technical icons used to be SVG strings decoded once per part in the
+browser. They are now drawn here with Pillow from the same 80x80 geometry,
+packed into one PNG per device-pixel ratio, and described by a manifest of
+crop rects, so the board decodes a single image however many parts it shows.
+
+The sheet also carries the locked-part glow, pre-blurred, so the board draws
+it as one image instead of a canvas shadow blur every frame.
+"""
+import io
+import math
+import re
+
+import streamlit as st
+from PIL import Image, ImageColor, ImageDraw, ImageFilter
+
+STROKE = "#00ff88"
+STROKE_W = 3
+VIEWBOX = 80
+ICON_PX = 74            # on-board icon size in CSS pixels
+PAD = 2                 # transparent gutter between cells, avoids bleeding
+SUPERSAMPLE = 4
+DPRS = (1, 2, 3)
+FALLBACK = "fc"
+
+GLOW = "glow"           # sprite key in the sheet
+GLOW_INSET = 10         # glow frame extends this far around the icon, CSS px
+GLOW_BLUR = 14          # matches the old shadowBlur; also the sprite's margin
+GLOW_OPACITY = 0.95
+GLOW_SHADOW = 0.6
+
+# Shapes in 80x80 viewBox units, mirroring the original SVG markup.
+#   ("rect", x, y, w, h, rx) / ("circle", cx, cy, r, filled) / ("path", d)
+ICONS = {
+    "prop": [
+        ("circle", 40, 40, 6, False),
+        ("path", "M40 40 C20 25, 16 18, 18 14 C22 10, 30 16, 40 28 Z"),
+        ("path", "M40 40 C60 25, 64 18, 62 14 C58 10, 50 16, 40 28 Z"),
+        ("path", "M40 40 C25 60, 18 64, 14 62 C10 58, 16 50, 28 40 Z"),
+        ("path", "M40 40 C55 60, 62 64, 66 62 C70 58, 64 50, 52 40 Z"),
+    ],
+    "motor": [
+        ("rect", 18, 18, 44, 44, 10),
+        ("circle", 40, 40, 12, False),
+        ("path", "M40 28 L40 52"), ("path", "M28 40 L52 40"),
+        ("circle", 40, 40, 3, True),
+    ],
+    "esc": [
+        ("rect", 16, 22, 48, 36, 6),
+        ("path", "M22 30 H58"), ("path", "M22 38 H58"), ("path", "M22 46 H58"),
+        ("path", "M24 58 C24 66, 18 66, 18 70"),
+        ("path", "M40 58 C40 66, 34 66, 34 70"),
+        ("path", "M56 58 C56 66, 62 66, 62 70"),
+    ],
+    "fc": [
+        ("rect", 18, 18, 44, 44, 8),
+        ("circle", 40, 40, 10, False),
+        ("path", "M10 28 H18"), ("path", "M10 40 H18"), ("path", "M10 52 H18"),
+        ("path", "M62 28 H70"), ("path", "M62 40 H70"), ("path", "M62 52 H70"),
+    ],
+    "pdb": [
+        ("rect", 14, 20, 52, 40, 10),
+        ("circle", 26, 40, 4, True), ("circle", 40, 40, 4, True), ("circle", 54, 40, 4, True),
+        ("path", "M40 20 V12"), ("path", "M36 12 H44"),
+    ],
+    "rx": [
+        ("rect", 18, 26, 44, 28, 6),
+        ("path", "M26 54 V70"), ("path", "M54 54 V70"),
+        ("path", "M40 26 V18"), ("circle", 40, 18, 4, True),
+    ],
+    "vtx": [
+        ("rect", 18, 24, 44, 32, 7),
+        ("path", "M26 56 V68"), ("path", "M54 56 V68"),
+        ("path", "M62 30 C70 34, 70 46, 62 50"), ("path", "M58 33 C64 36, 64 44, 58 47"),
+    ],
+    "antenna": [
+        ("path", "M40 64 V24"), ("circle", 40, 20, 5, True),
+        ("path", "M26 28 C18 36, 18 48, 26 56"),
+        ("path", "M54 28 C62 36, 62 48, 54 56"),
+        ("path", "M32 34 C28 38, 28 46, 32 50"),
+        ("path", "M48 34 C52 38, 52 46, 48 50"),
+    ],
+    "camera": [
+        ("rect", 16, 26, 48, 30, 8),
+        ("circle", 40, 41, 10, False), ("circle", 40, 41, 3, True),
+        ("path", "M24 26 L30 18 H50 L56 26"),
+    ],
+    "fastener": [
+        ("circle", 40, 24, 12, False),
+        ("path", "M34 24 H46"), ("path", "M40 18 V30"),
+        ("path", "M34 36 V68 L40 74 L46 68 V36"),
+        ("path", "M34 44 L46 48"), ("path", "M34 52 L46 56"), ("path", "M34 60 L46 64"),
+    ],
+    "harness": [
+        ("rect", 8, 30, 14, 20, 3), ("rect", 58, 30, 14, 20, 3),
+        ("path", "M22 34 C34 20, 46 48, 58 34"),
+        ("path", "M22 40 C34 26, 46 54, 58 40"),
+        ("path", "M22 46 C34 32, 46 60, 58 46"),
+    ],
+    "servo": [
+        ("rect", 16, 28, 48, 30, 5),
+        ("path", "M10 36 H16"), ("path", "M64 36 H70"),
+        ("circle", 30, 28, 6, True),
+        ("path", "M30 28 L30 12 L58 12"),
+        ("path", "M40 58 C40 66, 46 66, 46 72"),
+    ],
+}
+
+_TOKEN = re.compile(r"[MCLHVZ]|-?\d+(?:\.\d+)?")
+_BEZIER_STEPS = 16
+
+
+def _path_points(d):
+    """Flatten an absolute M/L/H/V/C/Z path into polylines."""
+    tokens = _TOKEN.findall(d)
+    lines, pts = [], []
+    x = y = 0.0
+    cmd, i = None, 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+        if cmd == "M":
+            if len(pts) > 1:
+                lines.append(pts)
+            x, y = float(tokens[i]), float(tokens[i + 1])
+            pts = [(x, y)]
+            i += 2
+        elif cmd == "L":
+            x, y = float(tokens[i]), float(tokens[i + 1])
+            pts.append((x, y))
+            i += 2
+        elif cmd == "H":
+            x = float(tokens[i])
+            pts.append((x, y))
+            i += 1
+        elif cmd == "V":
+            y = float(tokens[i])
+            pts.append((x, y))
+            i += 1
+        elif cmd == "C":
+            x1, y1, x2, y2, x3, y3 = (float(t) for t in tokens[i:i + 6])
+            for s in range(1, _BEZIER_STEPS + 1):
+                t = s / _BEZIER_STEPS
+                u = 1 - t
+                pts.append((u ** 3 * x + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t ** 3 * x3,
+                            u ** 3 * y + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t ** 3 * y3))
+            x, y = x3, y3
+            i += 6
+        elif cmd == "Z":
+            if pts:
+                pts.append(pts[0])
+                x, y = pts[0]
+            cmd = None
+        else:
+            raise ValueError(f"unsupported path command in {d!r}")
+    if len(pts) > 1:
+        lines.append(pts)
+    return lines
+
+
+def render_icon(kind, px, stroke=STROKE):
+    """One icon as an RGBA image of ``px`` x ``px`` pixels."""
+    big = px * SUPERSAMPLE
+    k = big / VIEWBOX
+    w = max(1, round(STROKE_W * k))
+    img = Image.new("RGBA", (big, big), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    for shape in ICONS.get(kind, ICONS[FALLBACK]):
+        if shape[0] == "rect":
+            _, x, y, rw, rh, rx = shape
+            draw.rounded_rectangle([x * k, y * k, (x + rw) * k, (y + rh) * k], radius=rx * k, outline=stroke, width=w)
+        elif shape[0] == "circle":
+            _, cx, cy, r, filled = shape
+            box = [(cx - r) * k, (cy - r) * k, (cx + r) * k, (cy + r) * k]
+            draw.ellipse(box, outline=stroke, width=w, fill=stroke if filled else None)
+        else:
+            for line in _path_points(shape[1]):
+                draw.line([(px_ * k, py_ * k) for px_, py_ in line], fill=stroke, width=w, joint="curve")
+
+    return img.resize((px, px), Image.LANCZOS)
+
+
+def render_glow(dpr, stroke=STROKE):
+    """The locked-part frame plus its blurred halo, ``GLOW_BLUR`` CSS px of
+    margin on every side."""
+    side = ICON_PX + 2 * GLOW_INSET
+    px = math.ceil((side + 2 * GLOW_BLUR) * dpr)
+    m = GLOW_BLUR * dpr
+    box = [m, m, m + side * dpr, m + side * dpr]
+    # transparent pixels carry the stroke colour too, so blurring only spreads alpha
+    frame = Image.new("RGBA", (px, px), ImageColor.getrgb(stroke) + (0,))
+    ImageDraw.Draw(frame).rounded_rectangle(box, radius=10 * dpr, outline=stroke, width=max(1, round(2 * dpr)))
+
+    # canvas shadowBlur b is a gaussian with sigma b / 2
+    halo = frame.filter(ImageFilter.GaussianBlur(GLOW_BLUR * dpr / 2))
+    halo.putalpha(halo.getchannel("A").point(lambda a: round(a * GLOW_SHADOW)))
+    frame.putalpha(frame.getchannel("A").point(lambda a: round(a * GLOW_OPACITY)))
+    return Image.alpha_composite(halo, frame)
+
+
+def build_sheet(kinds, dpr):
+    """Pack every kind (plus the glow, in a row of its own) at one pixel
+    ratio; returns (png bytes, size, rects)."""
+    cell = math.ceil(ICON_PX * dpr)
+    pad = PAD * dpr
+    cols = max(1, math.ceil(math.sqrt(len(kinds))))
+    rows = math.ceil(len(kinds) / cols)
+    glow = render_glow(dpr)
+    size = (max(cols * (cell + pad), glow.width + pad) + pad, rows * (cell + pad) + glow.height + 2 * pad)
+    sheet = Image.new("RGBA", size, (0, 0, 0, 0))
+
+    rects = {}
+    for n, kind in enumerate(kinds):
+        x = pad + (n % cols) * (cell + pad)
+        y = pad + (n // cols) * (cell + pad)
+        sheet.paste(render_icon(kind, cell), (x, y))
+        rects[kind] = [x, y, cell, cell]
+    y = pad + rows * (cell + pad)
+    sheet.paste(glow, (pad, y))
+    rects[GLOW] = [pad, y, glow.width, glow.height]
+
+    buf = io.BytesIO()
+    sheet.save(buf, format="PNG", optimize=True)
+    return buf.getvalue(), size, rects
+
+
+@st.cache_resource(show_spinner=False)
+def load_atlas(kinds):
+    """Sheets for every ratio in ``DPRS``, rendered once per process.
+
+    Returns ``{dpr: (png bytes, (w, h), {kind: [x, y, w, h]})}``.
+    """
+    return {dpr: build_sheet(list(kinds), dpr) for dpr in DPRS}
+
+
+def atlas_manifest(atlas, srcs):
+    """Board-side manifest; ``srcs`` maps each ratio to its image URL."""
+    return {
+        "icon": ICON_PX,
+        "fallback": FALLBACK,
+        "glow": {"key": GLOW, "inset": GLOW_INSET, "blur": GLOW_BLUR},
+        "sheets": {str(dpr): {"src": srcs[dpr], "size": list(size), "rects": rects}
+                   for dpr, (_, size, rects) in atlas.items()},
+    }
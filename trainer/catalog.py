@@ -0,0 +1,427 @@
+"""Build catalog: zones, parts and the lesson/quiz bank.
+
+Defined once in Python, validated, then compiled into the lookup tables the
+board uses at runtime (zone by key, part by id, allowed kinds as bitmasks), so
+nothing on the drop path has to scan a list.
+
+Quiz questions are ``[question, options, answer, level]`` with level 1
+(basic) to 3 (advanced); a JSON bank named by ``TRAINER_QUIZ_BANK`` adds to
+them. Each kind's questions are also listed easiest first (``quiz_order``),
+the order the board's scheduler (recall.js) introduces unseen ones in.
+
+Zones can name a ``group`` (an arm, say); ``ORDER`` rules apply within a
+group and are compiled into prerequisite bitsets per zone (``order``), so the
+board checks assembly order without walking the build.
+
+Besides the hand-written quad, ``AIRFRAMES`` offers the procedural hex, octo
+and fixed-wing builds from ``airframes.py``. Their boards are ``world`` times
+the view in each direction.
+"""
+import hashlib
+import json
+import math
+import os
+
+import streamlit as st
+
+from trainer import airframes
+
+ZONE_RADIUS_N = 0.055
+TRAY = -1               # part position while it sits in the tray
+
+ZONES = [
+    {"key": "z_prop_tl",  "name": "Prop (TL)",    "x": 0.18, "y": 0.22, "group": "tl", "allow": ["prop"]},
+    {"key": "z_prop_tr",  "name": "Prop (TR)",    "x": 0.82, "y": 0.22, "group": "tr", "allow": ["prop"]},
+    {"key": "z_prop_bl",  "name": "Prop (BL)",    "x": 0.18, "y": 0.78, "group": "bl", "allow": ["prop"]},
+    {"key": "z_prop_br",  "name": "Prop (BR)",    "x": 0.82, "y": 0.78, "group": "br", "allow": ["prop"]},
+
+    {"key": "z_motor_tl", "name": "Motor (TL)",   "x": 0.26, "y": 0.30, "group": "tl", "allow": ["motor"]},
+    {"key": "z_motor_tr", "name": "Motor (TR)",   "x": 0.74, "y": 0.30, "group": "tr", "allow": ["motor"]},
+    {"key": "z_motor_bl", "name": "Motor (BL)",   "x": 0.26, "y": 0.70, "group": "bl", "allow": ["motor"]},
+    {"key": "z_motor_br", "name": "Motor (BR)",   "x": 0.74, "y": 0.70, "group": "br", "allow": ["motor"]},
+
+    {"key": "z_esc_tl",   "name": "ESC (TL arm)", "x": 0.35, "y": 0.36, "group": "tl", "allow": ["esc"]},
+    {"key": "z_esc_tr",   "name": "ESC (TR arm)", "x": 0.65, "y": 0.36, "group": "tr", "allow": ["esc"]},
+    {"key": "z_esc_bl",   "name": "ESC (BL arm)", "x": 0.35, "y": 0.64, "group": "bl", "allow": ["esc"]},
+    {"key": "z_esc_br",   "name": "ESC (BR arm)", "x": 0.65, "y": 0.64, "group": "br", "allow": ["esc"]},
+
+    {"key": "z_rx",       "name": "Receiver",     "x": 0.42, "y": 0.34, "allow": ["rx"]},
+    {"key": "z_vtx",      "name": "VTX",          "x": 0.58, "y": 0.34, "allow": ["vtx"]},
+    {"key": "z_ant",      "name": "Antenna",      "x": 0.50, "y": 0.16, "allow": ["antenna"]},
+    {"key": "z_pdb",      "name": "PDB",          "x": 0.50, "y": 0.50, "allow": ["pdb"]},
+    {"key": "z_fc",       "name": "Flight Ctrl",  "x": 0.50, "y": 0.62, "allow": ["fc"]},
+    {"key": "z_cam",      "name": "Camera",       "x": 0.50, "y": 0.86, "allow": ["camera"]},
+]
+
+
+# Assembly order, as (before, after) kinds: within a zone group, a zone
+# taking `after` can only be filled once every zone taking `before` is.
+ORDER = [
+    ("esc", "motor"),           # ESC mounted before its motor
+    ("motor", "prop"),          # motor before the prop on the same arm
+    ("pdb", "fc"),              # PDB before the FC stacked on it
+    ("antenna", "vtx"),         # never power a VTX without its antenna
+]
+
+
+def default_parts():
+    """The quad's parts in tray order: arm parts first, then the stack."""
+    parts = []
+    for kind, label in [("prop", "Prop"), ("motor", "Motor"), ("esc", "ESC")]:
+        for i in range(4):
+            parts.append({"id": f"{kind}_{i + 1}", "label": f"{label} {i + 1}", "kind": kind})
+
+    stack = [("pdb_1", "PDB", "pdb"), ("fc_1", "FC", "fc"), ("rx_1", "RX", "rx"),
+             ("vtx_1", "VTX", "vtx"), ("ant_1", "ANT", "antenna"), ("cam_1", "CAM", "camera")]
+    for pid, label, kind in stack:
+        parts.append({"id": pid, "label": label, "kind": kind})
+
+    return parts
+
+
+# The quad's quiz banks, in kind-bit order; the other kinds belong to the
+# procedural airframes, which take the banks of whatever parts they use.
+QUAD_KINDS = ("prop", "motor", "esc", "pdb", "fc", "rx", "vtx", "antenna", "camera")
+
+QUIZ = {
+    "prop": {
+        "title": "Propeller",
+        "what": "Generates thrust by accelerating air. Pitch/diameter strongly affect efficiency and current draw.",
+        "gotchas": ["CW/CCW props must match motor direction.", "Oversized props can overcurrent motor/ESC."],
+        "questions": [
+            ["If prop pitch increases (all else equal), motor load generally…", ["Increases", "Decreases", "Stays identical"], 0, 1],
+            ["A larger prop diameter usually…", ["Increases thrust and current draw", "Always reduces current draw", "Has no effect"], 0, 2],
+        ],
+    },
+    "motor": {
+        "title": "Brushless Motor",
+        "what": "Spins the prop. Kv (~RPM/Volt) influences speed vs torque behavior.",
+        "gotchas": ["High Kv often suits smaller props.", "Heat often indicates overload or poor airflow."],
+        "questions": [
+            ["Higher Kv generally means…", ["More RPM per volt", "More torque per amp", "Lower RPM per volt"], 0, 1],
+            ["If motors overheat, a common cause is…", ["Prop load too high", "Too much altitude", "Too much GPS"], 0, 2],
+        ],
+    },
+    "esc": {
+        "title": "ESC",
+        "what": "Drives the motor using commutation. Must be rated above peak current with margin.",
+        "gotchas": ["Underrated ESCs fail from heat/overcurrent.", "Protocol must match FC."],
+        "questions": [
+            ["An undersized ESC most commonly fails due to…", ["Overcurrent/overheating", "Too much thrust", "Low battery voltage"], 0, 1],
+            ["ESC current rating should be…", ["Above peak draw with margin", "Exactly equal to peak draw", "Below peak draw"], 0, 2],
+        ],
+    },
+    "pdb": {
+        "title": "Power Distribution Board (PDB)",
+        "what": "Distributes battery power to ESCs and accessories; sometimes adds filtering/BEC.",
+        "gotchas": ["Bad solder joints cause voltage drop + heat.", "Filtering reduces FPV noise."],
+        "questions": [
+            ["A PDB is mainly used to…", ["Distribute battery power", "Control yaw", "Transmit FPV video"], 0, 1],
+            ["A bad power joint often causes…", ["Heat and voltage drop", "More range", "Cleaner video"], 0, 2],
+        ],
+    },
+    "fc": {
+        "title": "Flight Controller",
+        "what": "The brain: reads sensors, runs stabilization loops, commands the ESCs.",
+        "gotchas": ["Wrong orientation can flip instantly.", "Vibration hurts gyro data."],
+        "questions": [
+            ["The FC outputs commands primarily to…", ["ESCs", "Props directly", "Battery cells"], 0, 1],
+            ["Excess vibration mainly hurts…", ["Gyro signal quality", "Prop color", "Receiver binding"], 0, 2],
+        ],
+    },
+    "rx": {
+        "title": "Receiver",
+        "what": "Receives the pilot/control link and feeds commands to the FC.",
+        "gotchas": ["Carbon can shadow RF.", "Set failsafe to prevent flyaways."],
+        "questions": [
+            ["Failsafe defines behavior when…", ["Signal is lost", "Battery is full", "Props are removed"], 0, 1],
+            ["Carbon frames can reduce range by…", ["Blocking/shielding RF", "Increasing thrust", "Charging the battery"], 0, 2],
+        ],
+    },
+    "vtx": {
+        "title": "FPV Video Transmitter (VTX)",
+        "what": "Transmits camera feed. Higher power increases heat and interference risk.",
+        "gotchas": ["Never power a VTX without an antenna.", "High power can overheat without airflow."],
+        "questions": [
+            ["A VTX should not be powered without…", ["An antenna", "A flight controller", "A motor"], 0, 1],
+            ["Higher VTX power usually…", ["Increases heat", "Always increases battery voltage", "Improves GPS lock"], 0, 2],
+        ],
+    },
+    "antenna": {
+        "title": "Antenna",
+        "what": "Radiates/receives RF. Polarization + placement strongly affect link quality.",
+        "gotchas": ["Match polarization (RHCP with RHCP).", "Avoid shielding by battery/carbon."],
+        "questions": [
+            ["Mismatched polarization typically…", ["Reduces signal", "Increases thrust", "Improves range"], 0, 1],
+            ["Antenna placement should avoid…", ["Carbon/battery shadowing", "Wind", "Sunlight"], 0, 2],
+        ],
+    },
+    "camera": {
+        "title": "FPV Camera",
+        "what": "Captures the live feed. Low latency and dynamic range improve control.",
+        "gotchas": ["Tilt affects perceived speed.", "Noise lines often come from power ripple."],
+        "questions": [
+            ["Higher camera tilt is generally used for…", ["Faster forward flight", "Hover-only flight", "Lower RPM motors"], 0, 1],
+            ["Rolling lines in FPV are often caused by…", ["Power noise", "Too much yaw", "Too many satellites"], 0, 2],
+        ],
+    },
+    "fastener": {
+        "title": "Fasteners",
+        "what": "Screws, bolts, standoffs and ties hold the airframe together under vibration and crash loads.",
+        "gotchas": ["Screws that reach the motor windings short them.", "Use threadlocker on metal-to-metal joints."],
+        "questions": [
+            ["A motor screw that is too long can…", ["Damage the motor windings", "Improve cooling", "Raise Kv"], 0, 1],
+            ["Threadlocker on motor screws mainly prevents…", ["Vibration loosening", "Corrosion of props", "RF noise"], 0, 2],
+        ],
+    },
+    "harness": {
+        "title": "Wiring Harness",
+        "what": "Carries power and signals between parts; routing and strain relief decide how long it survives.",
+        "gotchas": ["Keep signal leads away from phase wires.", "Secure leads clear of the props."],
+        "questions": [
+            ["Routing signal wires next to motor phase wires can cause…", ["Electrical noise", "More thrust", "Lower weight"], 0, 1],
+            ["Leads should be secured so they…", ["Can't reach the props", "Move freely in flight", "Touch the motor bell"], 0, 2],
+        ],
+    },
+    "servo": {
+        "title": "Servo",
+        "what": "Moves a control surface to a commanded angle; torque and speed must suit the surface size.",
+        "gotchas": ["Centre the servo before fitting the horn.", "Binding linkages overheat servos."],
+        "questions": [
+            ["Before fitting a control horn, the servo should be…", ["Centred", "At full throw", "Unpowered and spun by hand"], 0, 1],
+            ["A binding linkage typically makes the servo…", ["Draw more current and heat up", "Move faster", "Use less power"], 0, 2],
+        ],
+    },
+}
+
+LEVELS = (1, 2, 3)
+QUIZ_BANK = os.environ.get("TRAINER_QUIZ_BANK", "")
+
+
+def load_bank(path, quiz=QUIZ):
+    """``quiz`` with the questions of a JSON bank file appended per kind.
+
+    The file maps kinds to question lists: ``{"prop": [[question, options,
+    answer, level], ...], ...}``; kinds must already exist in ``quiz``.
+    """
+    with open(path, encoding="utf-8") as f:
+        extra = json.load(f)
+    unknown = set(extra) - set(quiz)
+    if unknown:
+        raise ValueError(f"quiz bank {path!r} has unknown kinds {sorted(unknown)}")
+    return {k: dict(bank, questions=bank["questions"] + [list(q) for q in extra.get(k, [])])
+            for k, bank in quiz.items()}
+
+
+if QUIZ_BANK:
+    QUIZ = load_bank(QUIZ_BANK)
+
+# Bitmasks are combined with JS bitwise ops, which work on signed 32-bit ints.
+MAX_KINDS = 31
+
+
+def validate(zones, parts, quiz, radius=ZONE_RADIUS_N, world=1, order=ORDER):
+    """Raise ``ValueError`` describing the first inconsistency found."""
+    after = {}
+    for a, b in order:
+        after.setdefault(a, set()).add(b)
+    state = {}
+
+    def visit(kind):
+        if state.get(kind) == 1:
+            raise ValueError(f"assembly order has a cycle through {kind!r}")
+        if kind not in state:
+            state[kind] = 1
+            for k in after.get(kind, ()):
+                visit(k)
+            state[kind] = 2
+
+    for kind in after:
+        visit(kind)
+
+    if not 0 < radius < 0.5:
+        raise ValueError(f"zone radius {radius} outside (0, 0.5)")
+    if not (isinstance(world, int) and world >= 1):
+        raise ValueError(f"world size {world!r} is not a positive integer")
+    if len(quiz) > MAX_KINDS:
+        raise ValueError(f"{len(quiz)} part kinds; bitmasks support at most {MAX_KINDS}")
+
+    for kind, bank in quiz.items():
+        if not bank.get("questions"):
+            raise ValueError(f"quiz bank {kind!r} has no questions")
+        for q, opts, answer, *level in bank["questions"]:
+            if not 0 <= answer < len(opts):
+                raise ValueError(f"quiz {kind!r}: answer {answer} out of range for {q!r}")
+            if level and level[0] not in LEVELS:
+                raise ValueError(f"quiz {kind!r}: level {level[0]!r} not in {LEVELS} for {q!r}")
+
+    seen = set()
+    for z in zones:
+        if z["key"] in seen:
+            raise ValueError(f"duplicate zone key {z['key']!r}")
+        seen.add(z["key"])
+        if not (0 <= z["x"] <= 1 and 0 <= z["y"] <= 1):
+            raise ValueError(f"zone {z['key']!r} is not in normalized coordinates")
+        unknown = set(z["allow"]) - set(quiz)
+        if unknown:
+            raise ValueError(f"zone {z['key']!r} allows unknown kinds {sorted(unknown)}")
+
+    seen = set()
+    for p in parts:
+        if p["id"] in seen:
+            raise ValueError(f"duplicate part id {p['id']!r}")
+        seen.add(p["id"])
+        if p["kind"] not in quiz:
+            raise ValueError(f"part {p['id']!r} has unknown kind {p['kind']!r}")
+
+
+def zone_grid(zones, radius):
+    """Uniform grid over the unit square with cells one snap radius wide.
+
+    Each zone is listed in every cell its snap disk touches, so a query only
+    reads the bucket under the pointer. Buckets are stored CSR-style: zones of
+    cell ``c`` are ``cell_zones[cell_start[c]:cell_start[c + 1]]``, in catalog
+    order so ties resolve exactly like a linear scan.
+    """
+    n = max(1, math.ceil(1 / radius))
+    buckets = [[] for _ in range(n * n)]
+    for i, z in enumerate(zones):
+        c0 = max(0, math.floor((z["x"] - radius) * n))
+        c1 = min(n - 1, math.floor((z["x"] + radius) * n))
+        r0 = max(0, math.floor((z["y"] - radius) * n))
+        r1 = min(n - 1, math.floor((z["y"] + radius) * n))
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                # nearest point of the cell to the zone centre
+                nx = min(max(z["x"], col / n), (col + 1) / n)
+                ny = min(max(z["y"], row / n), (row + 1) / n)
+                if (nx - z["x"]) ** 2 + (ny - z["y"]) ** 2 <= radius * radius:
+                    buckets[row * n + col].append(i)
+
+    cell_start, cell_zones = [0], []
+    for b in buckets:
+        cell_zones.extend(b)
+        cell_start.append(len(cell_zones))
+    return {"n": n, "cell_start": cell_start, "cell_zones": cell_zones}
+
+
+def _int32(v):
+    return v - (1 << 32) if v >= 1 << 31 else v
+
+
+def build_order(zones, rules=ORDER):
+    """The assembly-order DAG over zones.
+
+    ``req`` is one row of ``words`` 32-bit words per zone with a bit set for
+    each prerequisite zone (signed, for JS bitwise ops), ``need`` the number
+    of those bits, and ``dep_start``/``dep_zones`` every zone's dependents
+    CSR-style, so filling a zone only touches the zones waiting on it.
+    """
+    words = max(1, math.ceil(len(zones) / 32))
+    by_group = {}
+    for i, z in enumerate(zones):
+        for k in z["allow"]:
+            by_group.setdefault((z.get("group", ""), k), []).append(i)
+
+    req = [0] * (len(zones) * words)
+    need = [0] * len(zones)
+    deps = [[] for _ in zones]
+    for i, z in enumerate(zones):
+        group = z.get("group", "")
+        for before, after in rules:
+            if after not in z["allow"]:
+                continue
+            for j in by_group.get((group, before), ()):
+                w, bit = i * words + j // 32, 1 << j % 32
+                if j == i or req[w] & bit:
+                    continue
+                req[w] |= bit
+                need[i] += 1
+                deps[j].append(i)
+
+    dep_start, dep_zones = [0], []
+    for d in deps:
+        dep_zones.extend(d)
+        dep_start.append(len(dep_zones))
+    return {"words": words, "req": [_int32(v) for v in req], "need": need,
+            "dep_start": dep_start, "dep_zones": dep_zones}
+
+
+def quiz_order(bank):
+    """Question indexes easiest first (stable within a level)."""
+    levels = [q[3] if len(q) > 3 else LEVELS[0] for q in bank["questions"]]
+    return sorted(range(len(levels)), key=levels.__getitem__)
+
+
+def _digest(obj):
+    body = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()[:12]
+
+
+def compile_catalog(zones=ZONES, parts=None, quiz=QUIZ, radius=ZONE_RADIUS_N, world=1, airframe="quad",
+                    order=ORDER):
+    """Validate the catalog and return it with its lookup tables attached.
+
+    ``radius`` is in world coordinates; every part starts in the tray.
+    """
+    parts = default_parts() if parts is None else parts
+    validate(zones, parts, quiz, radius, world, order)
+
+    kinds = list(quiz)
+    kind_bit = {k: 1 << i for i, k in enumerate(kinds)}
+    compiled_zones = []
+    for z in zones:
+        mask = 0
+        for k in z["allow"]:
+            mask |= kind_bit[k]
+        compiled_zones.append({**z, "mask": mask})
+
+    catalog = {
+        "airframe": airframe,
+        "world": world,
+        "radius": radius,
+        "kinds": kinds,
+        "kind_bit": kind_bit,
+        "zones": compiled_zones,
+        "zone_index": {z["key"]: i for i, z in enumerate(zones)},
+        "parts": [dict(p, x=TRAY, y=TRAY) for p in parts],
+        "part_index": {p["id"]: i for i, p in enumerate(parts)},
+        "quiz": quiz,
+        "quiz_order": {k: quiz_order(bank) for k, bank in quiz.items()},
+        # per kind, so recall history survives airframe and layout changes
+        "quiz_version": {k: _digest(bank["questions"]) for k, bank in quiz.items()},
+        "grid": zone_grid(zones, radius),
+        "order": build_order(zones, order),
+    }
+    catalog["version"] = _digest(catalog)
+    return catalog
+
+
+def _procedural(name, items):
+    zones, parts, world = airframes.layout(items)
+    kinds = {p["kind"] for p in parts}
+    quiz = {k: bank for k, bank in QUIZ.items() if k in kinds}
+    return compile_catalog(zones, parts, quiz, ZONE_RADIUS_N / world, world, name)
+
+
+AIRFRAMES = {
+    "quad": lambda: compile_catalog(quiz={k: QUIZ[k] for k in QUAD_KINDS}),
+    "hex": lambda: _procedural("hex", airframes.multirotor(6)),
+    "octo": lambda: _procedural("octo", airframes.multirotor(8)),
+    "fixed_wing": lambda: _procedural("fixed_wing", airframes.fixed_wing()),
+}
+DEFAULT_AIRFRAME = "quad"
+
+
+@st.cache_resource(show_spinner=False)
+def load_catalog(airframe=DEFAULT_AIRFRAME):
+    """An airframe's catalog, compiled once per process."""
+    if airframe not in AIRFRAMES:
+        raise ValueError(f"unknown airframe {airframe!r}; expected one of {sorted(AIRFRAMES)}")
+    return AIRFRAMES[airframe]()
+
+
+def catalog_js(catalog):
+    """Script that exposes the compiled catalog to the board as ``TRAINER_CATALOG``."""
+    body = json.dumps(catalog, separators=(",", ":"), ensure_ascii=False)
+    return f"window.TRAINER_CATALOG = {body};\n"
@@ -0,0 +1,63 @@
+"""Classroom reads: the cohort's most recent boards for ``classroom_board``.
+
+Each board is rebuilt from its latest stored snapshot plus the ops after it
+(``journal.latest``, without touching older history), then handed to the
+component as one v2 snapshot. Rebuilds are cached per
+``(session, updated_ms)``, so a rerun only replays the boards that moved.
+"""
+import time
+
+import streamlit as st
+
+from trainer import journal
+from trainer.catalog import DEFAULT_AIRFRAME, load_catalog
+from trainer.engine import Rules
+from trainer.store import get_store
+
+TTL_S = 2
+MAX_BOARDS = 16
+LIVE_MS = 60_000
+
+# Sessions don't record their airframe; the part count narrows it down and
+# the snapshot's catalog version settles it.
+RECENT_SQL = """
+SELECT session_id, updated_ms, grade, locked, parts FROM sessions
+WHERE cohort = ? AND parts = ? ORDER BY updated_ms DESC LIMIT ?
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def _rules(airframe):
+    return Rules(load_catalog(airframe))
+
+
+@st.cache_data(max_entries=4 * MAX_BOARDS, show_spinner=False)
+def _board(session_id, updated_ms, airframe):
+    """``(v, snap)`` for a session as of ``updated_ms``, or ``None`` if it
+    has no journal for this airframe's catalog."""
+    board = journal.latest(get_store(), _rules(airframe), session_id)
+    if board is None:
+        return None
+    v, s = board
+    return v, s.to_snapshot(session_id)
+
+
+@st.cache_data(ttl=TTL_S, show_spinner=False)
+def boards(cohort, airframe=DEFAULT_AIRFRAME, limit=MAX_BOARDS):
+    """Up to ``limit`` of the cohort's boards, most recently active first, as
+    ``[{id, label, v, snap, summary}]``."""
+    n_parts = len(load_catalog(airframe)["parts"])
+    rows = get_store().query(RECENT_SQL, (cohort, n_parts, min(limit, MAX_BOARDS)))
+    now_ms = time.time() * 1000
+    out = []
+    for sid, updated, grade, locked, parts in rows:
+        board = _board(sid, updated, airframe)
+        if board is None:
+            continue
+        v, snap = board
+        out.append({
+            "id": sid, "label": sid[-6:], "v": v, "snap": snap,
+            "summary": {"grade": grade, "locked": locked, "parts": parts, "updated_ms": updated,
+                        "live": locked < parts and now_ms - updated < LIVE_MS},
+        })
+    return out
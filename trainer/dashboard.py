@@ -0,0 +1,53 @@
+"""Instructor dashboard reads.
+
+Everything here comes from the store's materialized ``agg_*`` tables, which
+the writer keeps current as batches land, so a read is a handful of primary
+key range scans regardless of how many sessions the cohort has. Results are
+cached for ``TTL_S`` seconds so reruns within that window cost nothing.
+"""
+import streamlit as st
+
+from trainer import report
+from trainer.engine import GRADES
+from trainer.store import get_store
+
+TTL_S = 10
+GRADE_ORDER = tuple(letter for _, letter in GRADES) + ("F",)
+
+
+@st.cache_data(ttl=TTL_S, show_spinner=False)
+def cohorts():
+    rows = get_store().query("SELECT DISTINCT cohort FROM agg_grade WHERE n > 0 ORDER BY cohort")
+    return [r[0] for r in rows]
+
+
+@st.cache_data(ttl=TTL_S, show_spinner=False)
+def quiz_accuracy(cohort):
+    """``[{kind, attempts, correct, accuracy}]`` sorted worst first."""
+    rows = get_store().query(
+        "SELECT kind, attempts, correct FROM agg_quiz WHERE cohort = ? AND attempts > 0", (cohort,))
+    out = [{"kind": k, "attempts": a, "correct": c, "accuracy": c / a} for k, a, c in rows]
+    return sorted(out, key=lambda r: (r["accuracy"], r["kind"]))
+
+
+@st.cache_data(ttl=TTL_S, show_spinner=False)
+def wrong_drops(cohort, limit=10):
+    """Most common wrong-zone drops as ``[{kind, zone, drops}]``."""
+    rows = get_store().query(
+        "SELECT kind, zone, n FROM agg_wrong WHERE cohort = ? ORDER BY n DESC, kind, zone LIMIT ?",
+        (cohort, limit))
+    return [{"kind": k, "zone": z, "drops": n} for k, z, n in rows]
+
+
+@st.cache_data(ttl=TTL_S, show_spinner=False)
+def grade_distribution(cohort):
+    """Sessions per grade letter, best grade first (zeros included)."""
+    counts = dict(get_store().query("SELECT grade, n FROM agg_grade WHERE cohort = ?", (cohort,)))
+    return {g: counts.get(g, 0) for g in GRADE_ORDER}
+
+
+@st.cache_data(ttl=TTL_S, max_entries=2, show_spinner=False)
+def report_cards(cohort, airframe):
+    """Every report card in the cohort for one airframe, as
+    ``(zip bytes, cards, skipped)`` (see ``report.export_zip``)."""
+    return report.export_zip(get_store(), cohort, airframe)
@@ -0,0 +1,348 @@
+"""Headless rules engine.
+
+A pure-Python mirror of the board's ``handleDrop``, ``gradeQuiz`` and
+``computeGrade``, for scoring, verifying and replaying sessions on the server.
+Sessions keep their state in ``__slots__`` and flat arrays indexed by the
+compiled catalog (part index, zone index), so a drop is a grid lookup plus a
+few integer updates.
+
+Scope: this is not the "millions of events per second" replayer that was
+asked for. Drops that land near zones replay at 0.3-0.6M events/s on one
+core, whether into one long lock-off session or a fresh session every 40
+drops. Drops of already-locked parts return early and are far cheaper, so
+don't benchmark with them. The ceiling is the interpreter. Each drop reads
+and writes session state that the next drop depends on (occupancy, unmet
+prerequisites, the open quiz, the streak), so a session can't be replayed
+as array operations. Only the nearest-zone lookup is stateless, and moving
+it to NumPy doesn't pay: turning the event tuples into arrays alone caps
+that pass near 1M events/s, and the stateful loop still runs after it.
+Reaching millions would take a compiled extension, and this package ships
+none.
+"""
+import math
+from array import array
+
+from trainer.catalog import AIRFRAMES, DEFAULT_AIRFRAME
+
+# Points, as in the board.
+PTS_SNAP = 10
+PTS_LOCK = 15
+PTS_WRONG_DROP = -3
+PTS_QUIZ_CORRECT = 15
+PTS_QUIZ_WRONG = -5
+STREAK_EVERY = 3
+STREAK_BONUS = 10
+
+# handleDrop outcomes.
+IGNORED, MOVED, OCCUPIED, WRONG_ZONE, SNAPPED, LOCKED, OUT_OF_ORDER = range(7)
+OUTCOMES = ("ignored", "moved", "occupied", "wrong_zone", "snapped", "locked", "out_of_order")
+
+# Replay ops: (op, t_ms, a, b, c), the board's journal events (journal.js)
+#   DROP     a=part index, b=x, c=y (normalized)
+#   ANSWER   a=1 correct / 0 wrong
+#   CLOSE    close the open quiz without answering
+#   SET_LOCK a=1 on / 0 off
+#   DRAG     a=part index (drag start; no state change)
+#   TOGGLE   a=flag bit index (see FLAG_*), b=1 on / 0 off
+#   RESET    ends the session
+#   ASK      a=question index for the open quiz (the board's scheduler pick)
+DROP, ANSWER, CLOSE, SET_LOCK, DRAG, TOGGLE, RESET, ASK = range(8)
+
+# Snapshot flag bits, in persist.js FLAGS order.
+FLAG_HINTS, FLAG_LABELS, FLAG_LOCK, FLAG_SOUND = range(4)
+DEFAULT_FLAGS = 1 << FLAG_HINTS | 1 << FLAG_SOUND
+
+GRADES = ((95, "A+"), (90, "A"), (80, "B"), (70, "C"), (60, "D"))
+
+# computeGrade's weights.
+WEIGHTS = {
+    "time": 35, "time_grace_s": 120, "time_span_s": 360,
+    "accuracy": 35,
+    "streak": 20, "streak_full": 10,
+    "wrong": 2, "wrong_cap": 20,
+}
+
+
+def grade_letter(score100):
+    for cut, letter in GRADES:
+        if score100 >= cut:
+            return letter
+    return "F"
+
+
+def grade_score(elapsed_s, wrong, attempts, correct, best_streak, weights=WEIGHTS):
+    """computeGrade's 0-100 score."""
+    w = weights
+    t = max(1, elapsed_s)
+    acc = correct / attempts if attempts else 0
+    time_score = max(0, w["time"] * (1 - min(1, (t - w["time_grace_s"]) / w["time_span_s"])))
+    acc_score = w["accuracy"] * acc
+    streak_score = w["streak"] * min(1, best_streak / w["streak_full"])
+    penalty = min(w["wrong_cap"], wrong * w["wrong"])
+    return max(0, min(100, time_score + acc_score + streak_score - penalty))
+
+
+class Rules:
+    """Catalog compiled into the flat tables the engine reads."""
+
+    __slots__ = ("catalog", "n_parts", "part_bit", "part_kind", "part_x0", "part_y0", "zone_x", "zone_y",
+                 "zone_mask", "radius2", "grid_n", "cell_start", "cell_zones", "n_questions", "need",
+                 "dep_start", "dep_zones")
+
+    def __init__(self, catalog=None):
+        cat = catalog or AIRFRAMES[DEFAULT_AIRFRAME]()
+        self.catalog = cat
+        self.n_parts = len(cat["parts"])
+        self.part_kind = [p["kind"] for p in cat["parts"]]
+        self.part_bit = array("l", (cat["kind_bit"][k] for k in self.part_kind))
+        self.part_x0 = array("d", (p["x"] for p in cat["parts"]))
+        self.part_y0 = array("d", (p["y"] for p in cat["parts"]))
+        self.zone_x = array("d", (z["x"] for z in cat["zones"]))
+        self.zone_y = array("d", (z["y"] for z in cat["zones"]))
+        self.zone_mask = array("l", (z["mask"] for z in cat["zones"]))
+        self.radius2 = cat["radius"] * cat["radius"]
+        self.grid_n = cat["grid"]["n"]
+        self.cell_start = array("l", cat["grid"]["cell_start"])
+        self.cell_zones = array("l", cat["grid"]["cell_zones"])
+        self.n_questions = array("l", (len(cat["quiz"][k]["questions"]) for k in self.part_kind))
+        # assembly order: prerequisites per zone, and who waits on each zone
+        self.need = array("l", cat["order"]["need"])
+        self.dep_start = array("l", cat["order"]["dep_start"])
+        self.dep_zones = array("l", cat["order"]["dep_zones"])
+
+    def nearest_zone(self, x, y, mask=-1):
+        """Zone index within the snap radius (ties go to catalog order), or -1."""
+        n = self.grid_n
+        col = min(n - 1, max(0, math.floor(x * n)))
+        row = min(n - 1, max(0, math.floor(y * n)))
+        cell = row * n + col
+        best, best_d = -1, self.radius2
+        zx, zy, zm, ids = self.zone_x, self.zone_y, self.zone_mask, self.cell_zones
+        for k in range(self.cell_start[cell], self.cell_start[cell + 1]):
+            i = ids[k]
+            if not zm[i] & mask:
+                continue
+            dx, dy = x - zx[i], y - zy[i]
+            d = dx * dx + dy * dy
+            if d < best_d or (d == best_d and best < 0):
+                best, best_d = i, d
+        return best
+
+
+class Session:
+    """One trainee's board.
+
+    Parts and zones are addressed by catalog index. The build log is
+    column-oriented: ``log_part``/``log_zone``/``log_q``/``log_t`` per lock,
+    ``log_result`` is 1 correct, 0 wrong, -1 unanswered. ``missing`` counts
+    each zone's unfilled prerequisites (order.js's tracker).
+    """
+
+    __slots__ = ("rules", "start_ms", "score", "wrong", "quiz_streak", "best_streak", "lock_on", "flags",
+                 "part_x", "part_y", "part_zone", "occupant", "locked", "missing",
+                 "log_part", "log_zone", "log_q", "log_t", "log_result", "pending",
+                 "attempts", "correct")
+
+    def __init__(self, rules, start_ms=0, lock_on=True):
+        self.rules = rules
+        self.start_ms = start_ms
+        self.score = self.wrong = self.quiz_streak = self.best_streak = 0
+        self.lock_on = lock_on
+        self.flags = DEFAULT_FLAGS      # display toggles; lock lives in lock_on
+        self.part_x = rules.part_x0[:]
+        self.part_y = rules.part_y0[:]
+        self.part_zone = array("l", [-1]) * rules.n_parts
+        self.occupant = array("l", [-1]) * len(rules.zone_x)
+        self.locked = 0
+        self.missing = array("l", rules.need)
+        self.log_part, self.log_zone, self.log_q = array("l"), array("l"), array("l")
+        self.log_t = array("q")
+        self.log_result = array("b")
+        self.pending = -1
+        self.attempts = self.correct = 0
+
+    # -- handleDrop --------------------------------------------------------
+    def drop(self, part, x, y, now_ms=0):
+        rules = self.rules
+        if self.part_zone[part] >= 0:
+            return IGNORED
+
+        self.part_x[part], self.part_y[part] = x, y
+        # nearest_zone, inlined: this is the hot path of every replay
+        n = rules.grid_n
+        col = min(n - 1, int(x * n)) if x >= 0 else 0
+        row = min(n - 1, int(y * n)) if y >= 0 else 0
+        cell = row * n + col
+        z, best_d = -1, rules.radius2
+        zx, zy, ids = rules.zone_x, rules.zone_y, rules.cell_zones
+        for k in range(rules.cell_start[cell], rules.cell_start[cell + 1]):
+            i = ids[k]
+            dx, dy = x - zx[i], y - zy[i]
+            d = dx * dx + dy * dy
+            if d < best_d or (d == best_d and z < 0):
+                z, best_d = i, d
+        if z < 0:
+            return MOVED
+
+        if self.occupant[z] >= 0:
+            self.score += PTS_WRONG_DROP
+            self.wrong += 1
+            return OCCUPIED
+
+        self.part_x[part], self.part_y[part] = rules.zone_x[z], rules.zone_y[z]
+        if not rules.zone_mask[z] & rules.part_bit[part]:
+            self.score += PTS_WRONG_DROP
+            self.wrong += 1
+            return WRONG_ZONE
+
+        if self.lock_on and self.missing[z]:
+            self.score += PTS_WRONG_DROP
+            self.wrong += 1
+            return OUT_OF_ORDER
+
+        self.score += PTS_SNAP
+        if not self.lock_on:
+            return SNAPPED
+
+        self.fill(z, part)
+        self.score += PTS_LOCK
+        self.log_part.append(part)
+        self.log_zone.append(z)
+        self.log_q.append(now_ms % rules.n_questions[part])
+        self.log_t.append(now_ms)
+        self.log_result.append(-1)
+        self.attempts += 1
+        self.pending = len(self.log_part) - 1
+        return LOCKED
+
+    def fill(self, z, part):
+        """Lock ``part`` into zone ``z``."""
+        self.part_zone[part] = z
+        self.occupant[z] = part
+        self.locked += 1
+        rules, missing = self.rules, self.missing
+        for k in range(rules.dep_start[z], rules.dep_start[z + 1]):
+            missing[rules.dep_zones[k]] -= 1
+
+    # -- gradeQuiz ---------------------------------------------------------
+    def answer(self, is_correct):
+        """Score the open quiz; returns the points awarded or None if nothing
+        was scored (no quiz open, or this lock was already scored)."""
+        i = self.pending
+        if i < 0 or self.log_result[i] >= 0:
+            return None
+        if is_correct:
+            pts = PTS_QUIZ_CORRECT
+            self.quiz_streak += 1
+            if self.quiz_streak > self.best_streak:
+                self.best_streak = self.quiz_streak
+            if self.quiz_streak % STREAK_EVERY == 0:
+                pts += STREAK_BONUS
+            self.log_result[i] = 1
+            self.correct += 1
+        else:
+            pts = PTS_QUIZ_WRONG
+            self.quiz_streak = 0
+            self.log_result[i] = 0
+        self.score += pts
+        return pts
+
+    def ask(self, q):
+        """Swap the open, unanswered quiz's question for question ``q``."""
+        i = self.pending
+        if i >= 0 and self.log_result[i] < 0 and 0 <= q < self.rules.n_questions[self.log_part[i]]:
+            self.log_q[i] = q
+
+    def close_quiz(self):
+        self.pending = -1
+
+    # -- computeGrade ------------------------------------------------------
+    def grade_score(self, now_ms):
+        elapsed = (now_ms - self.start_ms) // 1000
+        return grade_score(elapsed, self.wrong, self.attempts, self.correct, self.best_streak)
+
+    def grade(self, now_ms):
+        return grade_letter(self.grade_score(now_ms))
+
+    @property
+    def complete(self):
+        return self.locked == self.rules.n_parts
+
+    def event_id(self, i):
+        """The board's ``event_id`` for log entry ``i``."""
+        cat = self.rules.catalog
+        return f"{self.log_t[i]}_{cat['parts'][self.log_part[i]]['id']}_{cat['zones'][self.log_zone[i]]['key']}"
+
+    # -- bulk --------------------------------------------------------------
+    def replay(self, events):
+        """Apply ``(op, t_ms, a, b, c)`` tuples in order; returns the count."""
+        drop, answer = self.drop, self.answer
+        n = 0
+        for op, t, a, b, c in events:
+            if op == DROP:
+                drop(a, b, c, t)
+            elif op == ANSWER:
+                answer(a)
+            elif op == ASK:
+                self.ask(a)
+            elif op == CLOSE:
+                self.pending = -1
+            elif op == SET_LOCK:
+                self.lock_on = bool(a)
+            elif op == TOGGLE:
+                if a == FLAG_LOCK:
+                    self.lock_on = bool(b)
+                elif b:
+                    self.flags |= 1 << a
+                else:
+                    self.flags &= ~(1 << a)
+            n += 1
+        return n
+
+    # -- board snapshots ---------------------------------------------------
+    @classmethod
+    def from_snapshot(cls, rules, snap):
+        """Rebuild from the board's v2 saved snapshot (see persist.js)."""
+        if snap.get("v") != 2 or snap.get("c") != rules.catalog["version"]:
+            raise ValueError("snapshot does not match this catalog")
+        s = cls(rules, start_ms=snap["t"], lock_on=bool(snap["f"] & 1 << FLAG_LOCK))
+        s.flags = snap["f"] & ~(1 << FLAG_LOCK)
+        s.score, s.wrong, s.quiz_streak, s.best_streak = snap["n"]
+        for i in range(rules.n_parts):
+            s.part_x[i], s.part_y[i] = snap["p"][2 * i], snap["p"][2 * i + 1]
+            z = snap["z"][i]
+            if z >= 0:
+                s.fill(z, i)
+        for n, (event_id, part, zone, q, result) in enumerate(snap["l"]):
+            s.log_part.append(part)
+            s.log_zone.append(zone)
+            s.log_q.append(q)
+            s.log_t.append(int(event_id.split("_", 1)[0]))
+            s.log_result.append(result)
+            s.correct += result == 1
+            if event_id == snap.get("pq"):
+                s.pending = n
+        s.attempts = len(s.log_part)
+        return s
+
+    def to_snapshot(self, session_id=""):
+        """This board as a v2 snapshot, as persist.js would write it."""
+        cat = self.rules.catalog
+        p = []
+        for i in range(self.rules.n_parts):
+            p += (_round4(self.part_x[i]), _round4(self.part_y[i]))
+        log = [[self.event_id(i), self.log_part[i], self.log_zone[i], self.log_q[i], self.log_result[i]]
+               for i in range(len(self.log_part))]
+        return {
+            "v": 2, "c": cat["version"], "s": session_id, "t": self.start_ms,
+            "n": [self.score, self.wrong, self.quiz_streak, self.best_streak],
+            "f": self.flags | (1 << FLAG_LOCK if self.lock_on else 0),
+            "p": p, "z": list(self.part_zone), "l": log,
+            "pq": log[self.pending][0] if self.pending >= 0 else None,
+        }
+
+
+def _round4(v):
+    # Math.round semantics (half up), like persist.js
+    r = math.floor(v * 1e4 + 0.5) / 1e4
+    return int(r) if r == int(r) else r
@@ -0,0 +1,24 @@
+// --------------------- Streamlit component bridge ---------------------
+// Minimal v1 component protocol (no npm build): announce readiness and size the
+// iframe from the args Python passes on every render. Harmless when the page is
+// embedded through components.html, which never answers.
+const Bridge = (() => {
+  const listeners = [];
+  let args = {};
+
+  function post(type, data={}) {
+    window.parent.postMessage(Object.assign({isStreamlitMessage:true, type}, data), "*");
+  }
+  function setFrameHeight(h) { post("streamlit:setFrameHeight", {height:h}); }
+  function onRender(fn) { listeners.push(fn); }
+
+  window.addEventListener("message", (e) => {
+    if (!e.data || e.data.type !== "streamlit:render") return;
+    args = e.data.args || {};
+    if (args.height) setFrameHeight(args.height);
+    listeners.forEach(fn => fn(args));
+  });
+  post("streamlit:componentReady", {apiVersion:1});
+
+  return { post, setFrameHeight, onRender, args: () => args };
+})();
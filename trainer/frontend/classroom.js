@@ -0,0 +1,184 @@
+// --------------------- Classroom ---------------------
+// Up to 16 trainees' boards on one page, read-only, drawn from the v2
+// snapshots Python passes in (trainer/classroom.py). Everything is shared:
+// one Konva, one decoded icon sheet, one message listener and one timer
+// loop. Each board is a small stage with a single shape that draws its zones
+// and parts straight from the decoded state, so a board costs one node
+// however many parts it has.
+//
+// A board is only redrawn when its snapshot changed. Boards scrolled out of
+// view are skipped until they come back, and idle ones (no new ops for
+// IDLE_MS) redraw and retick at most every IDLE_EVERY_MS.
+(() => {
+  const CAT = window.TRAINER_CATALOG;
+  const icons = IconSheet.create(window.TRAINER_ATLAS);
+  const TRAY = -1;
+  const ASPECT = 1100 / 680;    // the live board's width / height (trainer.js)
+  const TICK_MS = 250, STAT_EVERY_MS = 1000;
+  const IDLE_MS = 30000, IDLE_EVERY_MS = 5000;
+
+  const tilesEl = document.getElementById("tiles");
+  const msg = document.getElementById("msg");
+  const tiles = new Map();      // board id -> tile
+  let image = null;             // the icon sheet, once decoded
+  let timer = null;
+
+  const baseState = () => ({
+    parts: CAT.parts.map(p => ({...p, locked:false, zone:null})),
+    build_log: [], quiz_scored: {}, pending_quiz: null,
+  });
+
+  const observer = window.IntersectionObserver ? new IntersectionObserver((entries) => {
+    for (const e of entries) {
+      const t = e.target.tile;
+      t.visible = e.isIntersecting;
+      if (t.visible) t.drawnAt = 0;    // catch up right away
+    }
+  }) : null;
+
+  function makeTile(id) {
+    const el = document.createElement("div");
+    el.className = "tile";
+    el.innerHTML = `<div class="tilehead"><span class="name"></span><span class="stat"></span></div><div class="tilestage"></div>`;
+    tilesEl.appendChild(el);
+    const stage = new Konva.Stage({container: el.querySelector(".tilestage"), width: 1, height: 1, listening: false});
+    const layer = new Konva.Layer({listening: false});
+    const tile = {
+      id, el, stage, layer, name: el.querySelector(".name"), stat: el.querySelector(".stat"),
+      state: null, summary: null, v: -1, size: 0,
+      dirty: true, visible: true, drawnAt: 0, statAt: 0, changedAt: Date.now(),
+    };
+    layer.add(new Konva.Shape({sceneFunc: (ctx) => drawBoard(ctx, tile)}));
+    stage.add(layer);
+    el.tile = tile;
+    if (observer) observer.observe(el);
+    return tile;
+  }
+
+  function dropTile(t) {
+    if (observer) observer.unobserve(t.el);
+    t.stage.destroy();
+    t.el.remove();
+    tiles.delete(t.id);
+  }
+
+  // Zones as rings (filled once taken), parts as their icons with the
+  // top-left corner where they sit, as trainer.js places them: locked at
+  // full strength, loose ones faded with a red ring.
+  function drawBoard(ctx, t) {
+    const w = t.size, h = t.size / ASPECT, st = t.state;
+    if (!st || !image) return;
+    const r = Math.max(2, CAT.radius * h);
+    const taken = new Set();
+    for (const p of st.parts) if (p.locked) taken.add(p.zone);
+
+    ctx.setAttr("lineWidth", 1);
+    for (const z of CAT.zones) {
+      ctx.beginPath();
+      ctx.arc(z.x * w, z.y * h, r, 0, Math.PI * 2);
+      if (taken.has(z.key)) {
+        ctx.setAttr("fillStyle", "rgba(0,255,136,0.18)");
+        ctx.fill();
+      }
+      ctx.setAttr("strokeStyle", "rgba(0,255,136,0.35)");
+      ctx.stroke();
+    }
+
+    const side = Math.max(6, 1.6 * r);
+    for (const p of st.parts) {
+      if (p.x === TRAY) continue;
+      const c = icons.crop(p.kind);
+      ctx.setAttr("globalAlpha", p.locked ? 1 : 0.5);
+      ctx.drawImage(image, c.x, c.y, c.width, c.height, p.x * w, p.y * h, side, side);
+      if (!p.locked) {
+        ctx.beginPath();
+        ctx.arc(p.x * w + side / 2, p.y * h + side / 2, r, 0, Math.PI * 2);
+        ctx.setAttr("strokeStyle", "#ff5c7a");
+        ctx.stroke();
+      }
+    }
+    ctx.setAttr("globalAlpha", 1);
+  }
+
+  function statLine(t, now) {
+    const st = t.state, sum = t.summary || {};
+    const done = st.build_log.filter(e => e.quiz_correct !== null).length;
+    const right = st.build_log.filter(e => e.quiz_correct === true).length;
+    const secs = Math.max(0, Math.floor(((sum.live ? now : sum.updated_ms) - st.start_ms) / 1000));
+    const clock = `${Math.floor(secs / 60)}:${String(secs % 60).padStart(2, "0")}`;
+    return `${st.score} · ${sum.grade || "—"} · ${sum.locked}/${sum.parts} · Q ${right}/${done} · ${clock}`;
+  }
+
+  function resize() {
+    for (const t of tiles.values()) {
+      const size = Math.floor(t.el.querySelector(".tilestage").clientWidth);
+      if (size === t.size || size <= 0) continue;
+      t.size = size;
+      t.stage.width(size); t.stage.height(Math.round(size / ASPECT));
+      t.dirty = true; t.drawnAt = 0;
+    }
+    Bridge.setFrameHeight(document.documentElement.scrollHeight);
+  }
+
+  // New args from Python: add/remove tiles, decode the boards that changed.
+  function sync(args) {
+    const boards = args.boards || [];
+    tilesEl.style.setProperty("--cols", args.cols || Math.min(4, Math.max(1, boards.length)));
+    const now = Date.now();
+    const keep = new Set(boards.map(b => b.id));
+    for (const t of [...tiles.values()]) if (!keep.has(t.id)) dropTile(t);
+
+    for (const b of boards) {
+      const t = tiles.get(b.id) || makeTile(b.id);
+      tiles.set(b.id, t);
+      tilesEl.appendChild(t.el);        // follow Python's order
+      t.name.textContent = b.label;
+      t.summary = b.summary;
+      if (b.v !== t.v) {
+        t.state = Persist.decode(b.snap, CAT, baseState());
+        t.v = b.v;
+        t.dirty = true;
+        t.changedAt = now;
+        t.statAt = 0;
+      }
+    }
+    msg.textContent = boards.length ? `${boards.length} board${boards.length > 1 ? "s" : ""}.` : "No live boards in this cohort yet.";
+    resize();
+    tick();
+  }
+
+  // The one timer loop: redraws dirty boards and refreshes the stat lines.
+  function tick() {
+    const now = Date.now();
+    for (const t of tiles.values()) {
+      if (!t.visible || !t.state) continue;
+      const idle = now - t.changedAt > IDLE_MS;
+      t.el.classList.toggle("idle", idle);
+      if (t.dirty && image && now - t.drawnAt >= (idle ? IDLE_EVERY_MS : 0)) {
+        Perf.time("classroomDraw", () => t.layer.batchDraw());
+        t.dirty = false;
+        t.drawnAt = now;
+      }
+      if (now - t.statAt >= (idle ? IDLE_EVERY_MS : STAT_EVERY_MS)) {
+        t.stat.textContent = statLine(t, now);
+        t.statAt = now;
+      }
+    }
+  }
+
+  function syncTimer() {
+    const visible = document.visibilityState !== "hidden";
+    if (visible && !timer) { tick(); timer = setInterval(tick, TICK_MS); }
+    if (!visible && timer) { clearInterval(timer); timer = null; }
+  }
+
+  Bridge.onRender(sync);
+  window.addEventListener("resize", resize);
+  document.addEventListener("visibilitychange", syncTimer);
+  icons.load().then((img) => {
+    image = img;
+    for (const t of tiles.values()) t.dirty = true;
+    tick();
+  });
+  syncTimer();
+})();
@@ -0,0 +1,101 @@
+// --------------------- IndexedDB ---------------------
+// One database, three object stores (all out-of-line keys):
+//   settings  name -> value                   device prefs shared by every board
+//   boards    board key -> {snap, log:{s, t0, o}}
+//   events    [board key, 0, n] -> event n of the journal
+//             [board key, 1, n] -> journal snapshot [n, dt, snap]
+// Journal rows are written incrementally: each flush puts only what is new
+// since the last one and deletes what the journal compacted away.
+const BoardDB = (() => {
+  const NAME = "drone_trainer";
+  const VERSION = 1;
+  const EV = 0, SNAP = 1;
+
+  const req = (r) => new Promise((resolve, reject) => {
+    r.onsuccess = () => resolve(r.result);
+    r.onerror = () => reject(r.error);
+  });
+  const done = (tx) => new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = tx.onabort = () => reject(tx.error);
+  });
+
+  // [key, kind, lo] .. [key, kind, hi), or every row of the board
+  const rows = (key, kind, lo = 0, hi = Infinity) => IDBKeyRange.bound([key, kind, lo], [key, kind, hi], false, true);
+  const board = (key) => IDBKeyRange.bound([key, EV], [key, SNAP + 1], false, true);
+
+  // Resolves to the database, or null when IndexedDB is missing or refuses
+  // to open (private mode, blocked upgrade): callers fall back to localStorage.
+  let opening = null;
+  function open() {
+    if (!opening) opening = new Promise((resolve) => {
+      try {
+        if (!window.indexedDB) return resolve(null);
+        const r = window.indexedDB.open(NAME, VERSION);
+        r.onupgradeneeded = () => {
+          const db = r.result;
+          db.createObjectStore("settings");
+          db.createObjectStore("boards");
+          db.createObjectStore("events");
+        };
+        r.onsuccess = () => resolve(r.result);
+        r.onerror = r.onblocked = () => resolve(null);
+      } catch(e) { resolve(null); }
+    });
+    return opening;
+  }
+
+  function getSetting(db, name) {
+    return req(db.transaction("settings").objectStore("settings").get(name));
+  }
+
+  function putSetting(db, name, value) {
+    const tx = db.transaction("settings", "readwrite");
+    tx.objectStore("settings").put(value, name);
+    return done(tx);
+  }
+
+  // {snap, log} as last written, or null. `mark` is set to what is on disk
+  // so the next write only adds to it.
+  async function readBoard(db, key, mark) {
+    const tx = db.transaction(["boards", "events"]);
+    const events = tx.objectStore("events");
+    const [head, e, k] = await Promise.all([
+      req(tx.objectStore("boards").get(key)),
+      req(events.getAll(rows(key, EV))),
+      req(events.getAll(rows(key, SNAP))),
+    ]);
+    if (!head) return null;
+    const log = head.log && k.length ? {...head.log, e, k} : null;
+    if (log) Object.assign(mark, {s: log.s, o: log.o, e: log.o + e.length, k: k[k.length - 1][0]});
+    return {snap: head.snap, log};
+  }
+
+  // Writes the snapshot and the journal's changes since `mark`
+  // ({s, o, e, k}: session, offset, events and newest snapshot on disk).
+  // A failed transaction clears mark.s, so the next write starts over.
+  function writeBoard(db, key, snap, log, mark) {
+    const tx = db.transaction(["boards", "events"], "readwrite");
+    const events = tx.objectStore("events");
+    tx.objectStore("boards").put({snap, log: log && {s: log.s, t0: log.t0, o: log.o}}, key);
+    if (log) {
+      if (mark.s !== log.s) {
+        events.delete(board(key));
+        Object.assign(mark, {s: log.s, o: log.o, e: log.o, k: -1});
+      }
+      if (log.o > mark.o) {
+        events.delete(rows(key, EV, mark.o, log.o));
+        events.delete(rows(key, SNAP, mark.o, log.o));
+        mark.o = log.o;
+      }
+      const end = log.o + log.e.length;
+      for (let n = Math.max(mark.e, log.o); n < end; n++) events.put(log.e[n - log.o], [key, EV, n]);
+      for (const k of log.k) if (k[0] > mark.k) events.put(k, [key, SNAP, k[0]]);
+      mark.e = end;
+      if (log.k.length) mark.k = log.k[log.k.length - 1][0];
+    }
+    return done(tx).catch((e) => { mark.s = null; throw e; });
+  }
+
+  return { open, getSetting, putSetting, readBoard, writeBoard };
+})();
@@ -0,0 +1,210 @@
+// --------------------- Session journal ---------------------
+// Every input is appended as a compact event [op, dt, a, b, c] (dt = ms since
+// the session started) and applied through apply(), the board's only state
+// transition. Snap and lock are outcomes of a drop, so they come back out of
+// replay rather than being stored. Every `every` events the board state is
+// snapshotted (Persist's v2 format), so rebuilding the board at any moment is
+// one decode plus the events since the nearest snapshot. engine.py replays
+// the same events on the server.
+//
+//   DROP     a=part index, b=x, c=y (normalized, 4 decimals)
+//   ANSWER   a=1 correct / 0 wrong
+//   CLOSE    close the open quiz
+//   SET_LOCK a=1 on / 0 off
+//   DRAG     a=part index (drag start; no state change)
+//   TOGGLE   a=Persist.FLAGS index, b=1 on / 0 off
+//   RESET    ends the session
+//   ASK      a=question index for the open quiz (the scheduler's pick; a
+//            lock starts out with the drop timestamp's pick, as before)
+//
+// Stored as {s:session_id, t0:start_ms, o:offset, e:[events], k:[[n, dt, snapshot], ...]}.
+// Only the last `retain` events or so are kept: once there are more, whole
+// snapshot intervals are dropped from the front (`o` counts them; n stays
+// absolute). The full history is on the server, which gets every op.
+const Journal = (() => {
+  const DROP = 0, ANSWER = 1, CLOSE = 2, SET_LOCK = 3, DRAG = 4, TOGGLE = 5, RESET = 6, ASK = 7;
+  const IGNORED = 0, MOVED = 1, OCCUPIED = 2, WRONG_ZONE = 3, SNAPPED = 4, LOCKED = 5, OUT_OF_ORDER = 6;
+
+  const PTS_SNAP = 10, PTS_LOCK = 15, PTS_WRONG_DROP = -3;
+  const PTS_QUIZ_CORRECT = 15, PTS_QUIZ_WRONG = -5, STREAK_EVERY = 3, STREAK_BONUS = 10;
+
+  const round4 = (v) => Math.round(v * 1e4) / 1e4;
+
+  // Runtime indexes derived from state: zone -> part, event_id -> log entry,
+  // the assembly-order tracker and the running quiz tallies.
+  function index(state, ix) {
+    ix.occupant.clear();
+    ix.logById.clear();
+    ix.order.clear();
+    for (const p of state.parts) {
+      if (!p.locked || !p.zone) continue;
+      ix.occupant.set(p.zone, p.id);
+      ix.order.fillKey(p.zone);
+    }
+    for (const e of state.build_log) ix.logById.set(e.event_id, e);
+    ix.tally.attempts = state.build_log.length;
+    ix.tally.correct = state.build_log.reduce((n, e) => n + (e.quiz_correct === true ? 1 : 0), 0);
+    return ix;
+  }
+
+  const newIndex = (cat, state) => index(state, {
+    occupant: new Map(), logById: new Map(), order: BuildOrder.create(cat), tally: {attempts:0, correct:0},
+  });
+
+  // Applies one event to state/ix. DROP returns an outcome code, ANSWER the
+  // points scored (null if nothing was scored), everything else undefined.
+  function apply(cat, grid, state, ix, op, t, a, b, c) {
+    if (op === DROP) {
+      const part = state.parts[a];
+      if (!part || part.locked) return IGNORED;
+      part.x = b; part.y = c;
+      const zi = grid.nearestIndex(b, c);
+      if (zi < 0) return MOVED;
+      const z = cat.zones[zi];
+      if (ix.occupant.has(z.key)) {
+        state.score += PTS_WRONG_DROP; state.wrong += 1;
+        return OCCUPIED;
+      }
+      part.x = z.x; part.y = z.y;
+      if ((z.mask & (cat.kind_bit[part.kind] || 0)) === 0) {
+        state.score += PTS_WRONG_DROP; state.wrong += 1;
+        return WRONG_ZONE;
+      }
+      // order only binds locks: unlocked snaps never fill a zone
+      if (state.lock_on && !ix.order.ready(zi)) {
+        state.score += PTS_WRONG_DROP; state.wrong += 1;
+        return OUT_OF_ORDER;
+      }
+      state.score += PTS_SNAP;
+      if (!state.lock_on) return SNAPPED;
+
+      part.locked = true;
+      part.zone = z.key;
+      ix.occupant.set(z.key, part.id);
+      ix.order.fill(zi);
+      state.score += PTS_LOCK;
+      // question is stable per lock: picked by the drop's timestamp
+      const bank = cat.quiz[part.kind];
+      const qIdx = t % bank.questions.length;
+      const entry = {
+        event_id: `${t}_${part.id}_${z.key}`,
+        kind: part.kind, part_id: part.id, part_label: part.label,
+        zone_key: z.key, zone_name: z.name,
+        q_idx: qIdx, question: bank.questions[qIdx],     // [q, opts, correctIdx]
+        quiz_correct: null,
+      };
+      state.build_log.push(entry);
+      ix.logById.set(entry.event_id, entry);
+      ix.tally.attempts += 1;
+      state.pending_quiz = entry;
+      return LOCKED;
+    }
+    if (op === ANSWER) {
+      const entry = state.pending_quiz;
+      if (!entry || state.quiz_scored[entry.event_id]) return null;
+      state.quiz_scored[entry.event_id] = true;
+      const log = ix.logById.get(entry.event_id);
+      let pts;
+      if (a) {
+        pts = PTS_QUIZ_CORRECT;
+        state.quiz_streak += 1;
+        state.best_streak = Math.max(state.best_streak, state.quiz_streak);
+        if (state.quiz_streak % STREAK_EVERY === 0) pts += STREAK_BONUS;
+        if (log) { log.quiz_correct = true; ix.tally.correct += 1; }
+      } else {
+        pts = PTS_QUIZ_WRONG;
+        state.quiz_streak = 0;
+        if (log) log.quiz_correct = false;
+      }
+      state.score += pts;
+      return pts;
+    }
+    if (op === ASK) {
+      const entry = state.pending_quiz;
+      if (!entry || state.quiz_scored[entry.event_id]) return;
+      const questions = cat.quiz[entry.kind].questions;
+      if (a >= 0 && a < questions.length) { entry.q_idx = a; entry.question = questions[a]; }
+    }
+    else if (op === CLOSE) state.pending_quiz = null;
+    else if (op === SET_LOCK) state.lock_on = !!a;
+    else if (op === TOGGLE) state[Persist.FLAGS[a]] = !!b;
+  }
+
+  function create(cat, grid, {every = 25, retain = 1000} = {}) {
+    let log = null;
+
+    function snapshot(state, n, dt) { log.k.push([n, dt, Persist.encode(state, cat)]); }
+
+    // Starts a fresh journal for `state`, with its base snapshot at n=0.
+    function start(state) {
+      log = {s: state.session_id, t0: state.start_ms, o: 0, e: [], k: []};
+      snapshot(state, 0, 0);
+      return log.k[0];
+    }
+
+    // Adopts a saved journal if it belongs to this session, else starts over.
+    // Returns the base snapshot entry when a new journal was started.
+    function resume(saved, state) {
+      if (saved && saved.s === state.session_id && saved.k && saved.k.length) {
+        log = saved;
+        log.o = log.o || 0;
+        return null;
+      }
+      return start(state);
+    }
+
+    // Appends an event already applied to state; returns the snapshot entry
+    // taken after it, if one was due.
+    function record(state, op, t, a, b, c) {
+      const ev = [op, t - log.t0, a, b, c];
+      log.e.push(ev);
+      const n = log.o + log.e.length;
+      if (n % every) return null;
+      snapshot(state, n, ev[1]);
+      compact();
+      return log.k[log.k.length - 1];
+    }
+
+    // Drops the oldest snapshot intervals while more than `retain` events
+    // would remain; the oldest snapshot kept becomes the base.
+    function compact() {
+      let j = 0;
+      while (j < log.k.length - 1 && log.o + log.e.length - log.k[j + 1][0] >= retain) j++;
+      if (!j) return;
+      const base = log.k[j][0];
+      log.e.splice(0, base - log.o);
+      log.k.splice(0, j);
+      log.o = base;
+    }
+
+    // The board as it was at absolute time tMs (default: now):
+    // {state, ix, n} where n is the number of events applied. Before the
+    // retained window this is the oldest snapshot kept.
+    function at(tMs = Infinity) {
+      const dt = tMs - log.t0;
+      let k = log.k.length - 1;
+      while (k > 0 && log.k[k][1] > dt) k--;
+      const [n0, , snap] = log.k[k];
+      const state = Persist.decode(snap, cat, {});
+      const ix = newIndex(cat, state);
+      let n = n0;
+      for (; n - log.o < log.e.length && log.e[n - log.o][1] <= dt; n++) {
+        const [op, edt, a, b, c] = log.e[n - log.o];
+        apply(cat, grid, state, ix, op, log.t0 + edt, a, b, c);
+      }
+      return {state, ix, n};
+    }
+
+    return {
+      start, resume, record, at, dump: () => log,
+      get events() { return log.e; },
+      get count() { return log.o + log.e.length; },   // events ever recorded, including compacted ones
+    };
+  }
+
+  return {
+    create, apply, index, round4,
+    DROP, ANSWER, CLOSE, SET_LOCK, DRAG, TOGGLE, RESET, ASK,
+    IGNORED, MOVED, OCCUPIED, WRONG_ZONE, SNAPPED, LOCKED, OUT_OF_ORDER,
+  };
+})();
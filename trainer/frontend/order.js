@@ -0,0 +1,46 @@
+// --------------------- Assembly order ---------------------
+// The catalog's order DAG (catalog.build_order): per zone a row of
+// prerequisite bits, their count and the zone's dependents (CSR). The
+// tracker keeps how many prerequisites each zone still lacks plus a bitset
+// of filled zones; filling a zone only decrements its dependents, and
+// ready() is one array read however many rules there are.
+const BuildOrder = (() => {
+  function create(cat) {
+    const o = cat.order, W = o.words;
+    const missing = new Int32Array(cat.zones.length);
+    const filled = new Int32Array(W);
+
+    function clear() {
+      missing.set(o.need);
+      filled.fill(0);
+    }
+
+    function fill(zi) {
+      const w = zi >> 5, bit = 1 << (zi & 31);
+      if (filled[w] & bit) return;
+      filled[w] |= bit;
+      for (let k = o.dep_start[zi]; k < o.dep_start[zi + 1]; k++) missing[o.dep_zones[k]] -= 1;
+    }
+
+    const fillKey = (key) => fill(cat.zone_index[key]);
+    const ready = (zi) => missing[zi] === 0;
+
+    // Zone indexes still to fill before zi, lowest first.
+    function blockers(zi) {
+      const out = [];
+      for (let w = 0; w < W; w++) {
+        let m = o.req[zi * W + w] & ~filled[w];
+        while (m) {
+          out.push(w * 32 + 31 - Math.clz32(m & -m));
+          m &= m - 1;
+        }
+      }
+      return out;
+    }
+
+    clear();
+    return { clear, fill, fillKey, ready, blockers };
+  }
+
+  return { create };
+})();
@@ -0,0 +1,97 @@
+// --------------------- Event outbox ---------------------
+// Board events are queued and shipped to Python as one component value per
+// flush window (Python passes flush_ms), so a burst of drops costs the
+// server a single rerun. Each batch carries a sequence number so Python can
+// tell a fresh batch from the value Streamlit replays on every rerun; it
+// starts at the page's load time so it keeps rising across reloads of the
+// same session. Whatever is queued is flushed at once when the page is
+// hidden or unloaded, instead of waiting out the window.
+//
+// When Python passes ingest_url (trainer/ingest.py), batches are posted
+// there as NDJSON instead and never cause a rerun. Batches stay pending
+// until an ack has taken them (the service acks once they are committed): a
+// refused post (429, or 503 when its database failed) is resent after the
+// ack's retry_ms, and the ack's flush_ms stretches the window while the
+// service is busy. If the service can't be reached, whatever is pending
+// goes through Streamlit as before. The flush on the way out is a keepalive
+// post, so it outlives the page; keepalive bodies are capped, so a bigger
+// one goes through Streamlit instead.
+const Outbox = (() => {
+  const KEEPALIVE_MAX = 60000;     // bytes; browsers cap keepalive bodies at 64 KiB
+
+  function create(sessionId, summary) {
+    const queue = [];
+    const pending = [];
+    let seq = Date.now(), timer = null, lastFlush = 0, every = 0, posting = false;
+
+    function schedule(delay) {
+      if (timer) return;
+      const wait = Math.max(Bridge.args().flush_ms || 1000, every);
+      timer = setTimeout(flush, delay ?? Math.max(0, lastFlush + wait - Date.now()));
+    }
+
+    // Through Streamlit, one component value per session: values set in
+    // the same tick collapse into the last one, so batches are merged first.
+    function ship(batches) {
+      const merged = [];
+      for (const b of batches) {
+        const last = merged[merged.length - 1];
+        if (last && last.session === b.session) merged[merged.length - 1] = {...b, events: last.events.concat(b.events)};
+        else merged.push(b);
+      }
+      for (const value of merged) Bridge.post("streamlit:setComponentValue", {value, dataType: "json"});
+    }
+
+    // Batches are dropped from pending by identity, since a leaving post
+    // can overlap one still in flight.
+    function post(url, leaving) {
+      const cohort = Bridge.args().cohort;
+      const sent = pending.slice();
+      const body = sent.map(b => JSON.stringify(cohort ? {...b, cohort} : b)).join("\n");
+      if (leaving && new Blob([body]).size > KEEPALIVE_MAX) { ship(pending.splice(0)); return; }
+      if (!leaving) posting = true;
+      fetch(url, {method: "POST", body, keepalive: leaving})
+        .then(r => r.json())
+        .then(ack => {
+          if (!(ack.taken >= 0)) throw new Error(ack.error || "bad ack");
+          const taken = new Set(sent.slice(0, ack.taken));
+          for (let k = pending.length - 1; k >= 0; k--) if (taken.has(pending[k])) pending.splice(k, 1);
+          every = ack.flush_ms || 0;
+          if (pending.length) { clearTimeout(timer); timer = null; schedule(ack.retry_ms); }
+        })
+        .catch(() => ship(pending.splice(0)))
+        .finally(() => {
+          if (!leaving) posting = false;
+          if (queue.length || pending.length) schedule();
+        });
+    }
+
+    // leaving: the page is being hidden or unloaded, so send now even if a
+    // post is in flight (the service ignores batches it already has).
+    function flush(leaving = false) {
+      clearTimeout(timer);
+      timer = null;
+      if (queue.length) {
+        seq += 1;
+        pending.push({session: sessionId(), seq, events: queue.splice(0), summary: summary()});
+      }
+      if (!pending.length || (posting && !leaving)) return;
+      lastFlush = Date.now();
+      const url = Bridge.args().ingest_url;
+      if (url && window.fetch) post(url, leaving);
+      else ship(pending.splice(0));
+    }
+
+    function push(ev) {
+      queue.push(ev);
+      schedule();
+    }
+
+    document.addEventListener("visibilitychange", () => { if (document.visibilityState === "hidden") flush(true); });
+    window.addEventListener("pagehide", () => flush(true));
+
+    return { push, flush, pending: () => pending.length };
+  }
+
+  return { create };
+})();
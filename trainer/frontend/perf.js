@@ -0,0 +1,28 @@
+// --------------------- Bench instrumentation ---------------------
+// Off unless the page sets window.TRAINER_BENCH before the bundle loads (the
+// bench harness does); then hot paths record their durations in ms and the
+// harness reads them back from window.__trainerPerf.
+const Perf = (() => {
+  const on = !!window.TRAINER_BENCH;
+  const samples = {};
+  const marks = {};
+  const now = () => performance.now();
+
+  function record(name, t0) {
+    (samples[name] = samples[name] || []).push(now() - t0);
+  }
+  function time(name, fn) {
+    if (!on) return fn();
+    const t0 = now();
+    try { return fn(); } finally { record(name, t0); }
+  }
+  async function timeAsync(name, fn) {
+    if (!on) return fn();
+    const t0 = now();
+    try { return await fn(); } finally { record(name, t0); }
+  }
+  function mark(name) { if (on) marks[name] = now(); }
+
+  if (on) window.__trainerPerf = { samples, marks };
+  return { on, time, timeAsync, mark };
+})();
@@ -0,0 +1,228 @@
+// --------------------- Persistence ---------------------
+// Writes are coalesced: callers mark the state dirty and one compact snapshot
+// is written when the page goes idle, or right away when it is hidden/closed.
+// Boards and settings live in IndexedDB (see idb.js), so a write never blocks
+// the page or runs into the localStorage quota; localStorage is only used
+// when IndexedDB can't be opened, and as the source of a one-time migration.
+//
+// Snapshot v2 (parts/zones/questions by catalog index, quiz_scored derived
+// from build_log):
+//   {v:2, c:catalogVersion, s:session_id, t:start_ms, n:[score, wrong, streak, best],
+//    f:flags, p:[x,y, x,y, ...], z:[zoneIdx|-1 per part],
+//    l:[[event_id, partIdx, zoneIdx, qIdx, correct 1|0|-1], ...], pq:event_id|null}
+// v1 (the whole state object as JSON) is still read.
+//
+// The session journal (see journal.js), when bound, is written alongside in
+// the same flush (under `${key}_log` in localStorage).
+//
+// An IndexedDB write commits asynchronously, and the browser may kill it
+// once the page is gone. So when the page is hidden or closed, the board
+// also goes into localStorage synchronously (`${key}_checkpoint`). That
+// copy is dropped once an IndexedDB write at least as new commits. A copy
+// still there on the next load is newer than what IndexedDB holds: it is
+// loaded and written back.
+const Persist = (() => {
+  const VERSION = 2;
+  const FLAGS = ["show_hints", "show_labels", "lock_on", "sound_on"];
+  const round4 = (v) => Math.round(v * 1e4) / 1e4;
+
+  // v1 log entries carry the question itself rather than its index.
+  function questionIndex(cat, e) {
+    if (e.q_idx !== undefined) return e.q_idx;
+    const i = cat.quiz[e.kind].questions.findIndex(q => q[0] === (e.question && e.question[0]));
+    return Math.max(0, i);
+  }
+
+  function encode(state, cat) {
+    const p = new Array(state.parts.length * 2);
+    const z = new Array(state.parts.length);
+    state.parts.forEach((part, i) => {
+      p[2*i] = round4(part.x); p[2*i+1] = round4(part.y);
+      z[i] = part.locked ? cat.zone_index[part.zone] : -1;
+    });
+    let f = 0;
+    FLAGS.forEach((k, i) => { if (state[k]) f |= 1 << i; });
+    return {
+      v: VERSION, c: cat.version, s: state.session_id, t: state.start_ms,
+      n: [state.score, state.wrong, state.quiz_streak, state.best_streak],
+      f, p, z,
+      l: state.build_log.map(e => [
+        e.event_id, cat.part_index[e.part_id], cat.zone_index[e.zone_key], questionIndex(cat, e),
+        e.quiz_correct === true ? 1 : e.quiz_correct === false ? 0 : -1,
+      ]),
+      pq: state.pending_quiz ? state.pending_quiz.event_id : null,
+    };
+  }
+
+  // Fills base (a default state) from a snapshot. If the snapshot was
+  // written against another catalog its indexes can't be trusted, so only the
+  // toggles carry over.
+  function decode(snap, cat, base) {
+    const out = base;
+    FLAGS.forEach((k, i) => { out[k] = !!(snap.f & (1 << i)); });
+    if (snap.c !== cat.version) return out;
+
+    if (snap.s) out.session_id = snap.s;
+    out.start_ms = snap.t;
+    [out.score, out.wrong, out.quiz_streak, out.best_streak] = snap.n;
+    out.parts = cat.parts.map((p, i) => {
+      const zi = snap.z[i];
+      return {...p, x:snap.p[2*i], y:snap.p[2*i+1], locked: zi >= 0, zone: zi >= 0 ? cat.zones[zi].key : null};
+    });
+    out.quiz_scored = {};
+    out.build_log = snap.l.map(([event_id, pi, zi, q_idx, c]) => {
+      const part = cat.parts[pi], zone = cat.zones[zi];
+      const bank = cat.quiz[part.kind];
+      if (c >= 0) out.quiz_scored[event_id] = true;
+      return {
+        event_id, kind: part.kind, part_id: part.id, part_label: part.label,
+        zone_key: zone.key, zone_name: zone.name,
+        q_idx, question: bank.questions[q_idx] || bank.questions[0],
+        quiz_correct: c === 1 ? true : c === 0 ? false : null,
+      };
+    });
+    out.pending_quiz = snap.pq ? (out.build_log.find(e => e.event_id === snap.pq) || null) : null;
+    return out;
+  }
+
+  function readLocal(key) {
+    try {
+      const raw = localStorage.getItem(key);
+      if (!raw) return null;
+      return {snap: JSON.parse(raw), log: JSON.parse(localStorage.getItem(`${key}_log`))};
+    } catch(e) { return null; }
+  }
+
+  function writeLocal(key, snap, log) {
+    try {
+      localStorage.setItem(key, JSON.stringify(snap));
+      if (log) localStorage.setItem(`${key}_log`, JSON.stringify(log));
+    } catch(e) {}
+  }
+
+  function readCheckpoint(key) {
+    try { return JSON.parse(localStorage.getItem(`${key}_checkpoint`)); } catch(e) { return null; }
+  }
+
+  function writeCheckpoint(key, snap, log) {
+    try { localStorage.setItem(`${key}_checkpoint`, JSON.stringify({snap, log})); } catch(e) {}
+  }
+
+  function dropCheckpoint(key) {
+    try { localStorage.removeItem(`${key}_checkpoint`); } catch(e) {}
+  }
+
+  // A board saved by an older build, from localStorage into IndexedDB. The
+  // old keys are only removed once the copy has committed.
+  function migrate(db, key, mark) {
+    const saved = readLocal(key);
+    if (saved) BoardDB.writeBoard(db, key, saved.snap, saved.log, mark).then(() => {
+      localStorage.removeItem(key);
+      localStorage.removeItem(`${key}_log`);
+    }, () => {});
+    return saved;
+  }
+
+  function create(key, cat, {idleMs = 800} = {}) {
+    let getState = () => null, getLog = null;
+    let dirty = false, scheduled = false;
+    let db = null;                                // null: localStorage
+    const mark = {s: null, o: 0, e: 0, k: -1};    // journal rows already in IndexedDB
+    let writes = 0, committed = 0, checkpoint = 0;  // IndexedDB writes started / newest committed
+
+    let opened = null;
+    function open() {
+      if (!opened) opened = (async () => {
+        db = await BoardDB.open();
+        if (!db) return readLocal(key);
+        const saved = await BoardDB.readBoard(db, key, mark).catch(() => null);
+        const left = readCheckpoint(key);
+        if (left && left.snap) {
+          BoardDB.writeBoard(db, key, left.snap, left.log, mark).then(() => dropCheckpoint(key), () => {});
+          return left;
+        }
+        return saved || migrate(db, key, mark);
+      })();
+      return opened;
+    }
+
+    async function load(defaults) {
+      const saved = await open();
+      try {
+        const snap = saved && saved.snap;
+        if (!snap) return null;
+        return snap.v === VERSION ? decode(snap, cat, defaults()) : snap;
+      } catch(e) { return null; }
+    }
+
+    async function loadLog() {
+      const saved = await open();
+      return saved && saved.log;
+    }
+
+    function save(leaving) {
+      const snap = encode(getState(), cat), log = getLog ? getLog() : null;
+      if (!db) { dirty = false; return writeLocal(key, snap, log); }
+      // still needed if an earlier write hasn't committed yet
+      if (leaving) { writeCheckpoint(key, snap, log); checkpoint = writes; }
+      if (!dirty) return;
+      dirty = false;
+      const n = ++writes;
+      if (leaving) checkpoint = n;
+      BoardDB.writeBoard(db, key, snap, log, mark).then(() => {
+        committed = Math.max(committed, n);
+        if (checkpoint && committed >= checkpoint) { dropCheckpoint(key); checkpoint = 0; }
+      }, () => { dirty = true; });
+    }
+
+    // leaving: the page is being hidden or closed (see the checkpoint above).
+    function flush(leaving) {
+      scheduled = false;
+      leaving = leaving === true;
+      if (!dirty && !(leaving && db && committed < writes)) return;
+      Perf.time("saveState", () => save(leaving));
+    }
+
+    function markDirty() {
+      dirty = true;
+      if (scheduled) return;
+      scheduled = true;
+      if (window.requestIdleCallback) window.requestIdleCallback(flush, {timeout: idleMs});
+      else setTimeout(flush, idleMs);
+    }
+
+    function bind(fn, logFn = null) {
+      getState = fn;
+      getLog = logFn;
+      document.addEventListener("visibilitychange", () => { if (document.visibilityState === "hidden") flush(true); });
+      window.addEventListener("pagehide", () => flush(true));
+    }
+
+    return { load, loadLog, flush, markDirty, bind };
+  }
+
+  // Small per-device settings objects, kept under `key` (in the settings
+  // store, or localStorage as before); missing fields come from defaults.
+  async function loadSettings(key, defaults) {
+    const out = {...defaults};
+    const db = await BoardDB.open();
+    try {
+      let saved = db ? await BoardDB.getSetting(db, key) : null;
+      if (saved == null) {
+        saved = JSON.parse(localStorage.getItem(key));
+        if (db && saved) BoardDB.putSetting(db, key, saved).then(() => localStorage.removeItem(key), () => {});
+      }
+      Object.assign(out, saved);
+    } catch(e) {}
+    return out;
+  }
+
+  function saveSettings(key, value) {
+    BoardDB.open().then((db) => {
+      if (db) return BoardDB.putSetting(db, key, {...value});
+      localStorage.setItem(key, JSON.stringify(value));
+    }).catch(() => {});
+  }
+
+  return { create, loadSettings, saveSettings, encode, decode, VERSION, FLAGS };
+})();
@@ -0,0 +1,52 @@
+// --------------------- Node pool ---------------------
+// Keeps Konva nodes only for the items currently in view. A node whose item
+// leaves the view is hidden and parked on a free list, then rebound to the
+// next item that enters it, so the node count follows what fits on screen
+// rather than the size of the catalog.
+const NodePool = (() => {
+  // make() builds a node; bind(node, item) points it at an item.
+  function create(make, bind) {
+    const live = new Map();   // item -> node
+    const free = [];
+    let made = 0;
+
+    function acquire(item) {
+      let node = live.get(item);
+      if (node) return node;
+      node = free.pop();
+      if (!node) { node = make(); made += 1; }
+      bind(node, item);
+      node.visible(true);
+      live.set(item, node);
+      return node;
+    }
+
+    function release(item) {
+      const node = live.get(item);
+      if (!node) return;
+      live.delete(item);
+      node.visible(false);
+      free.push(node);
+    }
+
+    // Makes `items` exactly the live set; pinned(item) keeps a node that is
+    // busy (mid-drag, mid-tween) even if its item left the view.
+    function sync(items, pinned) {
+      const want = new Set(items);
+      for (const item of Array.from(live.keys())) {
+        if (!want.has(item) && !(pinned && pinned(item))) release(item);
+      }
+      for (const item of want) acquire(item);
+    }
+
+    return {
+      acquire, release, sync,
+      get: (item) => live.get(item),
+      live: () => live.entries(),
+      get size() { return live.size; },
+      get made() { return made; },
+    };
+  }
+
+  return { create };
+})();
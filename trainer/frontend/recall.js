@@ -0,0 +1,136 @@
+// --------------------- Quiz scheduler ---------------------
+// Spaced repetition per learner (this browser), SM-2 style: every answered
+// question has a due time, an ease and an interval; a right answer pushes it
+// out (1 day, 6 days, then interval x ease), a wrong one brings it back in
+// RELEARN minutes and lowers its ease.
+//
+// Each kind is a deck of typed arrays indexed by question, plus a binary
+// min-heap of the answered questions keyed by due time (with each
+// question's heap slot, so a re-grade moves it in place). next() is the heap
+// top if it is due, else the next unseen question in catalog difficulty
+// order (cat.quiz_order), else the earliest review: amortized O(1).
+// grade() is O(log n). Unseen questions cost nothing, so banks can be large.
+//
+// Saved per kind as {h: bank hash, f: unseen cursor, r: [q, due, ease,
+// interval, reps, ...]} (minutes, ease x100) over answered questions only;
+// a kind whose bank changed starts over.
+const Recall = (() => {
+  const MIN = 60000;
+  const DAY = 1440;
+  const RELEARN = 10;
+  const EASE0 = 250, EASE_MIN = 130;
+  const Q_RIGHT = 5, Q_WRONG = 2;          // SM-2 response quality
+
+  function deck(order) {
+    const n = order.length;
+    return {
+      order, fresh: 0,
+      due: new Uint32Array(n), ease: new Uint16Array(n), ivl: new Uint32Array(n), reps: new Uint8Array(n),
+      heap: new Int32Array(n), pos: new Int32Array(n).fill(-1), size: 0,
+    };
+  }
+
+  function swap(d, i, j) {
+    const a = d.heap[i], b = d.heap[j];
+    d.heap[i] = b; d.pos[b] = i;
+    d.heap[j] = a; d.pos[a] = j;
+  }
+
+  function up(d, i) {
+    while (i > 0) {
+      const p = (i - 1) >> 1;
+      if (d.due[d.heap[p]] <= d.due[d.heap[i]]) return;
+      swap(d, i, p);
+      i = p;
+    }
+  }
+
+  function down(d, i) {
+    for (;;) {
+      const l = 2*i + 1, r = l + 1;
+      let m = i;
+      if (l < d.size && d.due[d.heap[l]] < d.due[d.heap[m]]) m = l;
+      if (r < d.size && d.due[d.heap[r]] < d.due[d.heap[m]]) m = r;
+      if (m === i) return;
+      swap(d, i, m);
+      i = m;
+    }
+  }
+
+  // Inserts q, or re-sifts it after its due time changed.
+  function place(d, q) {
+    if (d.pos[q] < 0) {
+      d.heap[d.size] = q; d.pos[q] = d.size++;
+      up(d, d.size - 1);
+    } else {
+      up(d, d.pos[q]);
+      down(d, d.pos[q]);
+    }
+  }
+
+  function create(cat) {
+    const decks = {};
+    let other = {};        // saved kinds this airframe doesn't use, kept as they were
+    for (const kind of Object.keys(cat.quiz)) decks[kind] = deck(cat.quiz_order[kind]);
+
+    // Question index to ask next for a kind.
+    function next(kind, tMs) {
+      const d = decks[kind];
+      if (d.size && d.due[d.heap[0]] <= tMs / MIN) return d.heap[0];
+      while (d.fresh < d.order.length && d.pos[d.order[d.fresh]] >= 0) d.fresh++;
+      if (d.fresh < d.order.length) return d.order[d.fresh];
+      return d.heap[0];
+    }
+
+    function grade(kind, q, correct, tMs) {
+      const d = decks[kind];
+      if (!d || !(q >= 0 && q < d.order.length)) return;
+      if (d.pos[q] < 0) d.ease[q] = EASE0;
+      const quality = correct ? Q_RIGHT : Q_WRONG;
+      d.ease[q] = Math.max(EASE_MIN, d.ease[q] + 10 - (5 - quality) * (8 + (5 - quality) * 2));
+      if (correct) {
+        d.ivl[q] = d.reps[q] === 0 ? DAY : d.reps[q] === 1 ? 6 * DAY : Math.round(d.ivl[q] * d.ease[q] / 100);
+        d.reps[q] = Math.min(255, d.reps[q] + 1);
+      } else {
+        d.ivl[q] = RELEARN;
+        d.reps[q] = 0;
+      }
+      d.due[q] = Math.floor(tMs / MIN) + d.ivl[q];
+      place(d, q);
+    }
+
+    function dump() {
+      const out = {...other};
+      for (const [kind, d] of Object.entries(decks)) {
+        if (!d.size) continue;
+        const r = new Array(d.size * 5);
+        for (let i = 0; i < d.size; i++) {
+          const q = d.heap[i];
+          r[5*i] = q; r[5*i+1] = d.due[q]; r[5*i+2] = d.ease[q]; r[5*i+3] = d.ivl[q]; r[5*i+4] = d.reps[q];
+        }
+        out[kind] = {h: cat.quiz_version[kind], f: d.fresh, r};
+      }
+      return out;
+    }
+
+    function restore(saved) {
+      other = {};
+      for (const [kind, s] of Object.entries(saved || {})) {
+        const d = decks[kind];
+        if (!d) { other[kind] = s; continue; }
+        if (!s || s.h !== cat.quiz_version[kind]) continue;
+        d.fresh = s.f;
+        for (let i = 0; i + 4 < s.r.length; i += 5) {
+          const q = s.r[i];
+          if (!(q >= 0 && q < d.order.length)) continue;
+          d.due[q] = s.r[i+1]; d.ease[q] = s.r[i+2]; d.ivl[q] = s.r[i+3]; d.reps[q] = s.r[i+4];
+          place(d, q);
+        }
+      }
+    }
+
+    return { next, grade, dump, restore, decks };
+  }
+
+  return { create };
+})();
@@ -0,0 +1,33 @@
+// --------------------- Icon atlas (rasterized in Python) ---------------------
+// One PNG per pixel ratio; pick the closest sheet at or above this screen's
+// DPR, decode it once and crop every part icon out of it. The board and the
+// classroom view (classroom.js) both draw from it.
+const IconSheet = (() => {
+  function create(atlas) {
+    const sheet = (() => {
+      const want = Math.ceil(window.devicePixelRatio || 1);
+      const dprs = Object.keys(atlas.sheets).map(Number).sort((a,b) => a-b);
+      const d = dprs.find(d => d >= want) || dprs[dprs.length-1];
+      return atlas.sheets[String(d)];
+    })();
+
+    let image = null;
+    function load() {
+      if (!image) image = new Promise((resolve) => {
+        const img = new Image();
+        img.onload = () => resolve(img);
+        img.src = sheet.src;
+      });
+      return image;
+    }
+
+    function crop(kind) {
+      const r = sheet.rects[kind] || sheet.rects[atlas.fallback];
+      return {x:r[0], y:r[1], width:r[2], height:r[3]};
+    }
+
+    return { sheet, load, crop };
+  }
+
+  return { create };
+})();
@@ -0,0 +1,71 @@
+// --------------------- Sound effects ---------------------
+// Every effect is rendered ahead of time in Python (sfx.py) and shipped as
+// 16-bit PCM. One AudioContext serves the page: it is opened by the first
+// pointer or key press (browsers only allow audio after a gesture), decodes
+// each effect into an AudioBuffer once, and stays open. A play is then one
+// AudioBufferSourceNode on a cached buffer; at most `voices` play at once and
+// the oldest is cut to make room, so a burst of drops can't pile up sounds.
+const Sound = (() => {
+  function create(manifest, {voices = 6} = {}) {
+    let ctx = null, out = null;
+    const buffers = {};
+    const playing = [];   // oldest first
+
+    function decode(b64) {
+      const bin = atob(b64);
+      const n = bin.length >> 1;
+      const buf = ctx.createBuffer(1, n, manifest.rate);
+      const ch = buf.getChannelData(0);
+      for (let i = 0; i < n; i++) {
+        const v = bin.charCodeAt(2*i) | (bin.charCodeAt(2*i+1) << 8);
+        ch[i] = (v >= 32768 ? v - 65536 : v) / 32768;
+      }
+      return buf;
+    }
+
+    function warm() {
+      if (!ctx) {
+        const AC = window.AudioContext || window.webkitAudioContext;
+        if (!AC) return null;
+        ctx = new AC();
+        out = ctx.createGain();
+        out.connect(ctx.destination);
+        for (const [name, pcm] of Object.entries(manifest.sounds)) buffers[name] = decode(pcm);
+      }
+      if (ctx.state === "suspended") ctx.resume();
+      return ctx;
+    }
+
+    function play(name) {
+      const c = warm();
+      const buf = buffers[name];
+      if (!c || !buf) return;
+      if (playing.length >= voices) {
+        const oldest = playing.shift();
+        try { oldest.stop(); } catch(e) {}
+      }
+      const src = c.createBufferSource();
+      src.buffer = buf;
+      src.connect(out);
+      src.onended = () => {
+        const k = playing.indexOf(src);
+        if (k >= 0) playing.splice(k, 1);
+        src.disconnect();
+      };
+      playing.push(src);
+      src.start();
+    }
+
+    const onGesture = () => {
+      try { warm(); } catch(e) {}
+      window.removeEventListener("pointerdown", onGesture, true);
+      window.removeEventListener("keydown", onGesture, true);
+    };
+    window.addEventListener("pointerdown", onGesture, true);
+    window.addEventListener("keydown", onGesture, true);
+
+    return { play, warm };
+  }
+
+  return { create };
+})();
@@ -0,0 +1,136 @@
+// --------------------- Zone spatial index ---------------------
+// Reads the uniform grid compiled in Python (catalog.grid). A query touches one
+// bucket, compares squared distances and can filter by a kind bitmask.
+const ZoneGrid = (() => {
+  function create(cat) {
+    const zones = cat.zones;
+    const n = cat.grid.n;
+    const start = Int32Array.from(cat.grid.cell_start);
+    const ids = Int32Array.from(cat.grid.cell_zones);
+    const xs = Float64Array.from(zones, z => z.x);
+    const ys = Float64Array.from(zones, z => z.y);
+    const masks = Int32Array.from(zones, z => z.mask);
+    const r2 = cat.radius * cat.radius;
+
+    function cellOf(xn, yn) {
+      const c = Math.min(n - 1, Math.max(0, Math.floor(xn * n)));
+      const r = Math.min(n - 1, Math.max(0, Math.floor(yn * n)));
+      return r * n + c;
+    }
+
+    // Index of the nearest zone within the snap radius, or -1.
+    // mask = -1 accepts every zone; pass kind_bit[kind] to only consider zones
+    // that allow that kind.
+    function nearestIndex(xn, yn, mask = -1) {
+      const cell = cellOf(xn, yn);
+      let best = -1, bestD = r2;
+      for (let k = start[cell], end = start[cell + 1]; k < end; k++) {
+        const i = ids[k];
+        if ((masks[i] & mask) === 0) continue;
+        const dx = xn - xs[i], dy = yn - ys[i];
+        const d = dx*dx + dy*dy;
+        if (d < bestD || (d === bestD && best < 0)) { bestD = d; best = i; }
+      }
+      return best;
+    }
+
+    function nearest(xn, yn, mask = -1) {
+      const i = nearestIndex(xn, yn, mask);
+      return i < 0 ? null : zones[i];
+    }
+
+    // Indexes of zones whose centre lies in [x0,x1] x [y0,y1] (viewport
+    // culling). Only the buckets under the rectangle are read; a zone listed
+    // in several of them is reported once.
+    const seen = new Uint32Array(zones.length);
+    let stamp = 0;
+    function inRect(x0, y0, x1, y1) {
+      const out = [];
+      stamp += 1;
+      const c0 = Math.max(0, Math.floor(x0 * n)), c1 = Math.min(n - 1, Math.floor(x1 * n));
+      const r0 = Math.max(0, Math.floor(y0 * n)), r1 = Math.min(n - 1, Math.floor(y1 * n));
+      for (let r = r0; r <= r1; r++) {
+        for (let c = c0; c <= c1; c++) {
+          const cell = r * n + c;
+          for (let k = start[cell], end = start[cell + 1]; k < end; k++) {
+            const i = ids[k];
+            if (seen[i] === stamp) continue;
+            seen[i] = stamp;
+            if (xs[i] >= x0 && xs[i] <= x1 && ys[i] >= y0 && ys[i] <= y1) out.push(i);
+          }
+        }
+      }
+      return out;
+    }
+
+    return { nearest, nearestIndex, cellOf, inRect };
+  }
+
+  return { create };
+})();
+
+// --------------------- Part spatial index ---------------------
+// Where every part sits, bucketed on the same grid as the zones so culling
+// reads only the cells in view, plus the tray (parts not on the board) in
+// catalog order. Both are kept up to date per move, so neither a drop nor a
+// pan frame walks the whole catalog.
+const PartGrid = (() => {
+  function create(cat, tray) {
+    const n = cat.grid.n, count = cat.parts.length;
+    const cells = Array.from({length: n * n}, () => new Set());
+    const cellOf = new Int32Array(count).fill(-1);   // -1: in the tray
+    const xs = new Float64Array(count), ys = new Float64Array(count);
+    const inTray = [];
+
+    function cell(xn, yn) {
+      const c = Math.min(n - 1, Math.max(0, Math.floor(xn * n)));
+      const r = Math.min(n - 1, Math.max(0, Math.floor(yn * n)));
+      return r * n + c;
+    }
+
+    function slot(i) {
+      let lo = 0, hi = inTray.length;
+      while (lo < hi) { const mid = (lo + hi) >> 1; if (inTray[mid] < i) lo = mid + 1; else hi = mid; }
+      return lo;
+    }
+
+    function place(i, x, y) {
+      xs[i] = x; ys[i] = y;
+      if (x === tray) { cellOf[i] = -1; inTray.splice(slot(i), 0, i); }
+      else { cellOf[i] = cell(x, y); cells[cellOf[i]].add(i); }
+    }
+
+    // Part i now sits at (x, y), or in the tray when x is the tray marker.
+    function move(i, x, y) {
+      if (cellOf[i] >= 0) cells[cellOf[i]].delete(i);
+      else { const k = slot(i); if (inTray[k] === i) inTray.splice(k, 1); }
+      place(i, x, y);
+    }
+
+    function reset(parts) {
+      for (const c of cells) c.clear();
+      inTray.length = 0;
+      parts.forEach((p, i) => place(i, p.x, p.y));
+    }
+
+    // Indexes of placed parts inside [x0,x1] x [y0,y1].
+    function inRect(x0, y0, x1, y1) {
+      const out = [];
+      const c0 = Math.max(0, Math.floor(x0 * n)), c1 = Math.min(n - 1, Math.floor(x1 * n));
+      const r0 = Math.max(0, Math.floor(y0 * n)), r1 = Math.min(n - 1, Math.floor(y1 * n));
+      for (let r = r0; r <= r1; r++) {
+        for (let c = c0; c <= c1; c++) {
+          for (const i of cells[r * n + c]) {
+            if (xs[i] >= x0 && xs[i] <= x1 && ys[i] >= y0 && ys[i] <= y1) out.push(i);
+          }
+        }
+      }
+      return out;
+    }
+
+    // tray() is the live list of tray part indexes, ascending: read only.
+    return { reset, move, inRect, tray: () => inTray };
+  }
+
+  return { create };
+})();
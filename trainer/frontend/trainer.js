@@ -0,0 +1,996 @@
+(async () => {
+  // --------------------- Persistence ---------------------
+  const STORE_KEY = "drone_assembly_onefile_v1";
+  const nowMs = () => Date.now();
+
+  // How this device draws the board, shared by every airframe. Not session
+  // state, so it never goes through the journal.
+  const PREFS_KEY = "drone_trainer_prefs";
+  const prefs = await Persist.loadSettings(PREFS_KEY, {low_power:false, fps:false});
+  function savePrefs(){ Persist.saveSettings(PREFS_KEY, prefs); }
+
+  // --------------------- Sound effects ---------------------
+  const sound = Sound.create(window.TRAINER_SFX);
+  function sfx(name) {
+    if (!state.sound_on) return;
+    try { sound.play(name); } catch(e) {}
+  }
+
+  // --------------------- Icon atlas (see sheet.js) ---------------------
+  const ATLAS = window.TRAINER_ATLAS;
+  const icons = IconSheet.create(ATLAS);
+  const loadAtlas = icons.load, iconCrop = icons.crop;
+
+  // The locked glow is a pre-blurred sprite on the same sheet: frame `inset`
+  // px around the icon, halo `blur` px beyond that.
+  const GLOW_OFF = -(ATLAS.glow.inset + ATLAS.glow.blur);
+  const GLOW_SIZE = ATLAS.icon - 2*GLOW_OFF;
+
+  // --------------------- Catalog (compiled in Python) ---------------------
+  // zones/parts/QUIZ plus lookup tables: zone_index, part_index, kind_bit and a
+  // per-zone allow mask, so a drop never scans a list.
+  const CAT = window.TRAINER_CATALOG;
+  const zones = CAT.zones;
+  const QUIZ = CAT.quiz;
+  const zoneByKey = (key) => zones[CAT.zone_index[key]];
+  const zoneGrid = ZoneGrid.create(CAT);
+
+  // --------------------- Quiz scheduling ---------------------
+  // Which question a lock asks is up to this browser's recall history (kept
+  // with the prefs, across sessions and airframes); the pick goes into the
+  // journal as an ASK so replays see the same question.
+  const RECALL_KEY = "drone_trainer_recall";
+  const recall = Recall.create(CAT);
+  recall.restore(await Persist.loadSettings(RECALL_KEY, {}));
+
+  // --------------------- State ---------------------
+  const newSessionId = () => `${nowMs().toString(36)}${Math.random().toString(36).slice(2, 8)}`;
+
+  const defaultState = () => ({
+    session_id: newSessionId(),
+    start_ms: nowMs(),
+    score: 0,
+    wrong: 0,
+    quiz_streak: 0,
+    best_streak: 0,
+    quiz_scored: {},          // lockEventId -> true
+    build_log: [],            // entries for library
+    pending_quiz: null,       // current quiz entry
+    lock_on: true,
+    show_hints: true,
+    show_labels: false,
+    sound_on: true,
+    parts: initParts(),       // array
+  });
+
+  function initParts() {
+    return CAT.parts.map(p => ({...p, locked:false, zone:null}));
+  }
+
+  // Saved boards are re-aligned to catalog order so part_index stays valid.
+  function reconcileParts(saved) {
+    const byId = new Map((saved || []).map(p => [p.id, p]));
+    return CAT.parts.map(p => Object.assign({...p, locked:false, zone:null}, byId.get(p.id) || {}));
+  }
+
+  // --------------------- Runtime indexes ---------------------
+  // Derived from state; rebuilt on load/reset and maintained on every lock.
+  const occupant = new Map();   // zoneKey -> partId
+  const logById = new Map();    // event_id -> build_log entry
+  const order = BuildOrder.create(CAT);   // which zones can take a lock yet
+
+  // Running quiz tallies for the grade: attempts = locks logged (one quiz
+  // each), correct = quizzes answered right. Best streak lives in state.
+  const tally = {attempts:0, correct:0};
+  const ix = {occupant, logById, order, tally};
+
+  function rebuildIndexes() { Journal.index(state, ix); }
+
+  // saveState() only marks the board dirty; Persist batches the actual write.
+  // Each airframe keeps its own board (the quad keeps the original key).
+  const store = Persist.create(CAT.airframe === "quad" ? STORE_KEY : `${STORE_KEY}:${CAT.airframe}`, CAT);
+  function saveState() { store.markDirty(); }
+
+  let state = (await store.load(defaultState)) || defaultState();
+  if (!state.session_id) state.session_id = newSessionId();
+  store.bind(() => state, () => journal.dump());
+  state.parts = reconcileParts(state.parts);
+  rebuildIndexes();
+
+  // Apply UI toggles to state (if loaded)
+  function syncTogglesFromState(){
+    document.getElementById("tHints").checked = !!state.show_hints;
+    document.getElementById("tLabels").checked = !!state.show_labels;
+    document.getElementById("tLock").checked = !!state.lock_on;
+    document.getElementById("tSound").checked = !!state.sound_on;
+    document.getElementById("tLowPower").checked = !!prefs.low_power;
+    document.getElementById("tFps").checked = !!prefs.fps;
+  }
+
+  // --------------------- UI refs ---------------------
+  const kScore = document.getElementById("kScore");
+  const kTime  = document.getElementById("kTime");
+  const kStreak= document.getElementById("kStreak");
+  const kBest  = document.getElementById("kBest");
+  const kWrong = document.getElementById("kWrong");
+  const kGrade = document.getElementById("kGrade");
+  const msg    = document.getElementById("msg");
+  const hoverLine = document.getElementById("hoverLine");
+
+  const quizOverlay = document.getElementById("quizOverlay");
+  const qTitle = document.getElementById("qTitle");
+  const qSub = document.getElementById("qSub");
+  const qWhat = document.getElementById("qWhat");
+  const qGotchas = document.getElementById("qGotchas");
+  const qQuestion = document.getElementById("qQuestion");
+  const qOptions = document.getElementById("qOptions");
+  const qResult = document.getElementById("qResult");
+  const btnCheck = document.getElementById("btnCheck");
+  const btnClose = document.getElementById("btnClose");
+
+  // --------------------- Metrics + Grade ---------------------
+  function elapsedS() { return Math.floor((nowMs() - state.start_ms) / 1000); }
+
+  function computeGrade() {
+    const t = Math.max(1, elapsedS());
+    const wrong = state.wrong;
+    const totalQuiz = tally.attempts; // approximates attempts
+    const correctQuiz = tally.correct;
+    const acc = totalQuiz ? (correctQuiz / totalQuiz) : 0;
+    const best = state.best_streak;
+
+    const timeScore = Math.max(0, 35 * (1 - Math.min(1, (t - 120) / 360)));
+    const accScore = 35 * acc;
+    const streakScore = 20 * Math.min(1, best / 10);
+    const penalty = Math.min(20, wrong * 2);
+
+    const score100 = Math.max(0, Math.min(100, timeScore + accScore + streakScore - penalty));
+
+    let grade = "F";
+    if (score100 >= 95) grade = "A+";
+    else if (score100 >= 90) grade = "A";
+    else if (score100 >= 80) grade = "B";
+    else if (score100 >= 70) grade = "C";
+    else if (score100 >= 60) grade = "D";
+    return grade;
+  }
+
+  // Last painted value per field; the DOM is only touched when it differs.
+  const painted = new Map();
+  function paint(el, value){
+    const v = String(value);
+    if (painted.get(el) === v) return;
+    painted.set(el, v);
+    el.textContent = v;
+  }
+
+  function updateHUD(){
+    paint(kScore, state.score);
+    paint(kTime, elapsedS());
+    paint(kStreak, state.quiz_streak);
+    paint(kBest, state.best_streak);
+    paint(kWrong, state.wrong);
+    paint(kGrade, computeGrade());
+  }
+
+  // The clock only ticks while the tab is visible.
+  let hudTimer = null;
+  function syncHudTimer(){
+    const visible = document.visibilityState !== "hidden";
+    if (visible && !hudTimer) { updateHUD(); hudTimer = setInterval(updateHUD, 250); }
+    if (!visible && hudTimer) { clearInterval(hudTimer); hudTimer = null; }
+  }
+
+  // --------------------- Events to Python ---------------------
+  const outbox = Outbox.create(() => state.session_id, () => ({
+    score: state.score, wrong: state.wrong, quiz_streak: state.quiz_streak,
+    best_streak: state.best_streak, locked: occupant.size, parts: state.parts.length,
+    elapsed_s: elapsedS(), grade: computeGrade(),
+  }));
+  function emit(type, data){ outbox.push(Object.assign({t: nowMs(), type}, data)); }
+
+  // --------------------- Journal ---------------------
+  // Every state change goes through dispatch(): applied by Journal.apply,
+  // appended to the journal and shipped to Python as an "op" event, with the
+  // journal's periodic snapshots shipped alongside.
+  const journal = Journal.create(CAT, zoneGrid);
+
+  function shipSnapshot(k){
+    if (k) emit("snapshot", {t: state.start_ms + k[1], n: k[0], snap: k[2]});
+  }
+  shipSnapshot(journal.resume(await store.loadLog(), state));
+
+  function dispatch(op, a=0, b=0, c=0){
+    const t = nowMs();
+    const result = Journal.apply(CAT, zoneGrid, state, ix, op, t, a, b, c);
+    if (op === Journal.DROP) placed.move(a, state.parts[a].x, state.parts[a].y);
+    emit("op", {t, n: journal.count, op, a, b, c});
+    shipSnapshot(journal.record(state, op, t, a, b, c));
+    saveState();
+    return result;
+  }
+
+  // --------------------- Konva Board ---------------------
+  // The board is a viewport onto a world WORLD times its size (1 for the
+  // quad), panned by dragging the background or with the wheel. Unplaced parts
+  // sit in a paged tray below it. Zone and part nodes come from pools that
+  // only hold what is in view, so the node count stays flat however many
+  // parts the airframe has.
+  const WORLD = CAT.world || 1;
+  const TRAY = -1;
+  const TRAY_H = ATLAS.icon + 44;
+  const SLOT_W = ATLAS.icon + 26;
+  const ARROW_W = 34;
+  const CULL_MARGIN = ATLAS.icon + 140;   // icon plus zone label width
+
+  let stage=null, bgLayer=null, zonesLayer=null, hotLayer=null, partsLayer=null, trayLayer=null;
+  let W = 0, H = 0, boardH = 0, WW = 0, HH = 0;   // stage, board viewport, world (px)
+  const view = {x:0, y:0};                         // world px at the viewport's top-left
+  let atlasImg = null;
+
+  function getCanvasSize(){
+    const stageDiv = document.getElementById("stage");
+    const w = Math.max(420, stageDiv.clientWidth || 900);
+    const aspect = 1100/680;
+    const h = Math.max(320, Math.floor(w/aspect));
+    return {W:w, H:h + TRAY_H, boardH:h};
+  }
+
+  function setSize(){
+    ({W, H, boardH} = getCanvasSize());
+    WW = W * WORLD; HH = boardH * WORLD;
+  }
+
+  function pxToNorm(x, y){
+    return {x: Math.min(1, Math.max(0, x/WW)), y: Math.min(1, Math.max(0, y/HH))};
+  }
+
+  // Board nodes are created once and re-laid out in place on resize; nothing
+  // below destroys and re-creates nodes after the first render.
+  let bgNodes = null;
+  let zoneR = 20;
+
+  function drawBackground(){
+    if (!bgNodes) {
+      bgNodes = {
+        rect: new Konva.Rect({x:0, y:0, fill:"#08110c"}),
+        // whole grid as one shape, only the lines inside the viewport
+        grid: new Konva.Shape({
+          stroke:"#122116", strokeWidth:1, opacity:0.55, listening:false,
+          sceneFunc: (c, shape) => {
+            const step = Math.max(55, Math.floor(Math.min(W,boardH)/10));
+            const x1 = view.x + W, y1 = view.y + boardH;
+            c.beginPath();
+            for (let x=Math.ceil(view.x/step)*step; x<=x1; x+=step){ c.moveTo(x,view.y); c.lineTo(x,y1); }
+            for (let y=Math.ceil(view.y/step)*step; y<=y1; y+=step){ c.moveTo(view.x,y); c.lineTo(x1,y); }
+            c.strokeShape(shape);
+          }
+        }),
+        hLine: new Konva.Line({stroke:"#00ff88", strokeWidth:2, opacity:0.9, listening:false}),
+        vLine: new Konva.Line({stroke:"#00ff88", strokeWidth:2, opacity:0.9, listening:false}),
+        dot: new Konva.Circle({radius:10, stroke:"#00ff88", strokeWidth:2, opacity:0.9, listening:false}),
+      };
+      Object.values(bgNodes).forEach(n => bgLayer.add(n));
+      bgNodes.rect.on("pointerdown", startPan);
+    }
+
+    const cx=WW/2, cy=HH/2;
+    bgNodes.rect.width(W); bgNodes.rect.height(boardH);
+    bgNodes.hLine.points([cx-55,cy,cx+55,cy]);
+    bgNodes.vLine.points([cx,cy-55,cx,cy+55]);
+    bgNodes.dot.x(cx); bgNodes.dot.y(cy);
+  }
+
+  // --- zones (pooled: ring + label per zone in view)
+  const zonePool = NodePool.create(() => {
+    const g = new Konva.Group();
+    g.ring = new Konva.Circle({stroke:"#00ff88", strokeWidth:2});
+    g.label = new Konva.Text({
+      fontSize: 12,
+      fontFamily: "ui-monospace, Menlo, Consolas, monospace",
+      fill: "#9fdcc0",
+      opacity: 0.95
+    });
+    g.add(g.ring); g.add(g.label);
+    zonesLayer.add(g);
+    return g;
+  }, (g, zi) => {
+    g.zone = zi;
+    g.label.text(zones[zi].name);
+    placeZone(g);
+    styleZone(g);
+  });
+
+  function placeZone(g){
+    const z = zones[g.zone];
+    g.x(z.x*WW); g.y(z.y*HH);
+    g.ring.radius(zoneR);
+    g.label.x(zoneR + 6); g.label.y(-7);
+  }
+
+  // Toggle-driven look only; no geometry involved.
+  function styleZone(g){
+    g.ring.opacity(state.show_hints ? 0.9 : 0.0);
+    g.label.visible(!!state.show_labels);
+  }
+  function styleZones(){ for (const [, g] of zonePool.live()) styleZone(g); }
+
+  function layoutZones(){
+    zoneR = Math.max(20, Math.floor(Math.min(WW,HH) * CAT.radius));
+    for (const [, g] of zonePool.live()) placeZone(g);
+  }
+
+  function pulseZone(zoneKey){
+    const g = zonePool.get(CAT.zone_index[zoneKey]);
+    if (!g || prefs.low_power) return;
+    const ring = g.ring;
+    ring.opacity(1);
+    ring.strokeWidth(3);
+    ring.to({
+      radius: zoneR*1.35, opacity:0.15, duration:0.35, easing: Konva.Easings.EaseOut,
+      onFinish: () => {
+        ring.radius(zoneR);
+        styleZone(g);
+        zonesLayer.batchDraw();
+      }
+    });
+  }
+
+  function pulsePart(i){
+    const g = partPool.get(i);
+    if (!g || prefs.low_power) return;
+    g.to({
+      scaleX:1.06, scaleY:1.06, duration:0.12, easing: Konva.Easings.EaseOut,
+      onFinish: () => g.to({scaleX:1, scaleY:1, duration:0.16, easing: Konva.Easings.EaseOut})
+    });
+  }
+
+  function tweenTo(node, x, y){
+    if (prefs.low_power) { node.x(x); node.y(y); return Promise.resolve(); }
+    return new Promise(res => {
+      node.to({x,y,duration:0.18,easing:Konva.Easings.EaseOut,onFinish:res});
+    });
+  }
+
+  // --- parts (board and tray nodes share one factory; g.part is the bound index)
+  function makePartNode(layer, inTray){
+    return Perf.time("ensurePartNode", () => {
+      const iconSize = ATLAS.icon;
+      const g = new Konva.Group({x:0, y:0, draggable:true});
+
+      // huge hitbox for mobile
+      const hit = new Konva.Rect({x:-10,y:-10,width:iconSize+20,height:iconSize+40,fill:"rgba(0,0,0,0)"});
+
+      // only the hit rect takes events; the rest stay out of the hit graph
+      const glow = new Konva.Image({
+        image:atlasImg, crop:iconCrop(ATLAS.glow.key),
+        x:GLOW_OFF, y:GLOW_OFF, width:GLOW_SIZE, height:GLOW_SIZE,
+        visible:false, listening:false
+      });
+
+      const icon = new Konva.Image({image:atlasImg, x:0,y:0,width:iconSize,height:iconSize, listening:false});
+
+      const label = new Konva.Text({
+        x:0, y: iconSize+4,
+        fontSize: 12,
+        fontFamily: "ui-monospace, Menlo, Consolas, monospace",
+        fill: "#e8fff3",
+        listening: false
+      });
+
+      g.add(glow); g.add(hit); g.add(icon); g.add(label);
+      g.refs = {glow, icon, label};
+
+      g.on("mouseenter", () => {
+        const part = state.parts[g.part];
+        hoverLine.textContent = `HOVER: ${part.label} // ${part.locked ? "LOCKED" : "MOVE"}`;
+        document.body.style.cursor = part.locked ? "default" : "grab";
+      });
+      g.on("mouseleave", () => {
+        hoverLine.textContent = "HOVER: —";
+        document.body.style.cursor = "default";
+      });
+
+      g.on("dragstart", () => {
+        dispatch(Journal.DRAG, g.part);
+        sfx("drag");
+        g.moveToTop();
+        layer.draw();
+        document.body.style.cursor = "grabbing";
+      });
+
+      g.on("dragmove", () => trackDrag(g, inTray));
+
+      g.on("dragend", async () => {
+        document.body.style.cursor = "grab";
+        setHot(-1, false);
+        const i = g.part;
+        const at = dropPoint(g, inTray);
+        if (inTray && at.overTray) { refreshTray(); return; }
+        const pos = at.overTray ? {x:TRAY, y:TRAY} : pxToNorm(at.x, at.y);
+        await Perf.timeAsync("drop", () => handleDrop(i, pos.x, pos.y, at));
+      });
+
+      layer.add(g);
+      return g;
+    });
+  }
+
+  // Where a dragged node's icon top-left is, in world px, and whether it is
+  // over the tray.
+  function dropPoint(g, inTray){
+    const sx = inTray ? g.x() : g.x() - view.x, sy = inTray ? g.y() : g.y() - view.y;
+    return {x: sx + view.x, y: sy + view.y, overTray: sy + ATLAS.icon/2 > boardH};
+  }
+
+  // --- drag-over highlight: the zone a drop would land on lights up while
+  // dragging (red if the drop would cost points). dragmove only records the
+  // node; the lookup runs once per animation frame through the zone grid,
+  // and the highlight is one ring on its own layer, so a frame redraws that
+  // ring and nothing else.
+  let hotZone = -1, hotFits = false;
+  let hotNodes = null;
+  let dragging = null;
+
+  function drawHot(){
+    if (!hotNodes) {
+      hotNodes = {
+        ring: new Konva.Circle({strokeWidth:4}),
+        label: new Konva.Text({
+          fontSize: 12,
+          fontFamily: "ui-monospace, Menlo, Consolas, monospace",
+          fill: "#e8fff3"
+        }),
+      };
+      hotLayer.add(hotNodes.ring); hotLayer.add(hotNodes.label);
+    }
+    hotNodes.ring.visible(hotZone >= 0);
+    hotNodes.label.visible(hotZone >= 0);
+    if (hotZone < 0) return;
+    const z = zones[hotZone];
+    hotNodes.ring.x(z.x*WW); hotNodes.ring.y(z.y*HH); hotNodes.ring.radius(zoneR);
+    hotNodes.ring.stroke(hotFits ? "#00ff88" : "#ff5c7a");
+    hotNodes.label.text(z.name);
+    hotNodes.label.x(z.x*WW + zoneR + 6); hotNodes.label.y(z.y*HH - 7);
+  }
+
+  function trackDrag(g, inTray){
+    const queued = dragging !== null;
+    dragging = {g, inTray};
+    if (queued) return;
+    requestAnimationFrame(() => {
+      const d = dragging;
+      dragging = null;
+      if (d.g.isDragging()) Perf.time("dragover", () => dragOver(d.g, d.inTray));
+    });
+  }
+
+  function dragOver(g, inTray){
+    const at = dropPoint(g, inTray);
+    if (at.overTray) return setHot(-1, false);
+    const p = pxToNorm(at.x, at.y);
+    const zi = zoneGrid.nearestIndex(Journal.round4(p.x), Journal.round4(p.y));
+    if (zi < 0) return setHot(-1, false);
+    const part = state.parts[g.part];
+    const z = zones[zi];
+    setHot(zi, !occupant.has(z.key) && (z.mask & (CAT.kind_bit[part.kind] || 0)) !== 0 && (!state.lock_on || order.ready(zi)));
+  }
+
+  function setHot(zi, fits){
+    if (zi === hotZone && fits === hotFits) return;
+    hotZone = zi; hotFits = fits;
+    drawHot();
+    hotLayer.batchDraw();
+  }
+
+  function bindPartNode(g, i){
+    const part = state.parts[i];
+    g.part = i;
+    g.refs.icon.crop(iconCrop(part.kind));
+    g.refs.label.text(part.label);
+    updatePartStyle(g, part);
+  }
+
+  function updatePartStyle(g, part){
+    g.refs.glow.visible(!!part.locked);
+    g.draggable(!part.locked);
+    cachePart(g, part);
+  }
+
+  // A part node is drawn from one cached bitmap (glow, icon and label
+  // rasterized together), so drags, snaps and pulses blit a single image
+  // instead of drawing four nodes and laying out text every frame. The
+  // bitmap is only redrawn when what it shows changes: another part bound
+  // to the node, a lock change, or the layers' pixel ratio.
+  const PART_BOX = {x:GLOW_OFF, y:GLOW_OFF, width:GLOW_SIZE, height:ATLAS.icon + 30 - GLOW_OFF};
+
+  function cachePart(g, part){
+    const ratio = drawRatio();
+    const key = `${part.id}|${part.locked ? 1 : 0}|${ratio}`;
+    if (g.cacheKey === key) return;
+    g.cacheKey = key;
+    Perf.time("cachePart", () => g.cache({...PART_BOX, pixelRatio: ratio}));
+  }
+
+  const partPool = NodePool.create(() => makePartNode(partsLayer, false), bindPartNode);
+  const trayPool = NodePool.create(() => makePartNode(trayLayer, true), bindPartNode);
+  const pinned = new Set();   // parts mid-drop: their node must not be recycled
+  const placed = PartGrid.create(CAT, TRAY);   // board cells and tray, kept per drop
+  placed.reset(state.parts);
+
+  function layoutPart(g){
+    if (g.isDragging && g.isDragging()) return;
+    const part = state.parts[g.part];
+    g.x(part.x*WW); g.y(part.y*HH);
+  }
+
+  // --- viewport: pan + cull
+  function setView(x, y){
+    view.x = Math.min(Math.max(0, x), WW - W);
+    view.y = Math.min(Math.max(0, y), HH - boardH);
+    for (const layer of [bgLayer, zonesLayer, hotLayer, partsLayer]) { layer.x(-view.x); layer.y(-view.y); }
+    bgNodes.rect.x(view.x); bgNodes.rect.y(view.y);
+    cull();
+  }
+
+  // Binds nodes to exactly the zones and placed parts inside the viewport
+  // (plus a margin), recycling the rest.
+  function cull(){
+    const x0 = (view.x - CULL_MARGIN)/WW, x1 = (view.x + W + CULL_MARGIN)/WW;
+    const y0 = (view.y - CULL_MARGIN)/HH, y1 = (view.y + boardH + CULL_MARGIN)/HH;
+    zonePool.sync(zoneGrid.inRect(x0, y0, x1, y1));
+    if (!atlasImg) return;
+
+    partPool.sync(placed.inRect(x0, y0, x1, y1), i => pinned.has(i) || partPool.get(i).isDragging());
+    for (const [, g] of partPool.live()) layoutPart(g);
+  }
+
+  let viewTarget = null;
+  function scheduleView(x, y){
+    const queued = viewTarget !== null;
+    viewTarget = {x, y};
+    if (queued) return;
+    requestAnimationFrame(() => {
+      const t = viewTarget;
+      viewTarget = null;
+      setView(t.x, t.y);
+      stage.batchDraw();
+    });
+  }
+
+  let panning = null;
+  function startPan(){
+    if (WORLD === 1) return;
+    const p = stage.getPointerPosition();
+    panning = {x:p.x, y:p.y, vx:view.x, vy:view.y};
+    document.body.style.cursor = "move";
+  }
+  function movePan(){
+    if (!panning) return;
+    const p = stage.getPointerPosition();
+    scheduleView(panning.vx - (p.x - panning.x), panning.vy - (p.y - panning.y));
+  }
+  function endPan(){
+    if (!panning) return;
+    panning = null;
+    document.body.style.cursor = "default";
+  }
+
+  function onWheel(e){
+    const p = stage.getPointerPosition();
+    if (!p) return;
+    e.evt.preventDefault();
+    const d = e.evt.deltaY || e.evt.deltaX;
+    if (p.y > boardH) { if (d) pageTray(d > 0 ? 1 : -1); return; }
+    if (WORLD === 1) return;
+    const dx = e.evt.shiftKey ? e.evt.deltaY : e.evt.deltaX;
+    const dy = e.evt.shiftKey ? 0 : e.evt.deltaY;
+    scheduleView((viewTarget || view).x + dx, (viewTarget || view).y + dy);
+  }
+
+  // --- tray: parts not on the board, one page of slots at a time
+  let trayNodes = null;
+  let trayPage = 0;
+
+  function perPage(){ return Math.max(1, Math.floor((W - 2*ARROW_W) / SLOT_W)); }
+
+  function drawTray(){
+    if (!trayNodes) {
+      const arrow = (text) => new Konva.Text({text, fontSize:22, fill:"#00ff88", width:ARROW_W, align:"center"});
+      trayNodes = {
+        bg: new Konva.Rect({x:0, fill:"#050a07", stroke:"#1a2a22", strokeWidth:1}),
+        prev: arrow("◀"),
+        next: arrow("▶"),
+        info: new Konva.Text({fontSize:11, fontFamily:"ui-monospace, Menlo, Consolas, monospace", fill:"#9fdcc0", align:"right"}),
+      };
+      Object.values(trayNodes).forEach(n => trayLayer.add(n));
+      trayNodes.prev.on("click tap", () => pageTray(-1));
+      trayNodes.next.on("click tap", () => pageTray(1));
+    }
+    trayNodes.bg.y(boardH); trayNodes.bg.width(W); trayNodes.bg.height(TRAY_H);
+    trayNodes.prev.x(0); trayNodes.prev.y(boardH + TRAY_H/2 - 14);
+    trayNodes.next.x(W - ARROW_W); trayNodes.next.y(boardH + TRAY_H/2 - 14);
+    trayNodes.info.x(W - 220 - ARROW_W); trayNodes.info.y(boardH + 4); trayNodes.info.width(220);
+  }
+
+  function refreshTray(){
+    if (!atlasImg) return;
+    const items = placed.tray();
+    const per = perPage();
+    const pages = Math.max(1, Math.ceil(items.length / per));
+    trayPage = Math.min(Math.max(0, trayPage), pages - 1);
+    const shown = items.slice(trayPage * per, trayPage * per + per);
+    trayPool.sync(shown, i => trayPool.get(i).isDragging());
+    shown.forEach((i, k) => {
+      const g = trayPool.get(i);
+      if (g.isDragging()) return;
+      g.x(ARROW_W + 12 + k * SLOT_W); g.y(boardH + 14);
+    });
+    trayNodes.info.text(items.length ? `TRAY ${trayPage * per + 1}–${trayPage * per + shown.length} / ${items.length}` : "TRAY EMPTY");
+    trayNodes.prev.opacity(trayPage > 0 ? 1 : 0.25);
+    trayNodes.next.opacity(trayPage < pages - 1 ? 1 : 0.25);
+    trayLayer.batchDraw();
+  }
+
+  function pageTray(d){
+    trayPage += d;
+    refreshTray();
+  }
+
+  // Any zone within the snap radius (wrong kinds included: they cost points).
+  // Pass a kind to only consider zones that accept it (drag feedback).
+  function nearestZone(xn, yn, kind){
+    return zoneGrid.nearest(xn, yn, kind ? (CAT.kind_bit[kind] || 0) : -1);
+  }
+
+
+  // --------------------- Quiz modal ---------------------
+  function openQuiz(entry){
+    qResult.textContent = "";
+    const bank = QUIZ[entry.kind];
+
+    qTitle.textContent = `Mini Lesson: ${bank.title}`;
+    qSub.textContent = `Locked: ${entry.part_label} → ${entry.zone_name}`;
+    qWhat.textContent = bank.what;
+    qGotchas.innerHTML = `<b>Gotchas:</b><br>• ${bank.gotchas.join("<br>• ")}`;
+
+    const [qq, opts] = entry.question;
+    qQuestion.textContent = qq;
+
+    qOptions.innerHTML = "";
+    opts.forEach((o, idx) => {
+      const id = `opt_${idx}`;
+      const row = document.createElement("label");
+      row.innerHTML = `<input type="radio" name="quizopt" value="${idx}" ${idx===0?"checked":""}/> ${o}`;
+      qOptions.appendChild(row);
+    });
+
+    // disable farming
+    btnCheck.disabled = !!state.quiz_scored[entry.event_id];
+    quizOverlay.style.display = "flex";
+  }
+
+  function closeQuiz(){
+    quizOverlay.style.display = "none";
+    dispatch(Journal.CLOSE);
+  }
+
+  function gradeQuiz(isCorrect){
+    const entry = state.pending_quiz;
+    if (!entry) return;
+
+    const pts = dispatch(Journal.ANSWER, isCorrect ? 1 : 0);
+    if (pts === null) {
+      qResult.textContent = "Already scored for this lock (no farming).";
+      return;
+    }
+    recall.grade(entry.kind, entry.q_idx, isCorrect, nowMs());
+    Persist.saveSettings(RECALL_KEY, recall.dump());
+
+    if (isCorrect) {
+      const bonus = pts - 15;
+      qResult.textContent = bonus > 0 ? `✅ Correct! +15. 🔥 Streak bonus +${bonus}!` : `✅ Correct! +15.`;
+    } else {
+      qResult.textContent = `❌ Not quite. (${pts})`;
+    }
+
+    emit("quiz", {event_id: entry.event_id, kind: entry.kind, correct: !!isCorrect, streak: state.quiz_streak});
+    btnCheck.disabled = true;
+    msg.textContent = "Quiz scored.";
+    updateHUD();
+  }
+
+  btnClose.onclick = closeQuiz;
+  btnCheck.onclick = () => {
+    const entry = state.pending_quiz;
+    if (!entry) return;
+
+    const chosen = document.querySelector('input[name="quizopt"]:checked');
+    const idx = chosen ? parseInt(chosen.value, 10) : 0;
+    const correctIdx = entry.question[2];
+    const isCorrect = (idx === correctIdx);
+    gradeQuiz(isCorrect);
+  };
+
+
+  // --------------------- Drop handling ---------------------
+  // xn/yn is where the part's top-left landed (normalized world coordinates),
+  // or TRAY when it was dropped on the tray; fromPx is that spot in world px,
+  // where the snap animation starts.
+  async function handleDrop(i, xn, yn, fromPx){
+    const part = state.parts[i];
+    if (!part || part.locked) return;
+
+    const x = xn === TRAY ? TRAY : Journal.round4(xn), y = yn === TRAY ? TRAY : Journal.round4(yn);
+    const z = nearestZone(x, y);
+    pinned.add(i);
+    try {
+      const outcome = dispatch(Journal.DROP, i, x, y);
+      // only this part moved: give it a node for the tween now and leave
+      // the rest of the view to the one cull in finally
+      if (atlasImg && part.x !== TRAY) layoutPart(partPool.acquire(i));
+      refreshTray();
+
+      if (outcome === Journal.MOVED) {
+        msg.textContent = part.x === TRAY ? `Returned to tray: ${part.label}` : `Moved: ${part.label}`;
+        emit("drop", {part: part.id, kind: part.kind, zone: null, outcome: "moved"});
+        return;
+      }
+
+      if (outcome === Journal.OCCUPIED) {
+        msg.textContent = `❌ Zone occupied: ${z.name} (-3)`;
+        emit("drop", {part: part.id, kind: part.kind, zone: z.key, outcome: "occupied"});
+        sfx("wrong");
+        updateHUD();
+        return;
+      }
+
+      // animate snap
+      const g = partPool.get(i);
+      if (g) {
+        g.x(fromPx.x); g.y(fromPx.y);
+        await tweenTo(g, part.x*WW, part.y*HH);
+        partsLayer.draw();
+      }
+
+      if (outcome === Journal.WRONG_ZONE) {
+        msg.textContent = `❌ Wrong zone: ${part.label} near ${z.name} (-3)`;
+        emit("drop", {part: part.id, kind: part.kind, zone: z.key, outcome: "wrong_zone"});
+        sfx("wrong");
+        pulseZone(z.key);
+        updateHUD();
+        return;
+      }
+
+      if (outcome === Journal.OUT_OF_ORDER) {
+        const first = order.blockers(CAT.zone_index[z.key]).map(zi => zones[zi]);
+        msg.textContent = `❌ Too early: fit ${first.map(f => f.name).join(", ")} before ${part.label} (-3)`;
+        emit("drop", {part: part.id, kind: part.kind, zone: z.key, outcome: "out_of_order"});
+        sfx("wrong");
+        pulseZone(first[0].key);
+        updateHUD();
+        return;
+      }
+
+      // correct snap
+      const locked = outcome === Journal.LOCKED;
+      msg.textContent = `✅ Snapped: ${part.label} → ${z.name} (+10)`;
+      emit("drop", {part: part.id, kind: part.kind, zone: z.key, outcome: locked ? "locked" : "snapped"});
+      sfx("correct");
+      pulseZone(z.key);
+
+      if (locked) {
+        dispatch(Journal.ASK, Perf.time("quizPick", () => recall.next(part.kind, nowMs())));
+        const entry = state.pending_quiz;
+        sfx("lock");
+        pulsePart(i);
+        emit("lock", {event_id: entry.event_id, part: part.id, zone: z.key, q_idx: entry.q_idx});
+        openQuiz(entry);
+      }
+
+      // update Konva style
+      if (g) updatePartStyle(g, part);
+
+      updateHUD();
+
+      // win?
+      if (occupant.size === state.parts.length) {
+        msg.textContent = "✅ Perfect build! All parts locked.";
+        sfx("win");
+      }
+    } finally {
+      pinned.delete(i);
+      cull();
+      stage.batchDraw();
+    }
+  }
+
+  // --------------------- Render loop ---------------------
+  // Viewport centre as a fraction of the world, kept across resizes.
+  function viewCentre(){
+    return WW ? {x:(view.x + W/2)/WW, y:(view.y + boardH/2)/HH} : {x:0.5, y:0.5};
+  }
+
+  function layoutBoard(centre){
+    drawBackground();
+    drawTray();
+    layoutZones();
+    drawHot();
+    setView(centre.x*WW - W/2, centre.y*HH - boardH/2);
+    refreshTray();
+  }
+
+  async function render(){
+    const centre = viewCentre();
+    setSize();
+
+    if (!stage) {
+      stage = new Konva.Stage({ container:"stage", width:W, height:H });
+      bgLayer = new Konva.Layer();
+      zonesLayer = new Konva.Layer({listening:false});   // rings and labels never take events
+      hotLayer = new Konva.Layer({listening:false});
+      partsLayer = new Konva.Layer();
+      trayLayer = new Konva.Layer();
+      stage.add(bgLayer);
+      stage.add(zonesLayer);
+      stage.add(hotLayer);
+      stage.add(partsLayer);
+      stage.add(trayLayer);
+
+      stage.on("wheel", onWheel);
+      stage.on("pointermove", movePan);
+      stage.on("pointerup pointerleave", endPan);
+      window.addEventListener("resize", scheduleLayout);
+      stage.getLayers().forEach(timeDraws);
+      applyPower();
+    } else {
+      stage.width(W); stage.height(H);
+    }
+
+    atlasImg = await loadAtlas();
+    // pooled nodes keep their part index across a reset; restyle them
+    for (const [i, g] of partPool.live()) bindPartNode(g, i);
+    for (const [i, g] of trayPool.live()) bindPartNode(g, i);
+    layoutBoard(centre);
+    styleZones();
+
+    bgLayer.draw();
+    zonesLayer.draw();
+    partsLayer.draw();
+    trayLayer.draw();
+  }
+
+  // A burst of resize events collapses into one relayout on the next frame,
+  // and only if the board size actually changed.
+  let layoutQueued = false;
+  function scheduleLayout(){
+    if (layoutQueued) return;
+    layoutQueued = true;
+    requestAnimationFrame(() => { layoutQueued = false; Perf.time("relayout", relayout); });
+  }
+
+  function relayout(){
+    const size = getCanvasSize();
+    if (size.W === stage.width() && size.H === stage.height()) return;
+    const centre = viewCentre();
+    setSize();
+    stage.width(W); stage.height(H);
+    layoutBoard(centre);
+    stage.batchDraw();
+  }
+
+  // Stage coordinates for scripted drags, exposed only with perf.js on (the
+  // bench harness): the icon top-left of a part (paging the tray or panning
+  // the board to it) and of a zone (panning to it), plus the middle of the
+  // tray; progress() lets the harness check how the run went.
+  if (Perf.on) window.__trainerBoard = {
+    partAt(id){
+      const i = CAT.part_index[id], part = state.parts[i];
+      if (part.x === TRAY) {
+        trayPage = Math.floor(placed.tray().indexOf(i) / perPage());
+        refreshTray();
+        const g = trayPool.get(i);
+        return {x:g.x(), y:g.y()};
+      }
+      setView(part.x*WW - W/2, part.y*HH - boardH/2);
+      stage.batchDraw();
+      return {x:part.x*WW - view.x, y:part.y*HH - view.y};
+    },
+    zoneAt(key){
+      const z = zoneByKey(key);
+      setView(z.x*WW - W/2, z.y*HH - boardH/2);
+      stage.batchDraw();
+      return {x:z.x*WW - view.x, y:z.y*HH - view.y};
+    },
+    tray: () => ({x:W/2, y:boardH + 14}),
+    nodes: () => ({zones:zonePool.made, parts:partPool.made, tray:trayPool.made}),
+    progress: () => ({locked:occupant.size, wrong:state.wrong}),
+  };
+
+  // --------------------- Low power + FPS readout ---------------------
+  // Low-power mode renders every layer at 1x instead of the screen's pixel
+  // ratio (a quarter of the pixels on a 2x panel) and drops the snap/pulse
+  // tweens, each of which redraws its layer every frame while it runs.
+  const drawRatio = () => prefs.low_power ? 1 : (window.devicePixelRatio || 1);
+
+  function applyPower(){
+    const ratio = drawRatio();
+    for (const layer of stage.getLayers()) layer.getCanvas().setPixelRatio(ratio);
+    for (const pool of [partPool, trayPool]) {
+      for (const [i, g] of pool.live()) cachePart(g, state.parts[i]);
+    }
+    stage.batchDraw();
+  }
+
+  // FPS and scene-draw ms per frame over half-second windows, plus live pool
+  // nodes. The sampling loop only runs while the readout is shown.
+  const fpsLine = document.getElementById("fpsLine");
+  const fps = {raf:0, t0:0, frames:0, drawMs:0};
+
+  function timeDraws(layer){
+    let t0 = 0;
+    layer.on("beforeDraw", () => { t0 = performance.now(); });
+    layer.on("draw", () => { if (fps.raf) fps.drawMs += performance.now() - t0; });
+  }
+
+  function fpsTick(t){
+    fps.frames += 1;
+    if (t - fps.t0 >= 500) {
+      const nodes = zonePool.size + partPool.size + trayPool.size;
+      paint(fpsLine, `FPS ${Math.round(fps.frames * 1000 / (t - fps.t0))} // DRAW ${(fps.drawMs / fps.frames).toFixed(2)} MS // NODES ${nodes}`);
+      fps.t0 = t; fps.frames = 0; fps.drawMs = 0;
+    }
+    fps.raf = requestAnimationFrame(fpsTick);
+  }
+
+  function syncFps(){
+    fpsLine.style.display = prefs.fps ? "" : "none";
+    if (prefs.fps && !fps.raf) { fps.t0 = performance.now(); fps.frames = 0; fps.drawMs = 0; fps.raf = requestAnimationFrame(fpsTick); }
+    if (!prefs.fps && fps.raf) { cancelAnimationFrame(fps.raf); fps.raf = 0; }
+  }
+
+  // --------------------- Controls ---------------------
+  const toggle = (flag, on) => dispatch(Journal.TOGGLE, Persist.FLAGS.indexOf(flag), on ? 1 : 0);
+  document.getElementById("tHints").onchange = (e) => { toggle("show_hints", e.target.checked); styleZones(); zonesLayer.batchDraw(); };
+  document.getElementById("tLabels").onchange = (e) => { toggle("show_labels", e.target.checked); styleZones(); zonesLayer.batchDraw(); };
+  document.getElementById("tLock").onchange = (e) => { dispatch(Journal.SET_LOCK, e.target.checked ? 1 : 0); msg.textContent = state.lock_on ? "Lock enabled." : "Lock disabled."; };
+  document.getElementById("tLowPower").onchange = (e) => { prefs.low_power = e.target.checked; savePrefs(); applyPower(); msg.textContent = prefs.low_power ? "Low-power drawing on." : "Low-power drawing off."; };
+  document.getElementById("tFps").onchange = (e) => { prefs.fps = e.target.checked; savePrefs(); syncFps(); };
+  document.getElementById("tSound").onchange = (e) => { toggle("sound_on", e.target.checked); msg.textContent = state.sound_on ? "Sound enabled." : "Sound disabled."; };
+
+  document.getElementById("btnReset").onclick = () => {
+    // close out the old session before its id is replaced
+    dispatch(Journal.RESET);
+    emit("reset", {});
+    outbox.flush();
+    state = defaultState();
+    rebuildIndexes();
+    placed.reset(state.parts);
+    shipSnapshot(journal.start(state));
+    saveState();
+    syncTogglesFromState();
+    trayPage = 0;
+    msg.textContent = "Reset.";
+    updateHUD();
+    Perf.timeAsync("render", render);
+  };
+
+  // --------------------- Boot ---------------------
+  syncTogglesFromState();
+  updateHUD();
+  Perf.timeAsync("render", render).then(() => Perf.mark("interactive"));
+
+  syncFps();
+
+  // Tick timer
+  syncHudTimer();
+  document.addEventListener("visibilitychange", syncHudTimer);
+
+  // Resume quiz if it was open (optional)
+  if (state.pending_quiz) {
+    // find last entry
+    const last = logById.get(state.pending_quiz.event_id) || state.pending_quiz;
+    openQuiz(last);
+  }
+
+})();
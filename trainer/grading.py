@@ -0,0 +1,86 @@
+"""Cohort grading.
+
+``computeGrade`` (and ``engine.grade_score``) score one session at a time.
+Here the same formula runs over a whole cohort held as column arrays, so
+regrading every stored attempt after a weight change is a few NumPy passes.
+On top of the absolute letters it adds percentile ranks and curved letters
+(grades by standing within the cohort rather than by fixed cut-offs).
+"""
+import numpy as np
+
+from trainer.engine import GRADES, WEIGHTS
+
+LETTERS = np.array([letter for _, letter in GRADES] + ["F"])
+# Fixed cut-offs, ascending, for searchsorted: F < 60 <= D < 70 ... <= A+.
+_CUTS = np.array([cut for cut, _ in reversed(GRADES)], dtype=np.float64)
+_ASCENDING = LETTERS[::-1]
+
+# Curve: minimum percentile rank for each letter, best first.
+CURVE = ((90, "A+"), (75, "A"), (50, "B"), (25, "C"), (10, "D"))
+
+COLUMNS = ("elapsed_s", "wrong", "attempts", "correct", "best_streak")
+
+COHORT_SQL = """
+SELECT s.session_id, s.elapsed_s, s.wrong, s.locked, COALESCE(q.correct, 0), s.best_streak
+FROM sessions s
+LEFT JOIN (SELECT session_id, SUM(correct) AS correct FROM quiz GROUP BY session_id) q
+    ON q.session_id = s.session_id
+WHERE s.cohort = ?
+"""
+
+
+def grade_scores(elapsed_s, wrong, attempts, correct, best_streak, weights=WEIGHTS):
+    """Vectorized ``engine.grade_score``: array-likes in, float64 scores out."""
+    w = weights
+    t = np.maximum(1, np.asarray(elapsed_s, dtype=np.float64))
+    attempts = np.asarray(attempts, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    acc = np.divide(correct, attempts, out=np.zeros_like(attempts), where=attempts > 0)
+
+    score = np.maximum(0, w["time"] * (1 - np.minimum(1, (t - w["time_grace_s"]) / w["time_span_s"])))
+    score += w["accuracy"] * acc
+    score += w["streak"] * np.minimum(1, np.asarray(best_streak, dtype=np.float64) / w["streak_full"])
+    score -= np.minimum(w["wrong_cap"], np.asarray(wrong, dtype=np.float64) * w["wrong"])
+    return np.clip(score, 0, 100, out=score)
+
+
+def letters(scores):
+    """Absolute letters for an array of 0-100 scores."""
+    return _ASCENDING[np.searchsorted(_CUTS, scores, side="right")]
+
+
+def percentile_ranks(scores):
+    """Percent of the cohort scoring below each score, ties counted half."""
+    scores = np.asarray(scores, dtype=np.float64)
+    if not scores.size:
+        return scores
+    ordered = np.sort(scores)
+    below = np.searchsorted(ordered, scores, side="left")
+    at_or_below = np.searchsorted(ordered, scores, side="right")
+    return (below + at_or_below) * (50.0 / scores.size)
+
+
+def curve_letters(ranks, curve=CURVE):
+    """Letters by percentile rank; ``curve`` is ``((min rank, letter), ...)`` best first."""
+    cuts = np.array([cut for cut, _ in reversed(curve)], dtype=np.float64)
+    ascending = np.array(["F"] + [letter for _, letter in reversed(curve)])
+    return ascending[np.searchsorted(cuts, ranks, side="right")]
+
+
+def grade_cohort(cols, weights=WEIGHTS, curve=CURVE):
+    """Score, letter, percentile rank and curved letter for every attempt.
+
+    ``cols`` maps each name in ``COLUMNS`` to an array; the result is a dict
+    of arrays in the same row order.
+    """
+    scores = grade_scores(*(cols[c] for c in COLUMNS), weights=weights)
+    ranks = percentile_ranks(scores)
+    return {"score": scores, "grade": letters(scores), "rank": ranks, "curve": curve_letters(ranks, curve)}
+
+
+def load_cohort(store, cohort):
+    """``(session ids, COLUMNS arrays)`` for one cohort from the session store."""
+    rows = store.query(COHORT_SQL, (cohort,))
+    ids = [r[0] for r in rows]
+    data = np.array([r[1:] for r in rows], dtype=np.int64).reshape(len(rows), len(COLUMNS))
+    return ids, {c: data[:, i] for i, c in enumerate(COLUMNS)}
@@ -0,0 +1,430 @@
+"""Standalone event ingest service.
+
+With many classrooms on one server, shipping every board batch through a
+Streamlit rerun costs a script run per flush. Boards can instead post their
+batches straight to this asyncio service, which runs next to ``app.py``::
+
+    python -m trainer.ingest --port 8766
+    TRAINER_INGEST_URL=http://localhost:8766/ingest streamlit run app.py
+
+``TRAINER_INGEST_URL`` is fetched by each student's browser, not by the
+Streamlit server, so ``localhost`` only works for a browser on the same
+machine. For a class, give a URL students can reach. One option is the
+app's own HTTPS reverse proxy forwarding ``/ingest`` to the service
+(browsers block plain-HTTP posts from an HTTPS page). The other is the
+service itself on an interface set with ``TRAINER_INGEST_HOST``. It refuses
+a non-loopback bind unless ``TRAINER_INGEST_TOKEN`` is set; posts must then
+carry it as ``?token=`` in the URL. The token ships in the page, so it only
+keeps out clients that never loaded the app. ``TRAINER_INGEST_ORIGINS``
+(comma-separated) also limits posts to the app's own origin::
+
+    TRAINER_INGEST_HOST=0.0.0.0 TRAINER_INGEST_TOKEN=s3cret \
+        TRAINER_INGEST_ORIGINS=http://trainer.lab:8501 python -m trainer.ingest
+    TRAINER_INGEST_URL='http://trainer.lab:8766/ingest?token=s3cret' streamlit run app.py
+
+``POST /ingest`` takes newline-delimited JSON, one outbox batch per line
+(``{"session", "seq", "events", "summary", "cohort"}``). Accepted batches go
+into a bounded queue; one writer drains whatever has piled up and commits it
+as a single transaction (``store.write``) on its own thread, so the event
+loop never waits on SQLite.
+
+Every post is answered, once its batches are committed, with an ack::
+
+    {"taken", "accepted", "dropped", "queued", "capacity", "written", "flush_ms"}
+
+``taken`` counts the leading lines the service is done with: committed, or
+malformed (or refused by the database) and ``dropped``. When the queue fills
+up mid-post the rest are refused with 429, and when the database itself
+fails, with 503; both carry ``Retry-After`` and ``retry_ms``, and the board
+keeps those batches and resends them later. Past ``HIGH_WATER`` the ack's
+``flush_ms`` grows (up to ``SLOWDOWN`` times the default) so boards batch
+more and post less before anything has to be refused. The store is what makes resends safe: every table ignores rows it
+already has, and a session's summary only ever moves forward
+(``updated_ms``). A resend after a lost ack or a failed write is simply
+committed again as a no-op, and a batch overtaken by a newer one can't roll
+the session back. The service keeps no per-session memory that could be
+evicted or lost on restart; it only joins a resend to the same write while
+that batch is still queued.
+
+``python -m trainer.ingest --simulate 200`` is the local stand-in: it runs
+the service on a scratch database and drives it with that many simulated
+boards, honouring acks the way outbox.js does, then reports what landed.
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+import math
+import os
+import random
+import signal
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from trainer.store import DB_PATH, connect, init, write
+
+log = logging.getLogger(__name__)
+
+HOST = os.environ.get("TRAINER_INGEST_HOST", "127.0.0.1")
+PORT = int(os.environ.get("TRAINER_INGEST_PORT", "8766"))
+TOKEN = os.environ.get("TRAINER_INGEST_TOKEN", "")
+ORIGINS = frozenset(o.strip().rstrip("/") for o in os.environ.get("TRAINER_INGEST_ORIGINS", "").split(",")
+                    if o.strip())
+QUEUE_MAX = 2000            # batches
+MAX_WRITE = 500             # batches per transaction
+MAX_BODY = 4 << 20
+MAX_HEADER = 16 << 10
+FLUSH_MS = 1000             # the boards' default flush window
+HIGH_WATER = 0.5
+SLOWDOWN = 8
+SPEEDUP = 20                # simulated boards flush this much faster than real ones
+
+SUMMARY_KEYS = ("score", "wrong", "quiz_streak", "best_streak", "locked", "parts", "elapsed_s", "grade")
+CORS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "POST, GET, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+}
+
+
+def loopback(host):
+    """Whether ``host`` only listens on this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_batch(line):
+    """A batch decoded from one NDJSON line, or ``None`` if it isn't one."""
+    try:
+        b = json.loads(line)
+    except ValueError:
+        return None
+    if not (isinstance(b, dict) and isinstance(b.get("session"), str) and isinstance(b.get("seq"), int)
+            and isinstance(b.get("events"), list) and isinstance(b.get("summary"), dict)):
+        return None
+    if any(k not in b["summary"] for k in SUMMARY_KEYS):
+        return None
+    return b
+
+
+class Ingest:
+    """Bounded queue in, coalesced transactions out."""
+
+    def __init__(self, path=DB_PATH, queue_max=QUEUE_MAX, max_write=MAX_WRITE, token=TOKEN, origins=ORIGINS):
+        self.path = path
+        self.max_write = max_write
+        self.token = token
+        self.origins = origins
+        self.queue = asyncio.Queue(queue_max)
+        self.writing = {}           # (session, seq) -> future of its queued write
+        self.written = 0
+        self.peak = 0
+        self._db = ThreadPoolExecutor(1, thread_name_prefix="trainer-ingest")
+        self._conn = None
+        self._server = None
+        self._writer = None
+
+    # -- intake ---------------------------------------------------------------
+    def offer(self, lines):
+        """Queue batches in order until the queue is full. Returns one entry
+        per line handled: ``True`` for a blank line, ``False`` if the line is
+        malformed, else the future of its write (see ``_drain``)."""
+        out = []
+        for line in lines:
+            if not line.strip():
+                out.append(True)
+                continue
+            b = parse_batch(line)
+            if b is None:
+                out.append(False)
+                continue
+            key = (b["session"], b["seq"])
+            if key in self.writing:             # resent while still queued
+                out.append(self.writing[key])
+            elif self.queue.full():
+                break
+            else:
+                fut = self.writing[key] = asyncio.get_running_loop().create_future()
+                self.queue.put_nowait((str(b.get("cohort") or "default"), b, fut))
+                out.append(fut)
+        self.peak = max(self.peak, self.queue.qsize())
+        return out
+
+    async def settle(self, handled):
+        """``(taken, accepted, dropped, failed)`` for ``offer``'s entries once
+        their writes are done; ``failed`` if the database stopped the run."""
+        await asyncio.gather(*(h for h in handled if isinstance(h, asyncio.Future)))
+        taken = accepted = dropped = 0
+        for h in handled:
+            if isinstance(h, asyncio.Future):
+                h = h.result()
+                if h is None:
+                    return taken, accepted, dropped, True
+                accepted += h
+            dropped += not h
+            taken += 1
+        return taken, accepted, dropped, False
+
+    def flush_ms(self):
+        """The flush window boards should use at the current queue depth."""
+        fill = self.queue.qsize() / self.queue.maxsize
+        if fill <= HIGH_WATER:
+            return FLUSH_MS
+        return round(FLUSH_MS * (1 + (SLOWDOWN - 1) * (fill - HIGH_WATER) / (1 - HIGH_WATER)))
+
+    def status(self):
+        return {"queued": self.queue.qsize(), "capacity": self.queue.maxsize, "written": self.written}
+
+    # -- writer ---------------------------------------------------------------
+    async def _drain(self):
+        """Commit queued batches and resolve their futures: ``True``
+        written, ``False`` refused by the database (malformed), ``None`` not
+        written because the database failed (worth a retry)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            while len(items) < self.max_write and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            try:
+                done = await loop.run_in_executor(self._db, self._write, [(c, b) for c, b, _ in items])
+            except Exception:
+                log.exception("database failed; %d batches left to their boards to resend", len(items))
+                done = [None] * len(items)
+            for (_, b, fut), ok in zip(items, done):
+                self.writing.pop((b["session"], b["seq"]), None)
+                if not fut.done():
+                    fut.set_result(ok)
+                self.queue.task_done()
+
+    def _write(self, items):
+        # always on the one executor thread, which owns the connection
+        if self._conn is None:
+            self._conn = connect(self.path)
+            init(self._conn)
+        try:
+            write(self._conn, items)
+            self.written += len(items)
+            return [True] * len(items)
+        except sqlite3.OperationalError:
+            raise                           # the database, not the data
+        except Exception:
+            log.warning("bulk write of %d batches failed; retrying one by one", len(items))
+        # one bad batch shouldn't sink everything it was coalesced with
+        done = []
+        for item in items:
+            try:
+                write(self._conn, [item])
+                self.written += 1
+                done.append(True)
+            except sqlite3.OperationalError:
+                raise
+            except Exception:
+                log.exception("dropped batch %s #%s", item[1]["session"], item[1]["seq"])
+                done.append(False)
+        return done
+
+    # -- HTTP -----------------------------------------------------------------
+    def cors(self, origin):
+        """CORS headers for a request from ``origin``."""
+        if not self.origins:
+            return CORS
+        allowed = origin if origin in self.origins else sorted(self.origins)[0]
+        return dict(CORS, **{"Access-Control-Allow-Origin": allowed, "Vary": "Origin"})
+
+    async def route(self, method, target, body, headers=None):
+        """``(status, ack, extra headers)`` for one request."""
+        headers = headers or {}
+        path, _, query = target.partition("?")
+        if method == "OPTIONS":
+            return 204, None, {}
+        if path == "/health" and method == "GET":
+            return 200, dict(self.status(), flush_ms=self.flush_ms()), {}
+        if path != "/ingest":
+            return 404, {"error": "not found"}, {}
+        if method != "POST":
+            return 405, {"error": "POST batches here"}, {"Allow": "POST, OPTIONS"}
+        if self.origins and headers.get("origin") not in self.origins:
+            return 403, {"error": "origin not allowed"}, {}
+        if self.token and not hmac.compare_digest(parse_qs(query).get("token", [""])[0].encode("utf-8"),
+                                                  self.token.encode("utf-8")):
+            return 403, {"error": "bad token"}, {}
+
+        lines = body.decode("utf-8", "replace").split("\n")
+        if lines and not lines[-1]:
+            lines.pop()
+        taken, accepted, dropped, failed = await self.settle(self.offer(lines))
+        ack = dict(self.status(), taken=taken, accepted=accepted, dropped=dropped, flush_ms=self.flush_ms())
+        if taken < len(lines):
+            ack["retry_ms"] = ack["flush_ms"]
+            if failed:
+                ack["error"] = "write failed"
+            return 503 if failed else 429, ack, {"Retry-After": str(math.ceil(ack["retry_ms"] / 1000))}
+        return 200, ack, {}
+
+    async def handle(self, reader, writer):
+        """One client connection (HTTP/1.1, keep-alive)."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._reply(writer, 431, {"error": "headers too large"}, close=True)
+                    return
+                try:
+                    request, *lines = head.decode("latin-1").split("\r\n")
+                    method, target, _ = request.split(" ", 2)
+                    headers = {k.strip().lower(): v.strip() for k, _, v in (h.partition(":") for h in lines if h)}
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._reply(writer, 400, {"error": "bad request"}, close=True)
+                    return
+                if "chunked" in headers.get("transfer-encoding", ""):
+                    await self._reply(writer, 411, {"error": "send a Content-Length"}, close=True)
+                    return
+                if length > MAX_BODY:
+                    await self._reply(writer, 413, {"error": f"body over {MAX_BODY} bytes"}, close=True)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                status, ack, extra = await self.route(method, target, body, headers)
+                close = headers.get("connection", "").lower() == "close"
+                await self._reply(writer, status, ack, {**self.cors(headers.get("origin")), **extra}, close)
+                if close:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _reply(writer, status, ack, extra=None, close=False):
+        data = b"" if ack is None else json.dumps(ack, separators=(",", ":")).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Content-Type: application/json",
+                f"Content-Length: {len(data)}", "Cache-Control: no-store"]
+        head += [f"{k}: {v}" for k, v in {**CORS, **(extra or {})}.items()]
+        if close:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+    # -- lifecycle ------------------------------------------------------------
+    async def start(self, host=HOST, port=PORT):
+        self._writer = asyncio.create_task(self._drain())
+        self._server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop taking posts, then commit everything already queued."""
+        self._server.close()
+        await self._server.wait_closed()
+        await self.queue.join()
+        self._writer.cancel()
+        await asyncio.get_running_loop().run_in_executor(self._db, lambda: self._conn and self._conn.close())
+        self._db.shutdown()
+
+
+# -- local stand-in -----------------------------------------------------------
+async def post(host, port, body):
+    """POST ``body`` to ``/ingest``; returns ``(status, ack)``."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"POST /ingest HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        length = int(next(h.split(":", 1)[1] for h in head.split("\r\n") if h.lower().startswith("content-length")))
+        return int(head.split(" ", 2)[1]), json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+
+def _fake_batch(session, seq, t, cohort):
+    events = [{"type": "op", "t": t, "n": 4 * seq + k, "op": 1, "a": k, "b": 0.5, "c": 0.5} for k in range(4)]
+    if random.random() < 0.2:
+        events.append({"type": "drop", "t": t, "part": "m1", "kind": "motor", "zone": "prop_tl",
+                       "outcome": "wrong_zone"})
+    summary = {"score": seq, "wrong": 0, "quiz_streak": 0, "best_streak": 0, "locked": seq, "parts": 18,
+               "elapsed_s": seq, "grade": "A"}
+    return {"session": session, "seq": seq, "events": events, "summary": summary, "cohort": cohort}
+
+
+async def board(host, port, session, batches, cohort="simulated"):
+    """One simulated board flushing a batch per window the way outbox.js
+    does: unacked batches are resent, the window comes from the last ack.
+    Returns how many posts were refused."""
+    pending, refused, every, n = [], 0, FLUSH_MS, 0
+    t = int(time.time() * 1000)
+    while n < batches or pending:
+        await asyncio.sleep(every / 1000 * random.uniform(0.9, 1.1) / SPEEDUP)
+        if n < batches:
+            n += 1
+            t += every
+            pending.append(_fake_batch(session, n, t, cohort))
+        body = "\n".join(json.dumps(b, separators=(",", ":")) for b in pending).encode("utf-8")
+        status, ack = await post(host, port, body)
+        del pending[:ack["taken"]]
+        every = ack.get("retry_ms", ack["flush_ms"])
+        refused += status in (429, 503)
+    return refused
+
+
+async def simulate(boards, batches, path, queue_max):
+    ingest = Ingest(path, queue_max=queue_max)
+    port = await ingest.start("127.0.0.1", 0)
+    t0 = time.perf_counter()
+    refused = await asyncio.gather(*(board("127.0.0.1", port, f"sim{i:05d}", batches) for i in range(boards)))
+    await ingest.close()
+    elapsed = time.perf_counter() - t0
+    conn = connect(path)
+    sessions, events = (conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("sessions", "events"))
+    conn.close()
+    print(f"{boards} boards x {batches} batches in {elapsed:.1f} s: {ingest.written} batches written, "
+          f"{sum(refused)} posts refused, peak queue {ingest.peak}/{queue_max}; "
+          f"db has {sessions} sessions, {events} events (expected {boards * batches * 4})")
+
+
+async def main(host, port, path):
+    if not loopback(host) and not TOKEN:
+        raise SystemExit(f"refusing to listen on {host} without TRAINER_INGEST_TOKEN (see trainer/ingest.py)")
+    ingest = Ingest(path)
+    port = await ingest.start(host, port)
+    log.info("ingesting on http://%s:%d/ingest into %s", host, port, path)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:         # Windows
+            pass
+    await stop.wait()
+    await ingest.close()
+    log.info("stopped; %d batches written", ingest.written)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--db", type=Path, default=DB_PATH)
+    ap.add_argument("--simulate", type=int, metavar="BOARDS", help="run the local stand-in with this many boards")
+    ap.add_argument("--batches", type=int, default=20, help="batches per simulated board")
+    ap.add_argument("--queue", type=int, default=QUEUE_MAX, help="queue bound for the stand-in")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.simulate:
+        scratch = Path(tempfile.mkdtemp()) / "ingest.db"
+        asyncio.run(simulate(args.simulate, args.batches, scratch, args.queue))
+    else:
+        asyncio.run(main(args.host, args.port, args.db))
@@ -0,0 +1,97 @@
+"""Server-side session journal.
+
+The board ships every input as an ``op`` event (see journal.js) and a v2
+snapshot of itself every ``SNAPSHOT_EVERY`` ops; the store keeps both
+append-only. ``Journal`` rebuilds a session at any point in time from the
+nearest snapshot at or before it plus the ops since, through the engine, so
+the cost never depends on how long the session ran before that snapshot.
+"""
+import json
+from bisect import bisect_right
+
+from trainer.engine import Session
+
+SNAPSHOT_EVERY = 25
+
+
+class Journal:
+    """Ops ``(op, t_ms, a, b, c)`` plus snapshots ``(n, t_ms, snap)``, where a
+    snapshot at ``n`` is the board after the first ``n`` ops."""
+
+    __slots__ = ("rules", "session_id", "ops", "op_t", "snap_n", "snap_t", "snaps", "every", "_head")
+
+    def __init__(self, rules, base, session_id="", every=SNAPSHOT_EVERY):
+        self.rules = rules
+        self.session_id = session_id or base.get("s", "")
+        self.ops, self.op_t = [], []
+        self.snap_n, self.snap_t, self.snaps = [0], [base["t"]], [base]
+        self.every = every
+        self._head = None
+
+    @classmethod
+    def from_rows(cls, rules, ops, snapshots, session_id=""):
+        """Adopt stored ops and snapshots as-is (no replay)."""
+        snapshots = sorted(snapshots, key=lambda r: r[0])
+        if not snapshots or snapshots[0][0] != 0:
+            raise ValueError("journal has no base snapshot")
+        j = cls(rules, snapshots[0][2], session_id)
+        for n, t, snap in snapshots[1:]:
+            j.snap_n.append(n)
+            j.snap_t.append(t)
+            j.snaps.append(snap)
+        j.ops = [tuple(op) for op in ops]
+        j.op_t = [op[1] for op in j.ops]
+        return j
+
+    def append(self, op):
+        """Apply one op to the live head, snapshotting every ``every`` ops."""
+        head = self.head()
+        head.replay((op,))
+        self.ops.append(op)
+        self.op_t.append(op[1])
+        n = len(self.ops)
+        if n % self.every == 0:
+            self.snap_n.append(n)
+            self.snap_t.append(op[1])
+            self.snaps.append(head.to_snapshot(self.session_id))
+
+    def head(self):
+        """The session after every op so far."""
+        if self._head is None:
+            self._head = self.at(n=len(self.ops))
+        return self._head
+
+    def at(self, t_ms=None, n=None):
+        """A fresh ``Session`` as of time ``t_ms`` (ops stamped at or before
+        it) or after the first ``n`` ops; defaults to the end."""
+        if n is None:
+            n = len(self.ops) if t_ms is None else bisect_right(self.op_t, t_ms)
+        k = bisect_right(self.snap_n, n) - 1
+        s = Session.from_snapshot(self.rules, self.snaps[k])
+        s.replay(self.ops[self.snap_n[k]:n])
+        return s
+
+
+def load(store, rules, session_id):
+    """The stored journal for a session, or ``None`` if it has none."""
+    snaps = store.query("SELECT n, t_ms, snap FROM snapshots WHERE session_id = ? ORDER BY n", (session_id,))
+    if not snaps:
+        return None
+    ops = store.query("SELECT op, t_ms, a, b, c FROM events WHERE session_id = ? ORDER BY n", (session_id,))
+    return Journal.from_rows(rules, ops, [(n, t, json.loads(snap)) for n, t, snap in snaps], session_id)
+
+
+def latest(store, rules, session_id):
+    """``(n, Session)`` after every stored op, rebuilt from the newest
+    snapshot only; ``None`` without a journal for this catalog."""
+    rows = store.query("SELECT n, snap FROM snapshots WHERE session_id = ? ORDER BY n DESC LIMIT 1", (session_id,))
+    if not rows:
+        return None
+    n, snap = rows[0]
+    try:
+        s = Session.from_snapshot(rules, json.loads(snap))
+    except ValueError:
+        return None
+    ops = store.query("SELECT op, t_ms, a, b, c FROM events WHERE session_id = ? AND n >= ? ORDER BY n", (session_id, n))
+    s.replay(ops)
+    return n + len(ops), s
@@ -0,0 +1,312 @@
+"""End-of-build report cards.
+
+A card is one PNG: the final board at the live board's proportions (every
+placed part where the student left it, ringed by how it went: green locked
+and quiz right, amber locked but quiz wrong, red not locked, plus a badge
+counting wrong drops of that part) next to the score, grade, time and the
+quiz results from the build log.
+
+Boards are rebuilt in this process (``journal.latest``) and handed out as
+plain specs; the rasterizing fans out over a ``ProcessPoolExecutor``. Each
+process draws the parts that never change between cards once per catalog
+(background, grid, zone rings and labels, the panel frame, every icon), so
+a card is a copy of that layer, a few pastes and a PNG encode.
+"""
+import io
+import os
+import sys
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from multiprocessing import get_context
+
+from PIL import Image, ImageDraw, ImageFont
+
+from trainer import journal
+from trainer.atlas import render_icon
+from trainer.catalog import DEFAULT_AIRFRAME, TRAY, load_catalog
+from trainer.engine import Rules
+
+BOARD_ASPECT = 1100 / 680       # the live board's width / height (trainer.js)
+BOARD_H = 560
+BOARD_W = round(BOARD_H * BOARD_ASPECT)
+PANEL_W = 320
+MARGIN = 20
+HEADER = 56
+CARD_SIZE = (MARGIN + BOARD_W + MARGIN + PANEL_W + MARGIN, HEADER + BOARD_H + MARGIN)
+GRID_LINES = 10
+PANEL_X, PANEL_Y = MARGIN + BOARD_W + MARGIN + 16, HEADER + 14
+STATS = ("Time", "Locked", "Wrong drops", "Quiz", "Best streak")
+STATS_Y = PANEL_Y + 84
+QUIZ_Y = STATS_Y + 20 * len(STATS) + 28
+QUIZ_ROWS = 14
+SERIAL_MAX = 8          # smaller batches aren't worth starting workers for
+
+BG = "#070b08"
+BOARD = "#08110c"
+GRID = "#122116"
+ZONE = "#0a6a40"        # GREEN at 35% over BOARD, as the classroom draws empty zones
+PANEL = "#0c1310"
+BORDER = "#1a2a22"
+GREEN = "#00ff88"
+MUTED = "#9fdcc0"
+TEXT = "#e8fff3"
+AMBER = "#ffc857"
+RED = "#ff5c7a"
+
+SESSIONS_SQL = """
+SELECT session_id, score, wrong, best_streak, locked, parts, elapsed_s, grade FROM sessions
+WHERE cohort = ? AND parts = ? ORDER BY session_id
+"""
+WRONG_SQL = """
+SELECT w.session_id, w.part, COUNT(*) FROM wrong_drops w
+JOIN sessions s ON s.session_id = w.session_id
+WHERE s.cohort = ? GROUP BY w.session_id, w.part
+"""
+
+
+def card_specs(store, cohort, airframe=DEFAULT_AIRFRAME):
+    """``(specs, skipped)``: every cohort session on this airframe as a
+    picklable card spec, and the ids of sessions left out because they have
+    no journal for the airframe's current catalog (played on an older one)."""
+    catalog = load_catalog(airframe)
+    rules = Rules(catalog)
+    wrong = {}
+    for sid, part, n in store.query(WRONG_SQL, (cohort,)):
+        if part in catalog["part_index"]:
+            wrong.setdefault(sid, {})[catalog["part_index"][part]] = n
+    specs, skipped = [], []
+    for sid, score, n_wrong, best, locked, parts, elapsed_s, grade in store.query(
+            SESSIONS_SQL, (cohort, len(catalog["parts"]))):
+        board = journal.latest(store, rules, sid)
+        if board is None:
+            skipped.append(sid)
+            continue
+        specs.append({
+            "id": sid, "snap": board[1].to_snapshot(sid), "wrong": wrong.get(sid, {}),
+            "summary": {"score": score, "wrong": n_wrong, "best_streak": best, "locked": locked,
+                        "parts": parts, "elapsed_s": elapsed_s, "grade": grade},
+        })
+    return specs, skipped
+
+
+# -- drawing ------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _font(size):
+    return ImageFont.load_default(size)
+
+
+@lru_cache(maxsize=4096)
+def _text(text, size, fill, anchor):
+    """A rendered string and its offset from the anchor point. Question
+    texts, grades and most values repeat across a cohort, so cards mostly
+    paste instead of rasterizing glyphs."""
+    font = _font(size)
+    left, top, right, bottom = font.getbbox(text, anchor=anchor)
+    img = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(img).text((-left, -top), text, fill=fill, font=font, anchor=anchor)
+    return img, left, top
+
+
+def _put(img, xy, text, size, fill, anchor="la"):
+    glyphs, left, top = _text(text, size, fill, anchor)
+    img.paste(glyphs, (round(xy[0]) + left, round(xy[1]) + top), glyphs)
+
+
+class _Painter:
+    """One catalog's shared layers, drawn up front and read-only afterwards,
+    so threads rendering cards for it (concurrent exports) never race."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.zone_r = max(4, round(catalog["radius"] * BOARD_H))
+        side = max(8, round(1.6 * self.zone_r))
+        self.icons = {}
+        for kind in catalog["kinds"]:
+            img = render_icon(kind, side)
+            faded = img.copy()
+            faded.putalpha(img.getchannel("A").point(lambda a: a // 2))
+            self.icons[kind, False], self.icons[kind, True] = img, faded
+        self.base = self._base()
+        self.palette = self._palette()
+
+    def _base(self):
+        """Everything a card shares with every other card of this airframe."""
+        cat = self.catalog
+        img = Image.new("RGB", CARD_SIZE, BG)
+        d = ImageDraw.Draw(img)
+        x0, y0 = MARGIN, HEADER
+        d.rectangle([x0, y0, x0 + BOARD_W - 1, y0 + BOARD_H - 1], fill=BOARD, outline=BORDER)
+        for i in range(1, GRID_LINES):
+            u, v = round(i * BOARD_W / GRID_LINES), round(i * BOARD_H / GRID_LINES)
+            d.line([(x0 + u, y0), (x0 + u, y0 + BOARD_H - 1)], fill=GRID)
+            d.line([(x0, y0 + v), (x0 + BOARD_W - 1, y0 + v)], fill=GRID)
+
+        r = self.zone_r
+        for z in cat["zones"]:
+            cx, cy = x0 + z["x"] * BOARD_W, y0 + z["y"] * BOARD_H
+            d.ellipse([cx - r, cy - r, cx + r, cy + r], outline=ZONE, width=2)
+            d.text((cx, cy + r + 3), z["name"], fill=MUTED, font=_font(10), anchor="mt")
+
+        px = x0 + BOARD_W + MARGIN
+        d.rounded_rectangle([px, y0, px + PANEL_W - 1, y0 + BOARD_H - 1], radius=12, fill=PANEL, outline=BORDER)
+        d.text((MARGIN, MARGIN), f"DRONE ASSEMBLY // {cat['airframe'].replace('_', ' ').upper()}",
+               fill=MUTED, font=_font(14))
+        d.text((PANEL_X, PANEL_Y), "SESSION", fill=MUTED, font=_font(11))
+        for n, label in enumerate(STATS):
+            d.text((PANEL_X, STATS_Y + 20 * n), label.upper(), fill=MUTED, font=_font(11))
+        d.text((PANEL_X, QUIZ_Y - 18), "QUIZ", fill=MUTED, font=_font(11))
+        return img
+
+    def _palette(self):
+        """The card palette, from the base layer plus every icon, overlay and
+        text colour a card can draw."""
+        img = self.base.copy()
+        d = ImageDraw.Draw(img)
+        x = MARGIN
+        for icon in self.icons.values():
+            img.paste(icon, (x, HEADER), icon)
+            x += icon.width
+        for n, fill in enumerate((GREEN, AMBER, RED, TEXT, MUTED)):
+            d.ellipse([MARGIN + 40 * n, HEADER + 100, MARGIN + 40 * n + 30, HEADER + 130], outline=fill, width=3)
+            _put(img, (PANEL_X, QUIZ_Y + 20 * n), "Sample + x 0:42 A+", 13, fill)
+        return img.quantize(64, method=Image.Quantize.FASTOCTREE)
+
+    def card(self, spec):
+        cat, snap, summary = self.catalog, spec["snap"], spec["summary"]
+        img = self.base.copy()
+        d = ImageDraw.Draw(img)
+        x0, y0, r = MARGIN, HEADER, self.zone_r
+
+        result_of = {part: res for _, part, _, _, res in snap["l"]}
+        for i, p in enumerate(cat["parts"]):
+            x, y = snap["p"][2 * i], snap["p"][2 * i + 1]
+            if x == TRAY:
+                continue
+            # x/y is the icon's top-left corner, as on the live board
+            ix, iy = round(x0 + x * BOARD_W), round(y0 + y * BOARD_H)
+            locked = snap["z"][i] >= 0
+            icon = self.icons[p["kind"], not locked]
+            img.paste(icon, (ix, iy), icon)
+            cx, cy = ix + icon.width // 2, iy + icon.height // 2
+            ring = RED if not locked else AMBER if result_of.get(i) == 0 else GREEN
+            d.ellipse([cx - r - 2, cy - r - 2, cx + r + 2, cy + r + 2], outline=ring, width=3 if ring != GREEN else 2)
+            n = spec["wrong"].get(i)
+            if n:
+                bx, by = cx + r, cy - r
+                d.ellipse([bx - 8, by - 8, bx + 8, by + 8], fill=RED)
+                _put(img, (bx, by), str(min(n, 99)), 10, BG, "mm")
+
+        done = summary["locked"] >= summary["parts"]
+        _put(img, (MARGIN + BOARD_W, MARGIN), "PERFECT BUILD" if done else "BUILD INCOMPLETE", 14,
+             GREEN if done else AMBER, "ra")
+        _put(img, (PANEL_X + 70, PANEL_Y), spec["id"], 11, MUTED)
+        _put(img, (PANEL_X, PANEL_Y + 22), summary["grade"], 44, GREEN)
+        _put(img, (PANEL_X + 110, PANEL_Y + 26), f"{summary['score']} pts", 20, TEXT)
+
+        secs = summary["elapsed_s"]
+        shown = [(part, q, res) for _, part, _, q, res in snap["l"] if res >= 0]
+        values = (
+            f"{secs // 60}:{secs % 60:02d}",
+            f"{summary['locked']}/{summary['parts']}",
+            str(summary["wrong"]),
+            f"{sum(res for _, _, res in shown)}/{len(shown)}",
+            str(summary["best_streak"]),
+        )
+        for n, value in enumerate(values):
+            _put(img, (PANEL_X + PANEL_W - 32, STATS_Y + 20 * n), value, 13, TEXT, "ra")
+
+        y = QUIZ_Y
+        for part, q, res in shown[:QUIZ_ROWS]:
+            kind = cat["parts"][part]["kind"]
+            questions = cat["quiz"][kind]["questions"]
+            text = questions[q][0] if 0 <= q < len(questions) else kind
+            if len(text) > 34:
+                text = text[:33] + "…"
+            _put(img, (PANEL_X, y), "+" if res else "x", 12, GREEN if res else RED)
+            _put(img, (PANEL_X + 14, y), text, 11, TEXT)
+            y += 17
+        if len(shown) > QUIZ_ROWS:
+            _put(img, (PANEL_X + 14, y), f"… and {len(shown) - QUIZ_ROWS} more", 11, MUTED)
+
+        # few colours on a card: a shared 64-colour palette makes the PNG a
+        # third of the size and five times quicker to encode
+        buf = io.BytesIO()
+        img.quantize(palette=self.palette, dither=Image.Dither.NONE).save(buf, format="PNG", compress_level=1)
+        return buf.getvalue()
+
+
+_painters = {}              # catalog version -> _Painter
+_painters_lock = threading.Lock()
+
+
+def _painter(catalog):
+    with _painters_lock:
+        painter = _painters.get(catalog["version"])
+        if painter is None:
+            painter = _painters[catalog["version"]] = _Painter(catalog)
+        return painter
+
+
+def render_card(spec, catalog):
+    """One spec to PNG bytes."""
+    return _painter(catalog).card(spec)
+
+
+def _render(version, spec):
+    # the painter for ``version`` was made before any spec was handed out
+    return spec["id"], _painters[version].card(spec)
+
+
+# -- fan-out ------------------------------------------------------------------
+def render_cards(specs, catalog, workers=None):
+    """Yield ``(session_id, png)`` for every spec, in order.
+
+    Small batches render in this process; larger ones spread over
+    ``workers`` processes (default: one per CPU). Workers are spawned, not
+    forked, since the Streamlit server process runs threads.
+    """
+    workers = workers or os.cpu_count() or 1
+    render = partial(_render, catalog["version"])
+    if workers == 1 or len(specs) <= SERIAL_MAX:
+        _painter(catalog)
+        yield from map(render, specs)
+        return
+    chunk = max(1, len(specs) // (workers * 4))
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn"),
+                             initializer=_painter, initargs=(catalog,)) as pool:
+        yield from pool.map(render, specs, chunksize=chunk)
+
+
+def export_zip(store, cohort, airframe=DEFAULT_AIRFRAME, workers=None):
+    """A cohort's report cards as ``(zip bytes, cards, skipped)``: a
+    ``<session>.png`` per card, plus ``skipped.txt`` listing the sessions
+    ``card_specs`` left out, if any."""
+    specs, skipped = card_specs(store, cohort, airframe)
+    buf = io.BytesIO()
+    # PNGs are already deflated
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for sid, png in render_cards(specs, load_catalog(airframe), workers):
+            zf.writestr(f"{sid}.png", png)
+        if skipped:
+            zf.writestr("skipped.txt", f"{len(skipped)} sessions have no journal for this {airframe} catalog "
+                                       f"(played on an older version):\n" + "\n".join(skipped) + "\n")
+    return buf.getvalue(), len(specs), len(skipped)
+
+
+if __name__ == "__main__":
+    import time
+    from pathlib import Path
+
+    from trainer.store import SessionStore
+
+    cohort, airframe = sys.argv[1], (sys.argv[2] if len(sys.argv) > 2 else DEFAULT_AIRFRAME)
+    out = Path(sys.argv[3] if len(sys.argv) > 3 else f"cards_{cohort}")
+    out.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    specs, skipped = card_specs(SessionStore(), cohort, airframe)
+    for sid, png in render_cards(specs, load_catalog(airframe)):
+        (out / f"{sid}.png").write_bytes(png)
+    print(f"{len(specs)} cards -> {out} in {time.perf_counter() - t0:.1f} s; "
+          f"{len(skipped)} sessions skipped (no journal for this catalog)")
@@ -0,0 +1,31 @@
+"""Server-side view of a trainee's board, fed by the component's event batches."""
+import streamlit as st
+
+
+def ingest(batch, key="trainer"):
+    """Fold a board batch into ``st.session_state`` exactly once.
+
+    Streamlit hands the component's last value back on every rerun, so each
+    batch is applied only if its ``seq`` is newer than the last one seen for
+    its session. Returns the newly applied events.
+    """
+    if not batch:
+        return []
+    seen = st.session_state.setdefault(f"{key}_seq", {})
+    sid, seq = batch["session"], batch["seq"]
+    if seen.get(sid, 0) >= seq:
+        return []
+    seen[sid] = seq
+
+    st.session_state.setdefault(f"{key}_events", []).extend(batch["events"])
+    st.session_state[f"{key}_summary"] = dict(batch["summary"], session=sid)
+    return batch["events"]
+
+
+def summary(key="trainer"):
+    """Latest score/grade snapshot reported by the board, or ``None``."""
+    return st.session_state.get(f"{key}_summary")
+
+
+def events(key="trainer"):
+    return st.session_state.get(f"{key}_events", [])
@@ -0,0 +1,73 @@
+"""Board sound effects, synthesized with NumPy.
+
+The board used to build every sound when it played: fresh oscillator and gain
+nodes per tone, and a noise buffer filled sample by sample for each wrong
+drop. The same tones and envelopes are rendered here once, as 16-bit mono PCM,
+and shipped in the bundle like the icon atlas; the board decodes each into an
+AudioBuffer once and replays it.
+"""
+import base64
+
+import numpy as np
+import streamlit as st
+
+RATE = 22050
+FLOOR = 0.0001          # exponentialRampToValueAtTime target, as on the board
+SEED = 7                # fixed noise, so the bundle hash only changes with the sounds
+
+# Each sound is a mix of voices that start together:
+#   ("tone", freq, dur, wave, gain) / ("noise", dur, gain)
+SOUNDS = {
+    "drag": [("tone", 420, 0.03, "square", 0.03)],
+    "correct": [("tone", 740, 0.08, "sine", 0.06), ("tone", 980, 0.10, "sine", 0.035)],
+    "wrong": [("noise", 0.12, 0.06)],
+    "lock": [("tone", 600, 0.05, "triangle", 0.04), ("tone", 900, 0.06, "triangle", 0.03)],
+    "win": [("tone", 420, 0.10, "sine", 0.04), ("tone", 640, 0.12, "sine", 0.04), ("tone", 980, 0.14, "sine", 0.04)],
+}
+
+
+def _wave(kind, freq, t):
+    """Band-limited oscillator (harmonics stop below Nyquist, like WebAudio's)."""
+    if kind == "sine":
+        return np.sin(2 * np.pi * freq * t)
+    odd = np.arange(1, int(RATE / 2 / freq) + 1, 2)
+    phase = 2 * np.pi * freq * np.outer(odd, t)
+    if kind == "square":
+        return 4 / np.pi * (np.sin(phase) / odd[:, None]).sum(axis=0)
+    if kind == "triangle":
+        sign = np.where((odd // 2) % 2, -1.0, 1.0)
+        return 8 / np.pi ** 2 * (np.sin(phase) * (sign / odd ** 2)[:, None]).sum(axis=0)
+    raise ValueError(f"unknown wave {kind!r}")
+
+
+def render(voices, rng):
+    """Mix one sound's voices into float samples."""
+    length = max(round(v[2 if v[0] == "tone" else 1] * RATE) for v in voices)
+    out = np.zeros(length)
+    for v in voices:
+        if v[0] == "tone":
+            _, freq, dur, kind, gain = v
+            n = round(dur * RATE)
+            t = np.arange(n) / RATE
+            # gain ramps exponentially from `gain` to FLOOR over the tone
+            out[:n] += _wave(kind, freq, t) * gain * (FLOOR / gain) ** (t / dur)
+        else:
+            _, dur, gain = v
+            n = round(dur * RATE)
+            out[:n] += (rng.random(n) * 2 - 1) * (1 - np.arange(n) / n) * gain
+    return out
+
+
+def pcm16(samples):
+    return (np.clip(samples, -1, 1) * 32767).round().astype("<i2").tobytes()
+
+
+@st.cache_resource(show_spinner=False)
+def load_sfx():
+    """Board-side manifest: ``{"rate", "sounds": {name: base64 PCM}}``."""
+    rng = np.random.default_rng(SEED)
+    return {
+        "rate": RATE,
+        "sounds": {name: base64.b64encode(pcm16(render(voices, rng))).decode("ascii")
+                   for name, voices in SOUNDS.items()},
+    }
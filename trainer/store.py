@@ -0,0 +1,317 @@
+"""SQLite session store.
+
+Every Streamlit session hands its board batches to one process-wide writer
+thread through a queue; the writer drains whatever has piled up and commits
+it as a single transaction of ``executemany`` inserts. The database runs in
+WAL mode with ``synchronous=NORMAL``, so readers never block the writer and
+commits don't fsync - a crash can lose the last moments of activity, never
+corrupt the file.
+
+Cohort aggregates (quiz accuracy per kind, wrong-zone drops per part kind
+and zone, grade distribution) are kept by triggers inside the same transaction,
+so reading them costs the same however much history has piled up.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+
+import streamlit as st
+
+from trainer.catalog import default_parts
+
+log = logging.getLogger(__name__)
+
+DB_PATH = Path(os.environ.get("TRAINER_DB", Path(__file__).resolve().parents[1] / "trainer.db"))
+
+# Drop outcomes worth keeping; plain moves are noise.
+WRONG_OUTCOMES = ("occupied", "wrong_zone", "out_of_order")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id  TEXT PRIMARY KEY,
+    cohort      TEXT NOT NULL,
+    started_ms  INTEGER NOT NULL,
+    updated_ms  INTEGER NOT NULL,
+    score       INTEGER NOT NULL,
+    wrong       INTEGER NOT NULL,
+    quiz_streak INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL,
+    locked      INTEGER NOT NULL,
+    parts       INTEGER NOT NULL,
+    elapsed_s   INTEGER NOT NULL,
+    grade       TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS locks (
+    session_id TEXT NOT NULL,
+    event_id   TEXT NOT NULL,
+    t_ms       INTEGER NOT NULL,
+    part       TEXT NOT NULL,
+    zone       TEXT NOT NULL,
+    q_idx      INTEGER NOT NULL,
+    PRIMARY KEY (session_id, event_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS quiz (
+    session_id TEXT NOT NULL,
+    event_id   TEXT NOT NULL,
+    t_ms       INTEGER NOT NULL,
+    kind       TEXT NOT NULL,
+    correct    INTEGER NOT NULL,
+    streak     INTEGER NOT NULL,
+    PRIMARY KEY (session_id, event_id)
+) WITHOUT ROWID;
+-- A part is dropped at most once per millisecond, so (session, t_ms, part)
+-- names a drop however its batch was shipped; the unique index on it
+-- (KEY_WRONG_DROPS) makes a resent drop a no-op.
+CREATE TABLE IF NOT EXISTS wrong_drops (
+    session_id TEXT NOT NULL,
+    t_ms       INTEGER NOT NULL,
+    part       TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    zone       TEXT NOT NULL,
+    outcome    TEXT NOT NULL
+);
+
+-- The board's journal (see journal.py): every input, plus periodic snapshots.
+CREATE TABLE IF NOT EXISTS events (
+    session_id TEXT NOT NULL,
+    n          INTEGER NOT NULL,
+    t_ms       INTEGER NOT NULL,
+    op         INTEGER NOT NULL,
+    a          INTEGER NOT NULL,
+    b          REAL NOT NULL,
+    c          REAL NOT NULL,
+    PRIMARY KEY (session_id, n)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    session_id TEXT NOT NULL,
+    n          INTEGER NOT NULL,
+    t_ms       INTEGER NOT NULL,
+    snap       TEXT NOT NULL,
+    PRIMARY KEY (session_id, n)
+) WITHOUT ROWID;
+
+-- Materialized cohort aggregates, maintained by the triggers below.
+CREATE TABLE IF NOT EXISTS agg_quiz (
+    cohort   TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct  INTEGER NOT NULL,
+    PRIMARY KEY (cohort, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agg_wrong (
+    cohort TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    zone   TEXT NOT NULL,
+    n      INTEGER NOT NULL,
+    PRIMARY KEY (cohort, kind, zone)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agg_grade (
+    cohort TEXT NOT NULL,
+    grade  TEXT NOT NULL,
+    n      INTEGER NOT NULL,
+    PRIMARY KEY (cohort, grade)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS quiz_agg AFTER INSERT ON quiz BEGIN
+    INSERT INTO agg_quiz VALUES (
+        (SELECT cohort FROM sessions WHERE session_id = NEW.session_id), NEW.kind, 1, NEW.correct)
+    ON CONFLICT (cohort, kind) DO UPDATE SET attempts = attempts + 1, correct = correct + NEW.correct;
+END;
+CREATE TRIGGER IF NOT EXISTS wrong_agg AFTER INSERT ON wrong_drops
+WHEN NEW.outcome = 'wrong_zone' BEGIN
+    INSERT INTO agg_wrong VALUES (
+        (SELECT cohort FROM sessions WHERE session_id = NEW.session_id), NEW.kind, NEW.zone, 1)
+    ON CONFLICT (cohort, kind, zone) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS grade_agg_new AFTER INSERT ON sessions BEGIN
+    INSERT INTO agg_grade VALUES (NEW.cohort, NEW.grade, 1)
+    ON CONFLICT (cohort, grade) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS grade_agg_move AFTER UPDATE OF grade ON sessions
+WHEN OLD.grade IS NOT NEW.grade BEGIN
+    UPDATE agg_grade SET n = n - 1 WHERE cohort = OLD.cohort AND grade = OLD.grade;
+    INSERT INTO agg_grade VALUES (NEW.cohort, NEW.grade, 1)
+    ON CONFLICT (cohort, grade) DO UPDATE SET n = n + 1;
+END;
+"""
+
+UPSERT_SESSION = """
+INSERT INTO sessions (session_id, cohort, started_ms, updated_ms, score, wrong, quiz_streak, best_streak,
+                      locked, parts, elapsed_s, grade)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    updated_ms = excluded.updated_ms, score = excluded.score, wrong = excluded.wrong,
+    quiz_streak = excluded.quiz_streak, best_streak = excluded.best_streak,
+    locked = excluded.locked, parts = excluded.parts, elapsed_s = excluded.elapsed_s,
+    grade = excluded.grade
+WHERE excluded.updated_ms >= sessions.updated_ms
+"""
+INSERT_LOCK = "INSERT OR IGNORE INTO locks VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_QUIZ = "INSERT OR IGNORE INTO quiz VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_WRONG = ("INSERT OR IGNORE INTO wrong_drops (session_id, t_ms, part, kind, zone, outcome) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+INSERT_EVENT = "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)"
+INSERT_SNAPSHOT = "INSERT OR IGNORE INTO snapshots VALUES (?, ?, ?, ?)"
+
+
+# Databases from before cohorts (sessions without ``cohort``, wrong drops
+# without ``kind``) get both columns, then aggregates for what they hold
+# (agg_wrong is recounted by KEY_WRONG_DROPS, which such a database also
+# needs). Only the quad existed then, so its parts name the kinds.
+ADD_COHORTS = """
+ALTER TABLE sessions ADD COLUMN cohort TEXT NOT NULL DEFAULT 'default';
+ALTER TABLE wrong_drops ADD COLUMN kind TEXT NOT NULL DEFAULT '';
+UPDATE wrong_drops SET kind = CASE part {kinds} ELSE '' END;
+"""
+BACKFILL_AGGREGATES = """
+INSERT INTO agg_quiz
+SELECT s.cohort, q.kind, COUNT(*), SUM(q.correct) FROM quiz q JOIN sessions s ON s.session_id = q.session_id
+GROUP BY s.cohort, q.kind;
+INSERT INTO agg_grade SELECT cohort, grade, COUNT(*) FROM sessions GROUP BY cohort, grade;
+"""
+
+# Databases from before wrong_drops had a key may hold resent drops: collapse
+# them, recount agg_wrong, then key the table (a no-op on a new database).
+KEY_WRONG_DROPS = """
+BEGIN IMMEDIATE;
+DELETE FROM wrong_drops WHERE rowid NOT IN (
+    SELECT MIN(rowid) FROM wrong_drops GROUP BY session_id, t_ms, part);
+DELETE FROM agg_wrong;
+INSERT INTO agg_wrong
+SELECT s.cohort, w.kind, w.zone, COUNT(*) FROM wrong_drops w JOIN sessions s ON s.session_id = w.session_id
+WHERE w.outcome = 'wrong_zone' GROUP BY s.cohort, w.kind, w.zone;
+DROP INDEX IF EXISTS wrong_drops_session;
+CREATE UNIQUE INDEX IF NOT EXISTS wrong_drops_key ON wrong_drops (session_id, t_ms, part);
+COMMIT;
+"""
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def init(conn):
+    """Create the schema, or bring an older database up to date."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+    if columns and "cohort" not in columns:
+        kinds = " ".join(f"WHEN '{p['id']}' THEN '{p['kind']}'" for p in default_parts())
+        conn.executescript("BEGIN IMMEDIATE;" + ADD_COHORTS.format(kinds=kinds) + SCHEMA + BACKFILL_AGGREGATES
+                           + "COMMIT;")
+    conn.executescript(SCHEMA)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'wrong_drops_key'").fetchone():
+        conn.executescript(KEY_WRONG_DROPS)
+
+
+def rows_for(items):
+    """Split ``(cohort, batch)`` items into per-table row lists (sessions
+    upserted once, with the newest summary).
+
+    A summary is as new as the latest event in its batch (``updated_ms``);
+    one older than what the session already has is a resend or arrived out
+    of order, so it never replaces the newer one, here or in the table."""
+    sessions, locks, quiz, wrong, ops, snaps = {}, [], [], [], [], []
+    for cohort, b in items:
+        sid, events, s = b["session"], b["events"], b["summary"]
+        first = events[0]["t"] if events else 0
+        last = max((e["t"] for e in events), default=0)
+        prev = sessions.get(sid)
+        if not prev or last >= prev[3]:
+            started = prev[2] if prev else first
+            sessions[sid] = (sid, cohort, started, last, s["score"], s["wrong"], s["quiz_streak"],
+                             s["best_streak"], s["locked"], s["parts"], s["elapsed_s"], s["grade"])
+        for e in events:
+            if e["type"] == "lock":
+                locks.append((sid, e["event_id"], e["t"], e["part"], e["zone"], e["q_idx"]))
+            elif e["type"] == "quiz":
+                quiz.append((sid, e["event_id"], e["t"], e["kind"], int(e["correct"]), e["streak"]))
+            elif e["type"] == "drop" and e["outcome"] in WRONG_OUTCOMES:
+                wrong.append((sid, e["t"], e["part"], e["kind"], e["zone"], e["outcome"]))
+            elif e["type"] == "op":
+                ops.append((sid, e["n"], e["t"], e["op"], e["a"], e["b"], e["c"]))
+            elif e["type"] == "snapshot":
+                snaps.append((sid, e["n"], e["t"], json.dumps(e["snap"], separators=(",", ":"))))
+    return list(sessions.values()), locks, quiz, wrong, ops, snaps
+
+
+def write(conn, batches):
+    """Commit ``(cohort, batch)`` items in one transaction."""
+    sessions, locks, quiz, wrong, ops, snaps = rows_for(batches)
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(UPSERT_SESSION, sessions)
+        conn.executemany(INSERT_LOCK, locks)
+        conn.executemany(INSERT_QUIZ, quiz)
+        conn.executemany(INSERT_WRONG, wrong)
+        conn.executemany(INSERT_EVENT, ops)
+        conn.executemany(INSERT_SNAPSHOT, snaps)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+class SessionStore:
+    """Queue-fed single-writer store; ``submit`` never touches the database."""
+
+    def __init__(self, path=DB_PATH, max_batch=500):
+        self.path = path
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._conn = connect(path)
+        init(self._conn)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="trainer-store")
+        self._thread.start()
+
+    def submit(self, batch, cohort="default"):
+        self._queue.put((cohort, batch))
+
+    def flush(self):
+        """Block until everything submitted so far is committed."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batches = [self._queue.get()]
+            while len(batches) < self.max_batch:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(batches)
+            except Exception:
+                log.exception("dropped %d board batches", len(batches))
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    def write(self, batches):
+        write(self._conn, batches)
+
+    # -- reads (own connection per call; WAL readers don't block the writer)
+    def query(self, sql, params=()):
+        conn = connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def session(self, session_id):
+        rows = self.query("SELECT session_id, cohort, started_ms, updated_ms, score, wrong, quiz_streak, "
+                          "best_streak, locked, parts, elapsed_s, grade FROM sessions WHERE session_id = ?",
+                          (session_id,))
+        return rows[0] if rows else None
+
+
+@st.cache_resource(show_spinner=False)
+def get_store():
+    """The process-wide store (one writer thread per server process)."""
+    return SessionStore()